@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends
 
-from app.api.admin.endpoints import user
+from app.api.admin.endpoints import metrics, user
 from app.dependencies import require_role
 from app.schemas import UserRole
 
 admin_router = APIRouter(prefix='/admin', dependencies=[Depends(require_role(UserRole.ADMIN))])
 
 admin_router.include_router(user.router)
+admin_router.include_router(metrics.router)
@@ -0,0 +1,19 @@
+"""Внутренние метрики сервиса.
+
+Все эндпоинты требуют валидный access token с ролью ADMIN
+"""
+
+from fastapi import APIRouter, Request
+
+from app.core.metrics import metrics
+from app.core.rate_limit import limiter
+from app.core.responses import GET_RESPONSES
+
+router = APIRouter(prefix='/metrics', tags=['Admin | Metrics'])
+
+
+@router.get('/', responses=GET_RESPONSES)
+@limiter.limit('60/minute')
+async def get_metrics(request: Request) -> dict[str, dict[str, int | float]]:
+    """Получить текущие значения метрик."""
+    return metrics.snapshot()
@@ -5,21 +5,37 @@
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.core.exceptions import service_exception_handler
 from app.core.rate_limit import limiter
 from app.core.responses import DELETE_RESPONSES, GET_RESPONSES, POST_RESPONSES, PUT_RESPONSES
-from app.dependencies import get_auth_service, get_user_service
+from app.dependencies import (
+    get_auth_service,
+    get_export_service,
+    get_import_service,
+    get_user_service,
+)
 from app.dependencies.auth import get_current_user
 from app.schemas import (
+    Principal,
+    UserBatchRequest,
+    UserBatchResponse,
+    UserBatchUpdateRequest,
     UserCreateRequest,
+    UserExportFormat,
+    UserImportFormat,
+    UserImportReport,
     UserResponse,
     UserRole,
-    UserSchema,
+    UserSearchMode,
+    UserSessionsMode,
     UserUpdateRequest,
 )
 from app.services.auth import AuthService
+from app.services.export import UserExportService
+from app.services.importer import UserImportService
 from app.services.user import UserService
 
 router = APIRouter(prefix='/users', tags=['Admin | Users'])
@@ -30,14 +46,141 @@ router = APIRouter(prefix='/users', tags=['Admin | Users'])
 @service_exception_handler('Ошибка при получении пользователей')
 async def get_users(
     request: Request,
+    response: Response,
     service: Annotated[UserService, Depends(get_user_service)],
     skip: Annotated[int, Query(ge=0, description='Количество записей для пропуска')] = 0,
+    cursor: Annotated[
+        str | None,
+        Query(description='Курсор страницы из X-Next-Cursor (вместо skip)'),
+    ] = None,
     limit: Annotated[int, Query(ge=1, le=1000, description='Лимит записей')] = 100,
     search: Annotated[str | None, Query(description='Поиск по email')] = None,
+    search_mode: Annotated[
+        UserSearchMode,
+        Query(description='Поиск по подстроке или по началу email'),
+    ] = UserSearchMode.CONTAINS,
     role: Annotated[UserRole | None, Query(description='Фильтр по роли')] = None,
+    sessions: Annotated[
+        UserSessionsMode,
+        Query(description='Сессии: все, последние, только количество или без них'),
+    ] = UserSessionsMode.ALL,
+    sessions_limit: Annotated[
+        int,
+        Query(ge=1, le=100, description='Число последних сессий (sessions=latest)'),
+    ] = 5,
 ) -> list[UserResponse]:
-    """Получить список пользователей с пагинацией и фильтрацией."""
-    return await service.get_users_with_details(skip, limit, search, role)
+    """Получить список пользователей с пагинацией и фильтрацией.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    (нет заголовка - нет страницы). Со skip глубокие страницы дороже.
+    """
+    if skip:
+        return await service.get_users_with_details(
+            skip,
+            limit,
+            search,
+            role,
+            search_mode,
+            sessions=sessions,
+            sessions_limit=sessions_limit,
+        )
+
+    users, next_cursor = await service.paginate_users_with_details(
+        cursor,
+        limit,
+        search,
+        role,
+        search_mode,
+        sessions=sessions,
+        sessions_limit=sessions_limit,
+    )
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return users
+
+
+@router.get('/export', responses=GET_RESPONSES, response_class=StreamingResponse)
+@limiter.limit('5/minute')
+async def export_users(
+    request: Request,  # noqa: ARG001 - нужен slowapi для лимита
+    *,
+    service: Annotated[UserExportService, Depends(get_export_service)],
+    export_format: Annotated[
+        UserExportFormat,
+        Query(alias='format', description='Формат выгрузки'),
+    ] = UserExportFormat.NDJSON,
+    role: Annotated[UserRole | None, Query(description='Фильтр по роли')] = None,
+    sessions: Annotated[
+        bool,
+        Query(description='Добавить сводку по сессиям (количество, последний вход)'),
+    ] = False,
+) -> StreamingResponse:
+    """Выгрузить всех пользователей потоком NDJSON или CSV."""
+    media_type = 'text/csv' if export_format == UserExportFormat.CSV else 'application/x-ndjson'
+    return StreamingResponse(
+        service.stream(export_format, role, with_sessions=sessions),
+        media_type=media_type,
+        headers={'Content-Disposition': f'attachment; filename="users.{export_format.value}"'},
+    )
+
+
+@router.post('/import', responses=POST_RESPONSES)
+@limiter.limit('5/minute')
+@service_exception_handler('Ошибка при импорте пользователей')
+async def import_users(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    service: Annotated[UserImportService, Depends(get_import_service)],
+    import_format: Annotated[
+        UserImportFormat,
+        Query(alias='format', description='Формат тела запроса'),
+    ] = UserImportFormat.NDJSON,
+) -> UserImportReport:
+    """Импортировать пользователей из тела запроса (NDJSON или CSV).
+
+    Строка: email, password или готовый bcrypt password_hash, role, status.
+    Пачки фиксируются по мере обработки, ошибки - в отчете по строкам.
+    """
+    return await service.run(request.stream(), import_format, current_user)
+
+
+@router.post('/batch/update', responses=POST_RESPONSES)
+@limiter.limit('5/minute')
+@service_exception_handler('Ошибка при пакетном изменении пользователей')
+async def batch_update_users(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    batch: UserBatchUpdateRequest,
+    service: Annotated[UserService, Depends(get_user_service)],
+) -> UserBatchResponse:
+    """Изменить пользователей по списку ID или условию."""
+    return await service.batch_update(batch, current_user)
+
+
+@router.post('/batch/delete', responses=POST_RESPONSES)
+@limiter.limit('5/minute')
+@service_exception_handler('Ошибка при пакетном удалении пользователей')
+async def batch_delete_users(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    batch: UserBatchRequest,
+    service: Annotated[UserService, Depends(get_user_service)],
+) -> UserBatchResponse:
+    """Удалить пользователей по списку ID или условию."""
+    return await service.batch_delete(batch, current_user)
+
+
+@router.post('/batch/logout-all', responses=POST_RESPONSES)
+@limiter.limit('5/minute')
+@service_exception_handler('Ошибка при пакетном выходе из всех устройств')
+async def batch_logout_all(
+    request: Request,
+    current_user: Annotated[Principal, Depends(get_current_user)],
+    batch: UserBatchRequest,
+    auth_service: Annotated[AuthService, Depends(get_auth_service)],
+) -> UserBatchResponse:
+    """Выход пользователей по списку ID или условию со всех устройств."""
+    return await auth_service.batch_logout(batch, current_user)
 
 
 @router.get('/{user_id}', responses=GET_RESPONSES)
@@ -57,7 +200,7 @@ async def get_user(
 @service_exception_handler('Ошибка при создании пользователя')
 async def create_user(
     request: Request,
-    current_user: Annotated[UserSchema, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_data: UserCreateRequest,
     service: Annotated[UserService, Depends(get_user_service)],
 ) -> UserResponse:
@@ -71,7 +214,7 @@ async def create_user(
 @service_exception_handler('Ошибка при изменении пользователя')
 async def update_user(
     request: Request,
-    current_user: Annotated[UserSchema, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_id: Annotated[int, Path(..., description='ID пользователя')],
     user_data: UserUpdateRequest,
     service: Annotated[UserService, Depends(get_user_service)],
@@ -86,7 +229,7 @@ async def update_user(
 @service_exception_handler('Ошибка при удалении пользователя')
 async def delete_user(
     request: Request,
-    current_user: Annotated[UserSchema, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     user_id: Annotated[int, Path(..., description='ID пользователя')],
     service: Annotated[UserService, Depends(get_user_service)],
 ) -> None:
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
-from .endpoints import auth
+from .endpoints import auth, jwks
 
 public_router = APIRouter()
 
 public_router.include_router(auth.router)
+public_router.include_router(jwks.router)
@@ -2,11 +2,12 @@
 
 Все эндпоинты логируют сессию (IP, User-Agent)
 и обновляют время последней активности пользователя.
+Обе записи ставятся в очередь и выполняются в фоне пакетами.
 """
 
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, Depends, Request
 
 from app.core.exceptions import service_exception_handler
 from app.core.rate_limit import limiter
@@ -26,7 +27,6 @@ router = APIRouter(tags=['Authentication'])
 async def register(
     user_data: UserCreateRequest,
     request: Request,
-    bg_tasks: BackgroundTasks,
     user_service: Annotated[UserService, Depends(get_user_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
     session_service: Annotated[SessionService, Depends(get_session_service)],
@@ -34,8 +34,8 @@ async def register(
     """Регистрация нового пользователя."""
     tokens, user_id, token_id = await auth_service.register(user_data)
 
-    bg_tasks.add_task(session_service.create_session, user_id, token_id, request)
-    bg_tasks.add_task(user_service.update_user_activity, user_id)
+    await session_service.create_session(user_id, token_id, request)
+    await user_service.update_user_activity(user_id)
 
     return tokens
 
@@ -46,7 +46,6 @@ async def register(
 async def login(
     user_data: UserLogin,
     request: Request,
-    bg_tasks: BackgroundTasks,
     user_service: Annotated[UserService, Depends(get_user_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
     session_service: Annotated[SessionService, Depends(get_session_service)],
@@ -54,8 +53,8 @@ async def login(
     """Вход зарегистрированного пользователя."""
     tokens, user_id, token_id = await auth_service.login(user_data)
 
-    bg_tasks.add_task(session_service.create_session, user_id, token_id, request)
-    bg_tasks.add_task(user_service.update_user_activity, user_id)
+    await session_service.create_session(user_id, token_id, request)
+    await user_service.update_user_activity(user_id)
 
     return tokens
 
@@ -66,7 +65,6 @@ async def login(
 async def refresh_tokens(
     request_data: RefreshTokenRequest,
     request: Request,
-    bg_tasks: BackgroundTasks,
     user_service: Annotated[UserService, Depends(get_user_service)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
     session_service: Annotated[SessionService, Depends(get_session_service)],
@@ -74,7 +72,7 @@ async def refresh_tokens(
     """Обновление токенов авторизации."""
     tokens, user_id, token_id = await auth_service.refresh_tokens(request_data.token)
 
-    bg_tasks.add_task(session_service.update_session, token_id, request)
-    bg_tasks.add_task(user_service.update_user_activity, user_id)
+    await session_service.update_session(token_id, request)
+    await user_service.update_user_activity(user_id)
 
     return tokens
@@ -0,0 +1,26 @@
+"""Публикация открытых ключей подписи токенов (JWKS).
+
+Позволяет другим сервисам проверять access токены локально.
+"""
+
+from fastapi import APIRouter, Request, Response
+
+from app.core.config import settings
+from app.core.keys import keyring
+
+router = APIRouter(tags=['Keys'])
+
+
+@router.get('/.well-known/jwks.json')
+async def jwks(request: Request) -> Response:
+    """Открытые ключи для проверки подписи токенов."""
+    body, etag = keyring.jwks()
+    headers = {
+        'ETag': etag,
+        'Cache-Control': f'public, max-age={settings.JWKS_MAX_AGE}',
+    }
+
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type='application/json', headers=headers)
@@ -15,7 +15,7 @@ from app.core.exceptions import service_exception_handler
 from app.core.rate_limit import limiter
 from app.core.responses import DELETE_RESPONSES
 from app.dependencies import get_auth_service, get_current_user
-from app.schemas import RefreshTokenRequest, UserSchema
+from app.schemas import Principal, RefreshTokenRequest
 from app.services.auth import AuthService
 
 router = APIRouter(tags=['User | Profile'])
@@ -38,7 +38,7 @@ async def logout(
 @service_exception_handler('Ошибка при выходе из всех устройств пользователя')
 async def logout_all(
     request: Request,
-    current_user: Annotated[UserSchema, Depends(get_current_user)],
+    current_user: Annotated[Principal, Depends(get_current_user)],
     auth_service: Annotated[AuthService, Depends(get_auth_service)],
 ) -> None:
     """Выход из системы на всех устройствах (инвалидирует refresh tokens)."""
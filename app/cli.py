@@ -0,0 +1,75 @@
+"""Консольные команды сервиса.
+
+Запуск: python -m app.cli <команда>
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.database import async_engine
+from app.schemas import UserImportFormat
+from app.services.importer import UserImportService
+from app.services.reaper import TokenReaper
+
+
+async def reap_tokens(batch_size: int, pause: float) -> None:
+    """Удалить истекшие refresh токены."""
+    try:
+        deleted = await TokenReaper(batch_size=batch_size, pause=pause).run()
+    finally:
+        await async_engine.dispose()
+    print(f'Удалено refresh токенов: {deleted}')  # noqa: T201
+
+
+async def import_users(path: Path, import_format: UserImportFormat, chunk_size: int) -> None:
+    """Импортировать пользователей из файла."""
+    try:
+        report = await UserImportService(chunk_size=chunk_size).run(_read(path), import_format)
+    finally:
+        await async_engine.dispose()
+
+    for error in report.errors:
+        print(f'Строка {error.line} ({error.email or "-"}): {error.error}')  # noqa: T201
+    print(f'Создано пользователей: {report.created}, ошибок: {report.failed}')  # noqa: T201
+
+
+async def _read(path: Path, block_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """Содержимое файла блоками."""
+    with path.open('rb') as file:
+        while block := await asyncio.to_thread(file.read, block_size):
+            yield block
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m app.cli')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    reap = commands.add_parser('reap-tokens', help='Удалить истекшие refresh токены')
+    reap.add_argument('--batch-size', type=int, default=settings.TOKEN_REAPER_BATCH_SIZE)
+    reap.add_argument('--pause', type=float, default=settings.TOKEN_REAPER_PAUSE)
+
+    load = commands.add_parser('import-users', help='Импортировать пользователей из NDJSON/CSV')
+    load.add_argument('path', type=Path)
+    load.add_argument(
+        '--format',
+        type=UserImportFormat,
+        choices=[item.value for item in UserImportFormat],
+        help='По умолчанию - по расширению файла',
+    )
+    load.add_argument('--chunk-size', type=int, default=settings.USER_IMPORT_CHUNK_SIZE)
+
+    args = parser.parse_args(argv)
+    if args.command == 'reap-tokens':
+        asyncio.run(reap_tokens(args.batch_size, args.pause))
+    elif args.command == 'import-users':
+        import_format = args.format or UserImportFormat(
+            'csv' if args.path.suffix.lower() == '.csv' else 'ndjson',
+        )
+        asyncio.run(import_users(args.path, import_format, args.chunk_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Кэши: in-process LRU с TTL и асинхронные бэкенды для общих данных."""
+
+from collections import OrderedDict
+from datetime import datetime
+import json
+import time
+from typing import Any, Protocol
+
+
+class TTLCache[K, V]:
+    """LRU-кэш ограниченного размера со сроком жизни записей.
+
+    Срок жизни записи ограничен ttl кэша и, при необходимости,
+    собственным моментом истечения (unix timestamp).
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[V, float]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: K) -> V | None:
+        """Получить значение или None, если записи нет или она истекла."""
+        item = self._data.get(key)
+        if item is None:
+            self._misses += 1
+            return None
+
+        value, expires_at = item
+        if expires_at <= time.time():
+            del self._data[key]
+            self._misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: K, value: V, expires_at: float | None = None) -> None:
+        """Сохранить значение, вытеснив самую старую запись при переполнении."""
+        if self.maxsize <= 0:
+            return
+
+        deadline = float('inf') if expires_at is None else expires_at
+        if self.ttl is not None:
+            deadline = min(deadline, time.time() + self.ttl)
+
+        self._data[key] = (value, deadline)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: K) -> None:
+        """Удалить запись."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Очистить кэш."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        """Количество записей."""
+        return len(self._data)
+
+    def stats(self) -> dict[str, int]:
+        """Метрики кэша."""
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self._hits,
+            'misses': self._misses,
+        }
+
+
+class CacheBackend(Protocol):
+    """Асинхронное хранилище кэша."""
+
+    async def get(self, key: str) -> Any | None:
+        """Получить значение или None."""
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения."""
+
+
+class MemoryCacheBackend:
+    """Кэш в памяти процесса (у каждого воркера свой)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: TTLCache[str, Any] = TTLCache(maxsize)
+
+    async def get(self, key: str) -> Any | None:
+        """Получить значение или None."""
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+        self._cache.set(key, value, time.time() + ttl)
+
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения."""
+        for key in keys:
+            self._cache.delete(key)
+
+    def stats(self) -> dict[str, int]:
+        """Метрики кэша."""
+        return self._cache.stats()
+
+
+class RedisCacheBackend:
+    """Общий кэш в Redis (вытеснение - политикой maxmemory сервера).
+
+    Значения сериализуются в JSON (datetime - в ISO 8601): прочитанное
+    из Redis не исполняется, а типы восстанавливает владелец значения.
+    """
+
+    def __init__(self, url: str, timeout: float = 0.05) -> None:
+        from redis.asyncio import Redis  # noqa: PLC0415 - необязательная зависимость
+
+        self._redis = Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key: str) -> Any | None:
+        """Получить значение или None."""
+        data = await self._redis.get(key)
+        return None if data is None else json.loads(data)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """Сохранить значение на ttl секунд."""
+        data = json.dumps(value, separators=(',', ':'), default=_json_default)
+        await self._redis.set(key, data, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения."""
+        if keys:
+            await self._redis.delete(*keys)
+
+
+def _json_default(value: Any) -> Any:
+    """Значения, которые json не сериализует сам."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Тип {type(value).__name__} не сериализуется в кэш')
@@ -1,6 +1,17 @@
+from collections.abc import Callable
 import os
 
 
+def _optional[T](name: str, cast: Callable[[str], T]) -> T | None:
+    """Значение переменной окружения или None, если она не задана."""
+    value = os.getenv(name)
+    return None if value in (None, '') else cast(value)
+
+
+def _bool(value: str) -> bool:
+    return value.lower() in ('true', '1')
+
+
 class Settings:
     # DB_USER: str = os.getenv('DB_USER', '')
     # DB_PASSWORD: str = os.getenv('DB_PASSWORD', '')
@@ -10,12 +21,118 @@ class Settings:
     DB_ECHO: bool = os.getenv('DB_ECHO', 'false').lower() in ('true', '1')
     DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '5'))
     DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    # Профиль движка: default, performance или pgbouncer (transaction mode).
+    # Незаданные параметры ниже берутся из профиля (см. app.core.database)
+    DB_PROFILE: str = os.getenv('DB_PROFILE', 'default')
+    DB_POOL_PRE_PING: bool | None = _optional('DB_POOL_PRE_PING', _bool)
+    DB_POOL_USE_LIFO: bool | None = _optional('DB_POOL_USE_LIFO', _bool)
+    DB_POOL_RECYCLE: int | None = _optional('DB_POOL_RECYCLE', int)
+    DB_POOL_TIMEOUT: float | None = _optional('DB_POOL_TIMEOUT', float)
+    DB_STATEMENT_CACHE_SIZE: int | None = _optional('DB_STATEMENT_CACHE_SIZE', int)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int | None = _optional(
+        'DB_PREPARED_STATEMENT_CACHE_SIZE',
+        int,
+    )
+    DB_COMMAND_TIMEOUT: float | None = _optional('DB_COMMAND_TIMEOUT', float)
 
     JWT_SECRET: str = os.getenv('JWT_SECRET', '')
     JWT_ALGORITHM: str = os.getenv('JWT_ALGORITHM', '')
+    # Для RS*/PS*/ES*/EdDSA: каталог с ключами <kid>.pem и активный kid
+    JWT_KEYS_DIR: str | None = os.getenv('JWT_KEYS_DIR')
+    JWT_ACTIVE_KID: str | None = os.getenv('JWT_ACTIVE_KID')
+    # Временный ключ подписи без JWT_KEYS_DIR - только для разработки и тестов
+    JWT_ALLOW_EPHEMERAL_KEY: bool = _bool(os.getenv('JWT_ALLOW_EPHEMERAL_KEY', 'false'))
+    JWKS_MAX_AGE: int = int(os.getenv('JWKS_MAX_AGE', '300'))
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # Кэш проверенных access токенов
+    ACCESS_TOKEN_CACHE_SIZE: int = int(os.getenv('ACCESS_TOKEN_CACHE_SIZE', '10000'))
+    ACCESS_TOKEN_CACHE_TTL: int = int(os.getenv('ACCESS_TOKEN_CACHE_TTL', '60'))
+
+    # Отзыв access токенов: memory (в каждом процессе) или redis (pub/sub между процессами)
+    TOKEN_REVOCATION_BACKEND: str = os.getenv('TOKEN_REVOCATION_BACKEND', 'memory')
+    TOKEN_REVOCATION_URL: str = os.getenv('TOKEN_REVOCATION_URL', 'redis://localhost:6379/0')
+    TOKEN_REVOCATION_CHANNEL: str = os.getenv('TOKEN_REVOCATION_CHANNEL', 'auth:revocation')
+
+    # Отложенная запись сессий входа
+    SESSION_WRITER_INTERVAL: float = float(os.getenv('SESSION_WRITER_INTERVAL', '1'))
+    SESSION_WRITER_BUFFER_SIZE: int = int(os.getenv('SESSION_WRITER_BUFFER_SIZE', '10000'))
+
+    # Кэш строк репозиториев: none, memory (в каждом процессе) или redis (общий).
+    # memory - только для одного воркера: изменения, сделанные другим воркером,
+    # видны лишь через REPOSITORY_CACHE_TTL секунд (в том числе role и status)
+    REPOSITORY_CACHE_BACKEND: str = os.getenv('REPOSITORY_CACHE_BACKEND', 'none')
+    REPOSITORY_CACHE_URL: str = os.getenv('REPOSITORY_CACHE_URL', 'redis://localhost:6379/0')
+    REPOSITORY_CACHE_TTL: float = float(os.getenv('REPOSITORY_CACHE_TTL', '60'))
+    REPOSITORY_CACHE_SIZE: int = int(os.getenv('REPOSITORY_CACHE_SIZE', '10000'))
+
+    # Подсчет общего количества в paginate (count='estimate' / 'cached')
+    REPOSITORY_COUNT_ESTIMATE_MIN: int = int(os.getenv('REPOSITORY_COUNT_ESTIMATE_MIN', '10000'))
+    REPOSITORY_COUNT_CACHE_TTL: float = float(os.getenv('REPOSITORY_COUNT_CACHE_TTL', '10'))
+    REPOSITORY_COUNT_CACHE_SIZE: int = int(os.getenv('REPOSITORY_COUNT_CACHE_SIZE', '1000'))
+
+    # Поиск пользователей по email
+    USER_SEARCH_MIN_LENGTH: int = int(os.getenv('USER_SEARCH_MIN_LENGTH', '3'))
+    USER_SEARCH_MAX_RESULTS: int = int(os.getenv('USER_SEARCH_MAX_RESULTS', '100'))
+
+    # Потоковая выгрузка пользователей: строк в пачке серверного курсора
+    USER_EXPORT_BATCH_SIZE: int = int(os.getenv('USER_EXPORT_BATCH_SIZE', '1000'))
+
+    # Пакетные операции над пользователями: максимум ID в запросе
+    USER_BATCH_MAX_IDS: int = int(os.getenv('USER_BATCH_MAX_IDS', '1000'))
+
+    # Массовый импорт пользователей: строк в пачке и ошибок в отчете
+    USER_IMPORT_CHUNK_SIZE: int = int(os.getenv('USER_IMPORT_CHUNK_SIZE', '1000'))
+    USER_IMPORT_MAX_ERRORS: int = int(os.getenv('USER_IMPORT_MAX_ERRORS', '1000'))
+
+    # Кэш разбора User-Agent
+    USER_AGENT_CACHE_SIZE: int = int(os.getenv('USER_AGENT_CACHE_SIZE', '1024'))
+    USER_AGENT_PREWARM: bool = os.getenv('USER_AGENT_PREWARM', 'true').lower() in ('true', '1')
+    # Прогрев берет сессии за последние дни и прерывается по таймауту (секунды)
+    USER_AGENT_PREWARM_DAYS: int = int(os.getenv('USER_AGENT_PREWARM_DAYS', '7'))
+    USER_AGENT_PREWARM_TIMEOUT: float = float(os.getenv('USER_AGENT_PREWARM_TIMEOUT', '5'))
+
+    # Удаление истекших refresh токенов
+    TOKEN_REAPER_ENABLED: bool = os.getenv('TOKEN_REAPER_ENABLED', 'true').lower() in ('true', '1')
+    TOKEN_REAPER_INTERVAL: int = int(os.getenv('TOKEN_REAPER_INTERVAL', '3600'))
+    TOKEN_REAPER_BATCH_SIZE: int = int(os.getenv('TOKEN_REAPER_BATCH_SIZE', '1000'))
+    TOKEN_REAPER_PAUSE: float = float(os.getenv('TOKEN_REAPER_PAUSE', '0.1'))
+
+    # Задержка входа после неудачных попыток (по email, в памяти каждого воркера;
+    # MAX_KEYS - отдельно для незаблокированных и заблокированных ключей)
+    LOGIN_THROTTLE_FREE_ATTEMPTS: int = int(os.getenv('LOGIN_THROTTLE_FREE_ATTEMPTS', '5'))
+    LOGIN_THROTTLE_BASE_DELAY: float = float(os.getenv('LOGIN_THROTTLE_BASE_DELAY', '1'))
+    LOGIN_THROTTLE_MAX_DELAY: float = float(os.getenv('LOGIN_THROTTLE_MAX_DELAY', '900'))
+    LOGIN_THROTTLE_WINDOW: float = float(os.getenv('LOGIN_THROTTLE_WINDOW', '900'))
+    LOGIN_THROTTLE_MAX_KEYS: int = int(os.getenv('LOGIN_THROTTLE_MAX_KEYS', '100000'))
+
+    # Rate limiting: memory:// (в каждом процессе) или redis://host:6379/0 (общий)
+    RATE_LIMIT_STORAGE_URI: str = os.getenv('RATE_LIMIT_STORAGE_URI', 'memory://')
+    # sliding-window-counter, moving-window, fixed-window или gcra (только в памяти процесса)
+    RATE_LIMIT_STRATEGY: str = os.getenv('RATE_LIMIT_STRATEGY', 'sliding-window-counter')
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+    RATE_LIMIT_STORAGE_TIMEOUT: float = float(os.getenv('RATE_LIMIT_STORAGE_TIMEOUT', '0.05'))
+    RATE_LIMIT_FAIL_OPEN: bool = os.getenv('RATE_LIMIT_FAIL_OPEN', 'true').lower() in ('true', '1')
+    RATE_LIMIT_KEY_PREFIX: str = os.getenv('RATE_LIMIT_KEY_PREFIX', 'auth')
+
+    # Отложенная запись активности пользователей
+    ACTIVITY_FLUSH_INTERVAL: float = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', '5'))
+    ACTIVITY_BUFFER_SIZE: int = int(os.getenv('ACTIVITY_BUFFER_SIZE', '10000'))
+
+    # Пул для хэширования паролей: thread или process
+    PASSWORD_HASH_POOL: str = os.getenv('PASSWORD_HASH_POOL', 'thread')
+    PASSWORD_HASH_WORKERS: int = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', '64'))
+
+    # Cost-фактор bcrypt: один для всех процессов; подбор под бюджет времени
+    # при старте - только явно (BCRYPT_CALIBRATE), например для выбора значения
+    BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    BCRYPT_CALIBRATE: bool = os.getenv('BCRYPT_CALIBRATE', 'false').lower() in ('true', '1')
+    BCRYPT_MIN_ROUNDS: int = int(os.getenv('BCRYPT_MIN_ROUNDS', '10'))
+    BCRYPT_MAX_ROUNDS: int = int(os.getenv('BCRYPT_MAX_ROUNDS', '14'))
+    PASSWORD_HASH_TARGET_MS: int = int(os.getenv('PASSWORD_HASH_TARGET_MS', '250'))
+
     DATABASE_URL: str = os.getenv('DATABASE_URL', '')
 
     @property
@@ -1,17 +1,113 @@
+"""Асинхронный движок БД и фабрика сессий.
+
+Параметры пула и драйвера asyncpg задаются профилем DB_PROFILE:
+
+- default - проверка соединения (pre-ping) при каждой выдаче из пула;
+- performance - без pre-ping: разорванное соединение дает ошибку одного
+  запроса, после чего SQLAlchemy сбрасывает пул и переподключается;
+  LIFO-пул и увеличенные кэши prepared statements;
+- pgbouncer - для PgBouncer в transaction mode: кэши prepared statements
+  отключены, имена подготовленных запросов уникальны (соединение с
+  сервером меняется между транзакциями).
+
+Отдельные параметры переопределяются настройками DB_* (см. config).
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any
+from uuid import uuid4
+
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+
+@dataclass(frozen=True, slots=True)
+class EngineProfile:
+    """Параметры пула и драйвера asyncpg."""
+
+    pool_pre_ping: bool = True
+    pool_use_lifo: bool = False
+    pool_recycle: int = 3600
+    pool_timeout: float = 30
+    # Кэш prepared statements asyncpg (на соединение)
+    statement_cache_size: int = 100
+    # Кэш prepared statements диалекта SQLAlchemy (на соединение)
+    prepared_statement_cache_size: int = 100
+    command_timeout: float | None = None
+    unique_statement_names: bool = False
+
+    def engine_kwargs(self) -> dict[str, Any]:
+        """Аргументы create_async_engine."""
+        connect_args: dict[str, Any] = {
+            'statement_cache_size': self.statement_cache_size,
+            'prepared_statement_cache_size': self.prepared_statement_cache_size,
+            'command_timeout': self.command_timeout,
+        }
+        if self.unique_statement_names:
+            connect_args['prepared_statement_name_func'] = _statement_name
+
+        return {
+            'pool_pre_ping': self.pool_pre_ping,
+            'pool_use_lifo': self.pool_use_lifo,
+            'pool_recycle': self.pool_recycle,
+            'pool_timeout': self.pool_timeout,
+            'connect_args': connect_args,
+        }
+
+
+ENGINE_PROFILES = {
+    'default': EngineProfile(),
+    'performance': EngineProfile(
+        pool_pre_ping=False,
+        pool_use_lifo=True,
+        statement_cache_size=500,
+        prepared_statement_cache_size=500,
+    ),
+    'pgbouncer': EngineProfile(
+        pool_pre_ping=False,
+        pool_use_lifo=True,
+        statement_cache_size=0,
+        prepared_statement_cache_size=0,
+        unique_statement_names=True,
+    ),
+}
+
+
+def engine_profile(name: str) -> EngineProfile:
+    """Профиль по имени с переопределениями из настроек DB_*."""
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f'Неизвестный профиль БД: {name}')
+
+    overrides = {
+        'pool_pre_ping': settings.DB_POOL_PRE_PING,
+        'pool_use_lifo': settings.DB_POOL_USE_LIFO,
+        'pool_recycle': settings.DB_POOL_RECYCLE,
+        'pool_timeout': settings.DB_POOL_TIMEOUT,
+        'statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+        'prepared_statement_cache_size': settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        'command_timeout': settings.DB_COMMAND_TIMEOUT,
+    }
+    return replace(
+        ENGINE_PROFILES[name],
+        **{field: value for field, value in overrides.items() if value is not None},
+    )
+
+
+def _statement_name() -> str:
+    """Уникальное имя prepared statement (для PgBouncer)."""
+    return f'__asyncpg_{uuid4()}__'
+
+
 # Создание асинхронного движка
 async_engine = create_async_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=3600,
     pool_size=settings.DB_POOL_SIZE,
     max_overflow=settings.DB_MAX_OVERFLOW,
     echo=settings.DB_ECHO,
     future=True,
+    **engine_profile(settings.DB_PROFILE).engine_kwargs(),
 )
 
 # Настройка асинхронной сессии
@@ -30,6 +30,10 @@ def service_exception_handler(
                 raise NotFoundException(str(e)) from e
             except ConflictError as e:
                 raise ConflictException(str(e)) from e
+            except TooManyRequestsError as e:
+                raise TooManyRequestsException(str(e), e.retry_after) from e
+            except ServiceOverloadedError as e:
+                raise ServiceUnavailableException(str(e)) from e
             except PydanticValidationError as e:
                 # Сбор всех ошибок валидации в одну строку
                 errors = [err['msg'] for err in e.errors()]
@@ -101,6 +105,28 @@ class ValidationException(HTTPException):
         )
 
 
+class TooManyRequestsException(HTTPException):
+    """429 - Слишком много запросов."""
+
+    def __init__(self, detail: str = 'Слишком много запросов', retry_after: int = 1) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={'Retry-After': str(retry_after)},
+        )
+
+
+class ServiceUnavailableException(HTTPException):
+    """503 - Сервис временно недоступен."""
+
+    def __init__(self, detail: str = 'Сервис временно недоступен') -> None:
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={'Retry-After': '1'},
+        )
+
+
 class BusinessError(Exception):
     """Базовое бизнес-исключение."""
 
@@ -142,3 +168,18 @@ class ValidationError(BusinessError):
 
     def __init__(self, message: str) -> None:
         super().__init__(message)
+
+
+class TooManyRequestsError(BusinessError):
+    """Слишком много попыток, повторить можно через retry_after секунд."""
+
+    def __init__(self, message: str = 'Слишком много попыток', retry_after: int = 1) -> None:
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class ServiceOverloadedError(BusinessError):
+    """Сервис перегружен."""
+
+    def __init__(self, message: str = 'Сервис перегружен, повторите попытку позже') -> None:
+        super().__init__(message)
@@ -0,0 +1,113 @@
+"""Rate limiter GCRA в памяти процесса.
+
+Generic Cell Rate Algorithm: на каждый ключ хранится одно число -
+теоретическое время следующего запроса (TAT). Лимит N за период P
+допускает всплеск до N запросов, затем - один запрос каждые P/N.
+
+Ключи разбиты на шарды, очистка проходит по одному шарду за раз:
+ключ с TAT в прошлом эквивалентен отсутствующему и удаляется.
+При переполнении шарда вытесняется давно не использованный ключ (LRU).
+Блокировок нет: проверки выполняются в потоке event loop.
+"""
+
+from collections import OrderedDict
+from math import floor
+import time
+
+from limits import RateLimitItem, WindowStats
+from limits.storage import MemoryStorage, Storage
+from limits.strategies import RateLimiter
+
+
+class GCRARateLimiter(RateLimiter):
+    """Стратегия limits на основе GCRA с шардированным состоянием."""
+
+    def __init__(
+        self,
+        storage: Storage | None = None,
+        shards: int = 64,
+        max_keys: int = 100_000,
+        sweep_every: int = 1024,
+    ) -> None:
+        # Хранилище нужно только интерфейсу slowapi (reset/check)
+        super().__init__(storage or MemoryStorage())
+        self._shards: list[OrderedDict[str, float]] = [OrderedDict() for _ in range(shards)]
+        self._shard_max_keys = max(1, max_keys // shards)
+        self._sweep_every = sweep_every
+        self._sweep_shard = 0
+        self._hits = 0
+        self._evicted = 0
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """Учесть запрос, если лимит позволяет."""
+        key = item.key_for(*identifiers)
+        shard = self._shards[hash(key) % len(self._shards)]
+        period = item.get_expiry()
+        now = time.monotonic()
+
+        tat = max(shard.get(key, now), now)
+        new_tat = tat + period / item.amount * cost
+        if new_tat - now > period:
+            return False
+
+        if key not in shard and len(shard) >= self._shard_max_keys:
+            self._make_room(shard, now)
+        shard[key] = new_tat
+        shard.move_to_end(key)
+
+        self._hits += 1
+        if self._hits % self._sweep_every == 0:
+            self._sweep_next(now)
+        return True
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """Проверить лимит без учета запроса."""
+        key = item.key_for(*identifiers)
+        now = time.monotonic()
+        tat = max(self._shards[hash(key) % len(self._shards)].get(key, now), now)
+        return tat + item.get_expiry() / item.amount * cost - now <= item.get_expiry()
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str) -> WindowStats:
+        """Время сброса и остаток лимита."""
+        key = item.key_for(*identifiers)
+        now = time.monotonic()
+        tat = max(self._shards[hash(key) % len(self._shards)].get(key, now), now)
+        interval = item.get_expiry() / item.amount
+        remaining = floor((item.get_expiry() - (tat - now)) / interval)
+        return WindowStats(time.time() + (tat - now), max(0, min(item.amount, remaining)))
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        """Сбросить лимит ключа."""
+        key = item.key_for(*identifiers)
+        self._shards[hash(key) % len(self._shards)].pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        """Метрики состояния."""
+        return {
+            'keys': sum(len(shard) for shard in self._shards),
+            'max_keys': self._shard_max_keys * len(self._shards),
+            'evicted': self._evicted,
+        }
+
+    def _sweep_next(self, now: float) -> None:
+        """Очистить следующий по кругу шард."""
+        self._sweep(self._shards[self._sweep_shard], now)
+        self._sweep_shard = (self._sweep_shard + 1) % len(self._shards)
+
+    @staticmethod
+    def _sweep(shard: OrderedDict[str, float], now: float) -> None:
+        """Удалить ключи, лимит которых полностью восстановился."""
+        for key in [key for key, tat in shard.items() if tat <= now]:
+            del shard[key]
+
+    def _make_room(self, shard: OrderedDict[str, float], now: float) -> None:
+        """Освободить место в заполненном шарде.
+
+        Если все ключи активны, вытесняется дольше всех не обращавшийся
+        (например, при переборе IP адресов) - память остается ограниченной,
+        а активные клиенты сохраняют свой лимит.
+        """
+        self._sweep(shard, now)
+        if len(shard) >= self._shard_max_keys:
+            shard.popitem(last=False)
+            self._evicted += 1
@@ -0,0 +1,263 @@
+"""Ключи подписи JWT и их публикация в формате JWKS.
+
+Для HS* алгоритмов используется общий секрет JWT_SECRET.
+Для асимметричных (RS*, PS*, ES*, EdDSA) токены подписываются закрытым
+ключом с заголовком kid, а открытые ключи публикуются через JWKS,
+чтобы остальные сервисы проверяли токены локально.
+
+Ротация через каталог JWT_KEYS_DIR: файл <kid>.pem на каждый ключ,
+порядок ключей - по kid (имени файла). Подписывает ключ JWT_ACTIVE_KID
+(обязателен, если ключей несколько). Ключи после него публикуются
+заранее, до него - пока не истекут подписанные ими токены.
+
+Без JWT_KEYS_DIR запуск невозможен: временный ключ у каждого процесса
+свой, и токены не проверялись бы другими процессами и после перезапуска.
+Для разработки и тестов его разрешает JWT_ALLOW_EPHEMERAL_KEY.
+"""
+
+import base64
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+from pathlib import Path
+import time
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+import jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Обязательные поля JWK для вычисления thumbprint (RFC 7638)
+_THUMBPRINT_MEMBERS = {
+    'RSA': ('e', 'kty', 'n'),
+    'EC': ('crv', 'kty', 'x', 'y'),
+    'OKP': ('crv', 'kty', 'x'),
+}
+
+_EC_CURVES = {
+    'ES256': ec.SECP256R1,
+    'ES384': ec.SECP384R1,
+    'ES512': ec.SECP521R1,
+}
+
+
+@dataclass(slots=True)
+class SigningKey:
+    """Ключ подписи с идентификатором."""
+
+    kid: str
+    private_key: Any
+    public_key: Any
+    retired_at: float | None = None
+
+
+class KeyRing:
+    """Набор ключей: активный для подписи и опубликованные для проверки."""
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret: str = '',
+        retention: float = 0,
+        keys_dir: str | None = None,
+        active_kid: str | None = None,
+        *,
+        allow_ephemeral: bool = False,
+    ) -> None:
+        self.algorithm = algorithm
+        self.secret = secret
+        self.retention = retention
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.allow_ephemeral = allow_ephemeral
+        self._keys: dict[str, SigningKey] = {}
+        self._active: SigningKey | None = None
+        self._loaded = False
+        self._jwks: tuple[tuple[str, ...], bytes, str] | None = None
+
+    @property
+    def asymmetric(self) -> bool:
+        """Используется ли асимметричный алгоритм."""
+        return not self.algorithm.startswith('HS')
+
+    @property
+    def active(self) -> SigningKey:
+        """Текущий ключ подписи."""
+        self._ensure_loaded()
+        return self._active
+
+    def signing_params(self) -> tuple[Any, dict[str, str] | None]:
+        """Ключ и заголовки для jwt.encode."""
+        if not self.asymmetric:
+            return self.secret, None
+
+        key = self.active
+        return key.private_key, {'kid': key.kid}
+
+    def verification_key(self, token: str) -> Any:
+        """Ключ для проверки токена по kid из его заголовка."""
+        if not self.asymmetric:
+            return self.secret
+
+        kid = jwt.get_unverified_header(token).get('kid')
+        key = self.get(kid) if kid else None
+        if key is None:
+            raise jwt.InvalidTokenError('Неизвестный kid')
+        return key.public_key
+
+    def get(self, kid: str) -> SigningKey | None:
+        """Опубликованный ключ по kid."""
+        self._ensure_loaded()
+        self._prune()
+        return self._keys.get(kid)
+
+    def add(
+        self,
+        private_key: Any,
+        kid: str | None = None,
+        *,
+        active: bool = True,
+        retired_at: float | None = None,
+    ) -> SigningKey:
+        """Добавить ключ (по умолчанию - сделать его активным).
+
+        Набор, заполненный вручную, больше не загружается из настроек.
+        """
+        self._loaded = True
+        public_key = private_key.public_key()
+        key = SigningKey(
+            kid=kid or self._thumbprint(public_key),
+            private_key=private_key,
+            public_key=public_key,
+            retired_at=retired_at,
+        )
+        self._keys[key.kid] = key
+        if active:
+            self._active = key
+        self._jwks = None
+        return key
+
+    def rotate(self, private_key: Any | None = None, kid: str | None = None) -> SigningKey:
+        """Сменить активный ключ, оставив прежний опубликованным до истечения его токенов."""
+        self._ensure_loaded()
+        if self._active is not None:
+            self._active.retired_at = time.time()
+        return self.add(private_key or generate_private_key(self.algorithm), kid)
+
+    def jwks(self) -> tuple[bytes, str]:
+        """JWKS документ и его ETag."""
+        self._ensure_loaded()
+        self._prune()
+
+        kids = tuple(self._keys)
+        if self._jwks is None or self._jwks[0] != kids:
+            keys = [self._public_jwk(key) for key in self._keys.values()]
+            body = json.dumps({'keys': keys}, separators=(',', ':')).encode()
+            etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+            self._jwks = (kids, body, etag)
+
+        return self._jwks[1], self._jwks[2]
+
+    def load(self) -> None:
+        """Загрузить ключи сейчас (при старте), а не при первом обращении."""
+        self._ensure_loaded()
+
+    def load_dir(self, path: str) -> None:
+        """Загрузить ключи из каталога (<kid>.pem, порядок - по kid)."""
+        files = sorted(Path(path).glob('*.pem'), key=lambda f: f.stem)
+        if not files:
+            raise RuntimeError(f'В каталоге {path} нет ключей подписи')
+
+        kids = [f.stem for f in files]
+        if self.active_kid is None and len(kids) > 1:
+            raise RuntimeError(f'В каталоге {path} несколько ключей: нужен JWT_ACTIVE_KID')
+        active_kid = self.active_kid or kids[0]
+        if active_kid not in kids:
+            raise RuntimeError(f'Ключ {active_kid} не найден в каталоге {path}')
+        active_index = kids.index(active_kid)
+
+        # Время вывода прежних ключей неизвестно: они опубликованы еще retention
+        # от загрузки, пока их файлы не удалят из каталога
+        loaded_at = time.time()
+        for index, file in enumerate(files):
+            private_key = serialization.load_pem_private_key(file.read_bytes(), password=None)
+            retired_at = loaded_at if index < active_index else None
+            self.add(private_key, file.stem, active=index == active_index, retired_at=retired_at)
+
+    def _ensure_loaded(self) -> None:
+        """Ленивая загрузка ключей при первом обращении."""
+        if self._loaded or not self.asymmetric:
+            return
+
+        if self.keys_dir:
+            self.load_dir(self.keys_dir)
+        elif self.allow_ephemeral:
+            logger.warning('JWT_KEYS_DIR не задан: используется временный ключ подписи')
+            self.add(generate_private_key(self.algorithm))
+        else:
+            raise RuntimeError(
+                f'Для {self.algorithm} нужен JWT_KEYS_DIR '
+                '(временный ключ - только с JWT_ALLOW_EPHEMERAL_KEY=true)',
+            )
+        self._loaded = True
+
+    def _prune(self) -> None:
+        """Убрать выведенные ключи, все токены которых уже истекли."""
+        now = time.time()
+        expired = [
+            kid
+            for kid, key in self._keys.items()
+            if key.retired_at is not None and key.retired_at + self.retention < now
+        ]
+        for kid in expired:
+            del self._keys[kid]
+
+    def _public_jwk(self, key: SigningKey) -> dict[str, Any]:
+        """Открытый ключ в формате JWK."""
+        jwk = self._to_jwk(key.public_key)
+        jwk.pop('key_ops', None)
+        jwk.update(kid=key.kid, alg=self.algorithm, use='sig')
+        return jwk
+
+    def _thumbprint(self, public_key: Any) -> str:
+        """JWK thumbprint открытого ключа (RFC 7638)."""
+        jwk = self._to_jwk(public_key)
+        members = {name: jwk[name] for name in _THUMBPRINT_MEMBERS[jwk['kty']]}
+        digest = hashlib.sha256(
+            json.dumps(members, separators=(',', ':'), sort_keys=True).encode(),
+        ).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
+
+    def _to_jwk(self, public_key: Any) -> dict[str, Any]:
+        """Открытый ключ в формате JWK (без kid)."""
+        return jwt.get_algorithm_by_name(self.algorithm).to_jwk(public_key, as_dict=True)
+
+
+def generate_private_key(algorithm: str) -> Any:
+    """Сгенерировать закрытый ключ для алгоритма."""
+    if algorithm == 'EdDSA':
+        return ed25519.Ed25519PrivateKey.generate()
+    if algorithm in _EC_CURVES:
+        return ec.generate_private_key(_EC_CURVES[algorithm]())
+    if algorithm.startswith(('RS', 'PS')):
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    raise ValueError(f'Неподдерживаемый алгоритм: {algorithm}')
+
+
+keyring = KeyRing(
+    algorithm=settings.JWT_ALGORITHM,
+    secret=settings.JWT_SECRET,
+    # Refresh токены проверяются этим же набором ключей
+    retention=max(
+        settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    ),
+    keys_dir=settings.JWT_KEYS_DIR,
+    active_kid=settings.JWT_ACTIVE_KID,
+    allow_ephemeral=settings.JWT_ALLOW_EPHEMERAL_KEY,
+)
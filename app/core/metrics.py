@@ -0,0 +1,27 @@
+"""Внутренние метрики сервиса.
+
+Компоненты хранят собственные счетчики и регистрируют функцию,
+которая возвращает их текущие значения.
+"""
+
+from collections.abc import Callable
+
+type Collector = Callable[[], dict[str, int | float]]
+
+
+class MetricsRegistry:
+    """Реестр источников метрик."""
+
+    def __init__(self) -> None:
+        self._collectors: dict[str, Collector] = {}
+
+    def register(self, name: str, collector: Collector) -> None:
+        """Зарегистрировать источник метрик под именем."""
+        self._collectors[name] = collector
+
+    def snapshot(self) -> dict[str, dict[str, int | float]]:
+        """Текущие значения всех метрик."""
+        return {name: collector() for name, collector in self._collectors.items()}
+
+
+metrics = MetricsRegistry()
@@ -2,21 +2,164 @@
 
 Использует IP адрес для идентификации клиента.
 Требует request: Request в роутах
+
+Счетчики хранятся в RATE_LIMIT_STORAGE_URI: memory:// - отдельно
+в каждом процессе, redis:// - общие для всех воркеров и подов
+(sliding window считается Lua скриптом - атомарно, за один запрос).
+RATE_LIMIT_STRATEGY=gcra - GCRA в памяти процесса, быстрее memory://
+для одного узла (см. app.core.gcra).
+При недоступном или медленном хранилище запросы пропускаются
+без ограничения (RATE_LIMIT_FAIL_OPEN), ошибки видны в метриках.
 """
 
-# TODO: Redis
+from collections.abc import Callable
+import logging
+import time
+from typing import Any
 
 from fastapi import Request
+from limits import RateLimitItem, WindowStats
+from limits.strategies import RateLimiter
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from app.core.config import settings
+from app.core.gcra import GCRARateLimiter
+from app.core.metrics import metrics
 from app.core.utils import get_real_ip
 
+logger = logging.getLogger(__name__)
+
 
 def get_ip(request: Request) -> str:
+    """IP адрес клиента - ключ лимита."""
     ip = get_real_ip(request)
 
     return ip if ip else get_remote_address(request)
 
 
-limiter = Limiter(key_func=get_ip)
+class InstrumentedRateLimiter(RateLimiter):
+    """Обертка стратегии limits со счетчиками обращений к хранилищу.
+
+    При fail_open ошибка хранилища не прерывает запрос: он пропускается
+    без ограничения (swallow_errors в slowapi для декорированных
+    эндпоинтов приводит к AttributeError).
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        slow_threshold: float,
+        *,
+        fail_open: bool = True,
+    ) -> None:
+        super().__init__(limiter.storage)
+        self.limiter = limiter
+        self.slow_threshold = slow_threshold
+        self.fail_open = fail_open
+        self._calls = 0
+        self._errors = 0
+        self._slow = 0
+        self._rejected = 0
+        self._time = 0.0
+
+    def hit(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """Учесть запрос; при отказе - счетчик rejected."""
+        allowed = self._call(self.limiter.hit, item, *identifiers, cost=cost, fallback=True)
+        if not allowed:
+            self._rejected += 1
+        return allowed
+
+    def test(self, item: RateLimitItem, *identifiers: str, cost: int = 1) -> bool:
+        """Проверить лимит без учета запроса."""
+        return self._call(self.limiter.test, item, *identifiers, cost=cost, fallback=True)
+
+    def get_window_stats(self, item: RateLimitItem, *identifiers: str) -> WindowStats:
+        """Время сброса и остаток лимита (при ошибке - полный лимит)."""
+        fallback = WindowStats(time.time() + item.get_expiry(), item.amount)
+        return self._call(self.limiter.get_window_stats, item, *identifiers, fallback=fallback)
+
+    def clear(self, item: RateLimitItem, *identifiers: str) -> None:
+        """Сбросить лимит ключа."""
+        return self._call(self.limiter.clear, item, *identifiers, fallback=None)
+
+    def stats(self) -> dict[str, int | float]:
+        """Метрики обращений к хранилищу."""
+        return {
+            'calls': self._calls,
+            'errors': self._errors,
+            'slow': self._slow,
+            'rejected': self._rejected,
+            'avg_ms': round(self._time / self._calls * 1000, 3) if self._calls else 0.0,
+        }
+
+    def _call[T](
+        self,
+        func: Callable[..., T],
+        *args: object,
+        fallback: T,
+        **kwargs: object,
+    ) -> T:
+        """Вызов хранилища с замером времени; при ошибке - fallback (fail open)."""
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            self._errors += 1
+            if not self.fail_open:
+                raise
+            logger.warning('Хранилище rate limit недоступно, запрос пропущен: %r', e)
+            return fallback
+        finally:
+            elapsed = time.perf_counter() - start
+            self._calls += 1
+            self._time += elapsed
+            if elapsed > self.slow_threshold:
+                self._slow += 1
+
+
+class InstrumentedLimiter(Limiter):
+    """Limiter slowapi с подменяемой стратегией.
+
+    slowapi обращается к стратегии только через свойство limiter,
+    поэтому стратегия подменяется через него, а не через приватный
+    атрибут (версия slowapi закреплена в requirements.txt).
+    """
+
+    strategy: RateLimiter | None = None
+
+    @property
+    def limiter(self) -> RateLimiter:
+        """Стратегия проверки лимитов (по умолчанию - стратегия slowapi)."""
+        return self.strategy or super().limiter
+
+
+def _storage_options(uri: str, timeout: float) -> dict[str, Any]:
+    """Таймауты для сетевых хранилищ: медленное хранилище = недоступное."""
+    if uri.startswith(('redis', 'rediss', 'valkey')):
+        return {'socket_timeout': timeout, 'socket_connect_timeout': timeout}
+    return {}
+
+
+_gcra = settings.RATE_LIMIT_STRATEGY == 'gcra'
+_storage_uri = 'memory://' if _gcra else settings.RATE_LIMIT_STORAGE_URI
+
+limiter = InstrumentedLimiter(
+    key_func=get_ip,
+    strategy=None if _gcra else settings.RATE_LIMIT_STRATEGY,
+    storage_uri=_storage_uri,
+    storage_options=_storage_options(_storage_uri, settings.RATE_LIMIT_STORAGE_TIMEOUT),
+    key_prefix=settings.RATE_LIMIT_KEY_PREFIX,
+)
+
+_strategy = limiter.limiter
+if _gcra:
+    _strategy = GCRARateLimiter(_strategy.storage, max_keys=settings.RATE_LIMIT_MAX_KEYS)
+    metrics.register('rate_limit_gcra', _strategy.stats)
+
+limiter.strategy = InstrumentedRateLimiter(
+    _strategy,
+    settings.RATE_LIMIT_STORAGE_TIMEOUT,
+    fail_open=settings.RATE_LIMIT_FAIL_OPEN,
+)
+metrics.register('rate_limit', limiter.strategy.stats)
@@ -9,7 +9,9 @@ RESPONSES = {
     404: {'model': ErrorResponse},
     409: {'model': ErrorResponse},
     422: {'model': ErrorResponse},
+    429: {'model': ErrorResponse},
     500: {'model': ErrorResponse},
+    503: {'model': ErrorResponse},
 }
 
 
@@ -19,7 +21,7 @@ def get_responses(*codes: int) -> dict:
     return {code: RESPONSES[code] for code in codes if code not in skip}
 
 
-POST_RESPONSES = get_responses(400, 401, 403, 404, 409, 500)
+POST_RESPONSES = get_responses(400, 401, 403, 404, 409, 429, 500, 503)
 GET_RESPONSES = get_responses(400, 401, 403, 404, 500)
 PUT_RESPONSES = get_responses(400, 401, 403, 404, 409, 500)
 DELETE_RESPONSES = get_responses(400, 401, 403, 404, 500)
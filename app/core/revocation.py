@@ -0,0 +1,218 @@
+"""Отзыв access токенов без запросов к БД.
+
+Для пользователя хранится момент отзыва (cutoff): access токены,
+выданные не позже него (iat <= cutoff), отклоняются. Карта cutoff
+живет в памяти каждого процесса и синхронизируется через канал
+pub/sub (TOKEN_REVOCATION_BACKEND: memory - в пределах процесса,
+redis - между воркерами и подами). Запись нужна только пока жив
+выданный до отзыва access токен, поэтому карта остается компактной.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Sequence
+import contextlib
+import functools
+import json
+import logging
+import time
+from typing import Any, Protocol
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+type Revocation = tuple[list[int], float]
+
+
+class RevocationBroker(Protocol):
+    """Канал рассылки отзывов между процессами."""
+
+    async def publish(self, user_ids: list[int], cutoff: float, ttl: float) -> None:
+        """Разослать отзыв токенов пользователей."""
+
+    async def snapshot(self, since: float) -> dict[int, float]:
+        """Действующие отзывы (cutoff не раньше since) - при подключении."""
+
+    def listen(self) -> AsyncIterator[Revocation | None]:
+        """Поток отзывов от всех процессов.
+
+        Первым элементом приходит None - подписка оформлена, и снимок,
+        взятый после него, не пропустит отзывов.
+        """
+
+
+class MemoryRevocationBroker:
+    """Канал в памяти процесса (один воркер и тесты).
+
+    Как и Redis, хранит действующие отзывы для снимка.
+    """
+
+    def __init__(self) -> None:
+        self._queues: set[asyncio.Queue[Revocation]] = set()
+        self._cutoffs: dict[int, float] = {}
+
+    async def publish(self, user_ids: list[int], cutoff: float, ttl: float) -> None:
+        """Сохранить отзыв и разослать его подписчикам процесса."""
+        for user_id in user_ids:
+            self._cutoffs[user_id] = max(cutoff, self._cutoffs.get(user_id, cutoff))
+        expired = cutoff - ttl
+        self._cutoffs = {key: value for key, value in self._cutoffs.items() if value >= expired}
+
+        for queue in self._queues:
+            queue.put_nowait((user_ids, cutoff))
+
+    async def snapshot(self, since: float) -> dict[int, float]:
+        """Действующие отзывы."""
+        return {key: value for key, value in self._cutoffs.items() if value >= since}
+
+    async def listen(self) -> AsyncIterator[Revocation | None]:
+        """Поток отзывов (первым - None после подписки)."""
+        queue: asyncio.Queue[Revocation] = asyncio.Queue()
+        self._queues.add(queue)
+        try:
+            yield None
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.discard(queue)
+
+
+class RedisRevocationBroker:
+    """Канал Redis pub/sub.
+
+    Действующие отзывы дополнительно хранятся в sorted set (score - cutoff),
+    чтобы новый или переподключившийся процесс получил пропущенные.
+    """
+
+    def __init__(self, url: str, channel: str) -> None:
+        from redis.asyncio import Redis  # noqa: PLC0415 - необязательная зависимость
+
+        self._redis = Redis.from_url(url)
+        self.channel = channel
+
+    async def publish(self, user_ids: list[int], cutoff: float, ttl: float) -> None:
+        """Сохранить отзыв и разослать его (одной транзакцией)."""
+        message = json.dumps({'ids': user_ids, 'cutoff': cutoff})
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.channel, dict.fromkeys(map(str, user_ids), cutoff), gt=True)
+            pipe.zremrangebyscore(self.channel, '-inf', f'({cutoff - ttl}')
+            pipe.publish(self.channel, message)
+            await pipe.execute()
+
+    async def snapshot(self, since: float) -> dict[int, float]:
+        """Действующие отзывы из sorted set."""
+        items = await self._redis.zrangebyscore(self.channel, since, '+inf', withscores=True)
+        return {int(user_id): cutoff for user_id, cutoff in items}
+
+    async def listen(self) -> AsyncIterator[Revocation | None]:
+        """Поток отзывов из канала (первым - None после подписки)."""
+        async with self._redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(self.channel)
+            yield None
+            async for message in pubsub.listen():
+                data = json.loads(message['data'])
+                yield data['ids'], data['cutoff']
+
+
+class TokenRevocation:
+    """Карта отзывов access токенов в памяти процесса."""
+
+    def __init__(self, broker: RevocationBroker, ttl: float, retry_delay: float = 1.0) -> None:
+        self.broker = broker
+        self.ttl = ttl
+        self.retry_delay = retry_delay
+        self._cutoffs: dict[int, float] = {}
+        self._task: asyncio.Task | None = None
+        self._rejected = 0
+        self._errors = 0
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        """Отозван ли токен (токены без iat выданы до отзыва)."""
+        cutoff = self._cutoffs.get(int(payload['sub']))
+        if cutoff is None or payload.get('iat', 0) > cutoff:
+            return False
+
+        self._rejected += 1
+        return True
+
+    async def revoke(self, user_ids: Sequence[int]) -> None:
+        """Отозвать все выданные пользователям access токены.
+
+        В своем процессе отзыв действует сразу, в остальных - по
+        получении из канала. Ошибка канала не прерывает запрос.
+        """
+        if not user_ids:
+            return
+
+        user_ids = list(user_ids)
+        cutoff = time.time()
+        self._apply(dict.fromkeys(user_ids, cutoff))
+        try:
+            await self.broker.publish(user_ids, cutoff, self.ttl)
+        except Exception:
+            self._errors += 1
+            logger.exception('Ошибка рассылки отзыва токенов')
+
+    def start(self) -> None:
+        """Запустить получение отзывов из канала."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name='token-revocation')
+
+    async def stop(self) -> None:
+        """Остановить получение отзывов."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def stats(self) -> dict[str, int]:
+        """Метрики отзывов."""
+        return {
+            'size': len(self._cutoffs),
+            'rejected': self._rejected,
+            'errors': self._errors,
+        }
+
+    async def _run(self) -> None:
+        """Получать отзывы, переподключаясь при ошибках канала."""
+        while True:
+            try:
+                async for item in self.broker.listen():
+                    if item is None:
+                        # Снимок - после подписки: отзыв между ними придет из канала
+                        self._apply(await self.broker.snapshot(time.time() - self.ttl))
+                        continue
+                    user_ids, cutoff = item
+                    self._apply(dict.fromkeys(user_ids, cutoff))
+            except Exception:
+                self._errors += 1
+                logger.exception('Ошибка канала отзыва токенов')
+            await asyncio.sleep(self.retry_delay)
+
+    def _apply(self, cutoffs: dict[int, float]) -> None:
+        """Записать отзывы и убрать записи, переживших все свои токены."""
+        for user_id, cutoff in cutoffs.items():
+            self._cutoffs[user_id] = max(cutoff, self._cutoffs.get(user_id, cutoff))
+
+        expired = time.time() - self.ttl
+        for user_id in [user_id for user_id, value in self._cutoffs.items() if value < expired]:
+            del self._cutoffs[user_id]
+
+
+@functools.cache
+def _broker() -> RevocationBroker:
+    """Канал отзывов по настройкам."""
+    if settings.TOKEN_REVOCATION_BACKEND == 'redis':
+        return RedisRevocationBroker(
+            settings.TOKEN_REVOCATION_URL,
+            settings.TOKEN_REVOCATION_CHANNEL,
+        )
+    return MemoryRevocationBroker()
+
+
+token_revocation = TokenRevocation(_broker(), ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+metrics.register('token_revocation', token_revocation.stats)
@@ -1,30 +1,121 @@
 # TODO: Логирование для мониторинга атак.
 
 from datetime import UTC, datetime, timedelta
+import functools
+import hashlib
+import secrets
+import time
 from typing import Any
 
 import jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings as s
 from app.core.exceptions import AuthenticationError
+from app.core.keys import keyring
+from app.core.metrics import metrics
+from app.core.workers import password_hash_pool
 from app.schemas import UserSchema
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+
+@functools.cache
+def _crypt_context(rounds: int) -> CryptContext:
+    """Контекст passlib с минимальным cost-фактором.
+
+    Устаревшими считаются только хэши с меньшим cost-фактором: хэши
+    с большим не понижаются (иначе процессы с разным cost-фактором
+    перехэшировали бы пароли друг за другом).
+    """
+    return CryptContext(
+        schemes=['bcrypt'],
+        deprecated='auto',
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+class PasswordHashPolicy:
+    """Политика хэширования паролей (cost-фактор bcrypt)."""
+
+    def __init__(self, rounds: int) -> None:
+        self.rounds = rounds
+
+    @property
+    def context(self) -> CryptContext:
+        """Контекст passlib для текущего cost-фактора."""
+        return _crypt_context(self.rounds)
+
+    def calibrate(self, target_ms: int, min_rounds: int, max_rounds: int) -> int:
+        """Подобрать максимальный cost-фактор, укладывающийся в бюджет времени.
+
+        Каждый следующий раунд удваивает время хэширования, поэтому
+        достаточно замерить самый дешевый вариант.
+        """
+        elapsed = min(self._measure(min_rounds) for _ in range(3))
+
+        rounds = min_rounds
+        while rounds < max_rounds and elapsed * 2 * 1000 <= target_ms:
+            elapsed *= 2
+            rounds += 1
+
+        self.rounds = rounds
+        return rounds
+
+    @staticmethod
+    def _measure(rounds: int) -> float:
+        """Время одного хэширования в секундах."""
+        start = time.perf_counter()
+        _crypt_context(rounds).hash('calibration-password')
+        return time.perf_counter() - start
+
+
+password_policy = PasswordHashPolicy(s.BCRYPT_ROUNDS)
+
+# Payload уже проверенных токенов по sha256 от токена
+access_token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    maxsize=s.ACCESS_TOKEN_CACHE_SIZE,
+    ttl=s.ACCESS_TOKEN_CACHE_TTL,
+)
+metrics.register('access_token_cache', access_token_cache.stats)
 
 
 class SecurityService:
     """Сервис для работы с безопасностью и JWT токенами."""
 
     @staticmethod
-    def get_password_hash(password: str) -> str:
+    def get_password_hash(password: str, rounds: int | None = None) -> str:
         """Хэширует пароль с использованием bcrypt."""
-        return pwd_context.hash(password)
+        return _crypt_context(rounds or password_policy.rounds).hash(password)
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         """Проверяет соответствие пароля хэшу."""
-        return pwd_context.verify(plain_password, hashed_password)
+        return password_policy.context.verify(plain_password, hashed_password)
+
+    @staticmethod
+    def password_needs_rehash(hashed_password: str) -> bool:
+        """Проверяет, устарел ли хэш относительно текущей политики."""
+        return password_policy.context.needs_update(hashed_password)
+
+    @staticmethod
+    async def get_password_hash_async(password: str) -> str:
+        """Хэширует пароль в пуле воркеров, не блокируя event loop."""
+        # cost-фактор передается явно: у процессов пула своя копия политики
+        return await password_hash_pool.run(
+            SecurityService.get_password_hash,
+            password,
+            password_policy.rounds,
+        )
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль в пуле воркеров, не блокируя event loop."""
+        return await password_hash_pool.run(
+            SecurityService.verify_password,
+            plain_password,
+            hashed_password,
+        )
 
     @staticmethod
     def create_access_token(user: UserSchema) -> str:
@@ -35,10 +126,12 @@ class SecurityService:
             'login': user.email.split('@')[0],
             'role': user.role,
             'type': 'access',
+            # С миллисекундами: вход сразу после отзыва не попадает под него
+            'iat': round(time.time(), 3),
             'exp': exp,
         }
 
-        return jwt.encode(payload, s.JWT_SECRET, algorithm=s.JWT_ALGORITHM)
+        return SecurityService._encode(payload)
 
     @staticmethod
     def create_refresh_token(user: UserSchema) -> str:
@@ -47,16 +140,19 @@ class SecurityService:
         payload: dict[str, Any] = {
             'sub': str(user.id),
             'type': 'refresh',
+            # Уникальность: токены одного пользователя за одну секунду не совпадают
+            'jti': secrets.token_urlsafe(16),
             'exp': exp,
         }
 
-        return jwt.encode(payload, s.JWT_SECRET, algorithm=s.JWT_ALGORITHM)
+        return SecurityService._encode(payload)
 
     @staticmethod
     def verify_token(token: str) -> dict[str, Any]:
         """Верифицирует JWT токен. Возвращает payload или выбрасывает исключение."""
         try:
-            return jwt.decode(token, s.JWT_SECRET, algorithms=[s.JWT_ALGORITHM])
+            key = keyring.verification_key(token)
+            return jwt.decode(token, key, algorithms=[keyring.algorithm])
         except jwt.ExpiredSignatureError as e:
             raise AuthenticationError('Токен устарел') from e
         except jwt.InvalidTokenError as e:
@@ -65,11 +161,34 @@ class SecurityService:
             # Обработка любых других ошибок PyJWT
             raise AuthenticationError('Ошибка верификации токена') from e
 
+    @staticmethod
+    def hash_token(token: str) -> bytes:
+        """SHA-256 от токена (для хранения и поиска без самого токена)."""
+        return hashlib.sha256(token.encode()).digest()
+
+    @staticmethod
+    def verify_access_token(token: str) -> dict[str, Any]:
+        """Верифицирует токен, повторно используя payload до истечения exp."""
+        key = SecurityService.hash_token(token)
+
+        payload = access_token_cache.get(key)
+        if payload is None:
+            payload = SecurityService.verify_token(token)
+            access_token_cache.set(key, payload, expires_at=payload.get('exp'))
+
+        return payload
+
     @staticmethod
     def is_token_expired(expires_at: int) -> bool:
         """Проверяет истек ли токен по timestamp."""
         return datetime.now(UTC).timestamp() > expires_at
 
+    @staticmethod
+    def _encode(payload: dict[str, Any]) -> str:
+        """Подписывает payload активным ключом."""
+        key, headers = keyring.signing_params()
+        return jwt.encode(payload, key, algorithm=keyring.algorithm, headers=headers)
+
     @staticmethod
     def _expires_timestamp(delta: timedelta) -> int:
         """Timestamp сейчас + delta."""
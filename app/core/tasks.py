@@ -0,0 +1,65 @@
+"""Фоновые задачи вне жизненного цикла запроса."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Coroutine
+import contextlib
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_tasks: set[asyncio.Task] = set()
+
+
+def spawn(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """Запустить корутину в фоне, сохранив ссылку на задачу."""
+    task = asyncio.create_task(coro)
+    _tasks.add(task)
+    task.add_done_callback(_on_done)
+    return task
+
+
+async def drain(timeout: float = 5.0) -> None:
+    """Дождаться завершения фоновых задач (при остановке сервиса)."""
+    if _tasks:
+        await asyncio.wait(set(_tasks), timeout=timeout)
+
+
+def _on_done(task: asyncio.Task) -> None:
+    """Убрать задачу из списка и залогировать ошибку."""
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.error('Ошибка фоновой задачи', exc_info=task.exception())
+
+
+class PeriodicTask:
+    """Периодический запуск корутины в фоне (с паузой перед каждым запуском)."""
+
+    def __init__(self, func: Callable[[], Awaitable[Any]], interval: float, name: str) -> None:
+        self.func = func
+        self.interval = interval
+        self.name = name
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Запустить задачу."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Остановить задачу."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+            except Exception:
+                logger.exception('Ошибка периодической задачи %s', self.name)
@@ -0,0 +1,107 @@
+"""Задержка входа после неудачных попыток.
+
+Счетчик неудач ведется по email (в том числе несуществующему).
+После free_attempts неудач вход блокируется на base_delay секунд,
+каждая следующая неудача удваивает задержку (до max_delay).
+Заблокированная попытка отклоняется до обращения к БД и bcrypt.
+Счетчик сбрасывается успешным входом или через window секунд без неудач.
+
+Счетчики хранятся в памяти процесса: с N воркерами попыток до блокировки
+в N раз больше, а блокировка действует только в воркере, где она
+наступила. Общий для воркеров предел попыток с одного IP задает
+rate limit эндпоинта входа с RATE_LIMIT_STORAGE_URI=redis://.
+Заблокированные ключи хранятся отдельно от остальных: перебор
+множества email вытесняет сначала незаблокированные счетчики
+и не сбрасывает блокировку атакуемой учетной записи.
+"""
+
+import math
+import time
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import TooManyRequestsError
+from app.core.metrics import metrics
+
+
+class LoginThrottle:
+    """Экспоненциальная задержка входа по ключу учетной записи."""
+
+    def __init__(
+        self,
+        free_attempts: int = 5,
+        base_delay: float = 1,
+        max_delay: float = 900,
+        window: float = 900,
+        max_keys: int = 100_000,
+    ) -> None:
+        self.free_attempts = free_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.window = window
+        # key -> (количество неудач, заблокирован до)
+        self._failures: TTLCache[str, tuple[int, float]] = TTLCache(max_keys)
+        # Ключи, хотя бы раз достигшие блокировки (вытесняются только друг другом)
+        self._blocked: TTLCache[str, tuple[int, float]] = TTLCache(max_keys)
+        self._rejected = 0
+
+    def check(self, key: str) -> None:
+        """Отклонить попытку, если ключ заблокирован."""
+        state = self._blocked.get(self._normalize(key))
+        if state is None:
+            return
+
+        retry_after = state[1] - time.time()
+        if retry_after > 0:
+            self._rejected += 1
+            raise TooManyRequestsError(
+                'Слишком много неудачных попыток входа, повторите позже',
+                retry_after=math.ceil(retry_after),
+            )
+
+    def failure(self, key: str) -> None:
+        """Учесть неудачную попытку."""
+        key = self._normalize(key)
+        state = self._blocked.get(key) or self._failures.get(key)
+        failures = (state[0] if state else 0) + 1
+
+        now = time.time()
+        blocked_until = 0.0
+        if failures >= self.free_attempts:
+            delay = self.base_delay * 2 ** min(failures - self.free_attempts, 32)
+            blocked_until = now + min(delay, self.max_delay)
+
+        expires_at = max(blocked_until, now + self.window)
+        if blocked_until:
+            self._failures.delete(key)
+            self._blocked.set(key, (failures, blocked_until), expires_at)
+        else:
+            self._failures.set(key, (failures, blocked_until), expires_at)
+
+    def success(self, key: str) -> None:
+        """Сбросить счетчик после успешного входа."""
+        key = self._normalize(key)
+        self._failures.delete(key)
+        self._blocked.delete(key)
+
+    def stats(self) -> dict[str, int]:
+        """Метрики задержки входа."""
+        return {
+            'tracked': len(self._failures) + len(self._blocked),
+            'blocked': len(self._blocked),
+            'rejected': self._rejected,
+        }
+
+    @staticmethod
+    def _normalize(key: str) -> str:
+        return key.strip().lower()
+
+
+login_throttle = LoginThrottle(
+    free_attempts=settings.LOGIN_THROTTLE_FREE_ATTEMPTS,
+    base_delay=settings.LOGIN_THROTTLE_BASE_DELAY,
+    max_delay=settings.LOGIN_THROTTLE_MAX_DELAY,
+    window=settings.LOGIN_THROTTLE_WINDOW,
+    max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+)
+metrics.register('login_throttle', login_throttle.stats)
@@ -0,0 +1,67 @@
+"""Разбор User-Agent с кэшированием.
+
+Разбор (ua-parser) построен на регулярных выражениях и заметно
+нагружает CPU, а различных User-Agent у клиентов немного -
+результаты хранятся в LRU кэше по исходной строке.
+"""
+
+from collections.abc import Iterable
+import functools
+from types import MappingProxyType
+
+from user_agents import parse
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+_EMPTY = MappingProxyType({})
+
+
+@functools.lru_cache(maxsize=settings.USER_AGENT_CACHE_SIZE)
+def parse_user_agent(user_agent_string: str | None) -> MappingProxyType:
+    """Браузер, ОС и тип устройства по User-Agent строке (только для чтения)."""
+    if not user_agent_string:
+        return _EMPTY
+
+    ua = parse(user_agent_string)
+
+    device_type = 'unknown'
+    if ua.is_mobile:
+        device_type = 'mobile'
+    elif ua.is_tablet:
+        device_type = 'tablet'
+    elif ua.is_pc:
+        device_type = 'desktop'
+
+    return MappingProxyType(
+        {
+            'browser': ua.browser.family,
+            'os': ua.os.family,
+            'device_type': device_type,
+        },
+    )
+
+
+def warm_up(user_agents: Iterable[str]) -> int:
+    """Заполнить кэш заранее известными User-Agent строками."""
+    count = 0
+    for user_agent in user_agents:
+        parse_user_agent(user_agent)
+        count += 1
+    return count
+
+
+def cache_stats() -> dict[str, int | float]:
+    """Метрики кэша."""
+    info = parse_user_agent.cache_info()
+    requests = info.hits + info.misses
+    return {
+        'size': info.currsize,
+        'maxsize': info.maxsize,
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': round(info.hits / requests, 4) if requests else 0.0,
+    }
+
+
+metrics.register('user_agent_cache', cache_stats)
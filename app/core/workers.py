@@ -0,0 +1,99 @@
+"""Пул воркеров для CPU-тяжелых операций (bcrypt).
+
+Выполнение в пуле не блокирует event loop. Очередь ограничена:
+при переполнении запрос сразу отклоняется, а не ждет своей очереди.
+Место в очереди освобождается, когда задача завершилась в пуле,
+а не когда ожидавший ее запрос отменен (отключение клиента).
+"""
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import metrics
+
+
+class WorkerPool:
+    """Ограниченный пул потоков или процессов."""
+
+    def __init__(self, kind: str = 'thread', workers: int = 4, queue_size: int = 64) -> None:
+        if kind not in ('thread', 'process'):
+            raise ValueError(f'Неизвестный тип пула: {kind}')
+
+        self.kind = kind
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor: Executor | None = None
+        # Счетчики меняются и в потоках пула (завершение задачи)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        """Executor создается при первом использовании."""
+        if self._executor is None:
+            if self.kind == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix='worker-pool',
+                )
+        return self._executor
+
+    async def run[T](self, func: Callable[..., T], *args: object) -> T:
+        """Выполнить функцию в пуле или отклонить, если очередь заполнена."""
+        if self._pending >= self.workers + self.queue_size:
+            self._rejected += 1
+            raise ServiceOverloadedError
+
+        future = self.executor.submit(func, *args)
+        with self._lock:
+            self._pending += 1
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def _done(self, future: Future) -> None:
+        """Освободить место задачи, завершившейся в пуле."""
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled():
+                self._cancelled += 1
+            elif future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def stats(self) -> dict[str, int]:
+        """Метрики пула."""
+        return {
+            'workers': self.workers,
+            'in_flight': min(self._pending, self.workers),
+            'queue_depth': max(self._pending - self.workers, 0),
+            'queue_size': self.queue_size,
+            'completed': self._completed,
+            'failed': self._failed,
+            'cancelled': self._cancelled,
+            'rejected': self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Остановить пул (ожидает завершения текущих задач)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = WorkerPool(
+    kind=settings.PASSWORD_HASH_POOL,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+metrics.register('password_hash_pool', password_hash_pool.stats)
@@ -1,3 +1,9 @@
 from .auth import get_current_user, require_role
 from .database import get_db_session
-from .services import get_auth_service, get_session_service, get_user_service
+from .services import (
+    get_auth_service,
+    get_export_service,
+    get_import_service,
+    get_session_service,
+    get_user_service,
+)
@@ -1,36 +1,46 @@
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from typing import Annotated
 
 from fastapi import Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.core.exceptions import ForbiddenException, UnauthorizedException
+from app.core.revocation import token_revocation
 from app.core.security import SecurityService
-from app.schemas import UserRole, UserSchema
+from app.schemas import Principal, UserRole
 
 security = HTTPBearer()
 
 
-def require_role(required_role: UserRole) -> Callable[[UserSchema], None]:
-    """Зависимость для проверки роли пользователя."""
-    def role_checker(current_user: Annotated[UserSchema, Depends(get_current_user)]) -> None:
-        if required_role.priority > current_user.role.priority:
+def require_role(required_role: UserRole) -> Callable[[Principal], Awaitable[None]]:
+    """Зависимость для проверки роли пользователя.
+
+    Текущий пользователь берется из кэша зависимостей запроса:
+    get_current_user у роутера и эндпоинта вызывается один раз.
+    """
+    required_rank = required_role.priority
+
+    # async: синхронная зависимость выполнялась бы в пуле потоков
+    async def role_checker(current_user: Annotated[Principal, Depends(get_current_user)]) -> None:
+        if required_rank > current_user.rank:
             raise ForbiddenException(f'Требуется роль доступа: {required_role.value}')
     return role_checker
 
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-) -> UserSchema:
+) -> Principal:
     """Зависимость для получения текущего пользователя по JWT токену."""
     token = credentials.credentials
-    payload = SecurityService.verify_token(token)
+    payload = SecurityService.verify_access_token(token)
+
+    try:
+        principal = Principal.from_payload(payload)
+    except (KeyError, TypeError, ValueError) as e:
+        raise UnauthorizedException('Некорректный токен') from e
 
-    user_id = payload.get('sub')
-    if user_id is None:
-        raise UnauthorizedException('Некорректный токен')
+    # Проверка по карте в памяти, без запроса к БД
+    if token_revocation.is_revoked(payload):
+        raise UnauthorizedException('Токен отозван')
 
-    return UserSchema(
-        id=user_id,
-        role=payload.get('role'),
-    )
+    return principal
@@ -5,6 +5,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_db_session
 from app.services.auth import AuthService
+from app.services.export import UserExportService
+from app.services.importer import UserImportService
 from app.services.session import SessionService
 from app.services.user import UserService
 
@@ -16,11 +18,19 @@ async def get_auth_service(
     return AuthService(session)
 
 
-async def get_session_service(
-    session: Annotated[AsyncSession, Depends(get_db_session)],
-) -> SessionService:
+async def get_export_service() -> UserExportService:
+    """Зависимость для получения сервиса выгрузки пользователей."""
+    return UserExportService()
+
+
+async def get_import_service() -> UserImportService:
+    """Зависимость для получения сервиса импорта пользователей."""
+    return UserImportService()
+
+
+async def get_session_service() -> SessionService:
     """Зависимость для получения сервиса сессий."""
-    return SessionService(session)
+    return SessionService()
 
 
 async def get_user_service(
@@ -1,3 +1,6 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -5,7 +8,67 @@ from slowapi.errors import RateLimitExceeded
 from app.api.admin import admin_router
 from app.api.public import public_router
 from app.api.user import user_router
+from app.core.config import settings
+from app.core.keys import keyring
 from app.core.rate_limit import limiter
+from app.core.revocation import token_revocation
+from app.core.security import password_policy
+from app.core.tasks import PeriodicTask, drain, spawn
+from app.core.workers import password_hash_pool
+from app.services.activity import activity_buffer
+from app.services.reaper import token_reaper
+from app.services.session import prewarm_user_agent_cache
+from app.services.session_writer import session_writer
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Запуск и остановка фоновых компонентов сервиса."""
+    # Без ключей подписи сервис не запускается
+    keyring.load()
+
+    if settings.BCRYPT_CALIBRATE:
+        password_policy.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        )
+
+    # Прогрев не задерживает запуск: первые запросы просто разберут User-Agent сами
+    if settings.USER_AGENT_PREWARM:
+        spawn(prewarm_user_agent_cache())
+
+    token_revocation.start()
+
+    writer_task = PeriodicTask(
+        session_writer.flush,
+        settings.SESSION_WRITER_INTERVAL,
+        'session-writer',
+    )
+    writer_task.start()
+
+    activity_task = PeriodicTask(
+        activity_buffer.flush,
+        settings.ACTIVITY_FLUSH_INTERVAL,
+        'activity-flush',
+    )
+    activity_task.start()
+
+    reaper_task = PeriodicTask(token_reaper.run, settings.TOKEN_REAPER_INTERVAL, 'token-reaper')
+    if settings.TOKEN_REAPER_ENABLED:
+        reaper_task.start()
+
+    yield
+
+    await reaper_task.stop()
+    await activity_task.stop()
+    await writer_task.stop()
+    await token_revocation.stop()
+    await drain()
+    await session_writer.flush()
+    await activity_buffer.flush()
+    password_hash_pool.shutdown()
+
 
 app = FastAPI(
     title='Auth Service API',
@@ -13,6 +76,7 @@ app = FastAPI(
     docs_url='/docs',
     redoc_url='/redoc',
     root_path='/auth',
+    lifespan=lifespan,
 )
 
 app.state.limiter = limiter
@@ -0,0 +1,90 @@
+"""refresh_token_hash
+
+Revision ID: 3d65eab73713
+Revises: cc9ce4e169e6
+Create Date: 2026-10-18 10:12:41.518304
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '3d65eab73713'
+down_revision: Union[str, Sequence[str], None] = 'cc9ce4e169e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Строк refresh_tokens на одну транзакцию backfill
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'refresh_tokens',
+        sa.Column('token_hash', sa.LargeBinary(length=32), nullable=True),
+    )
+
+    # Шаги ниже не держат блокировку на запись в refresh_tokens:
+    # каждый запрос коммитится сам, индекс строится CONCURRENTLY
+    with op.get_context().autocommit_block():
+        _backfill_token_hash()
+        op.create_index(
+            op.f('ix_refresh_tokens_token_hash'),
+            'refresh_tokens',
+            ['token_hash'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        # Токены, выданные во время backfill
+        op.execute(
+            'UPDATE refresh_tokens SET token_hash = '
+            "sha256(convert_to(token, 'UTF8')) WHERE token_hash IS NULL",
+        )
+        # Проверенный CHECK позволяет SET NOT NULL обойтись без полного
+        # сканирования таблицы под ACCESS EXCLUSIVE
+        op.execute(
+            'ALTER TABLE refresh_tokens ADD CONSTRAINT ck_refresh_tokens_token_hash_not_null '
+            'CHECK (token_hash IS NOT NULL) NOT VALID',
+        )
+        op.execute(
+            'ALTER TABLE refresh_tokens VALIDATE CONSTRAINT ck_refresh_tokens_token_hash_not_null',
+        )
+
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.drop_constraint('ck_refresh_tokens_token_hash_not_null', 'refresh_tokens', type_='check')
+    op.drop_index(op.f('ix_refresh_tokens_token'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token')
+
+
+def _backfill_token_hash() -> None:
+    """SHA-256 от уже выданных токенов пачками по id: пользователи не разлогиниваются."""
+    bind = op.get_bind()
+    first_id, last_id = bind.execute(sa.text('SELECT min(id), max(id) FROM refresh_tokens')).one()
+    if first_id is None:
+        return
+
+    for start in range(first_id, last_id + 1, BACKFILL_BATCH_SIZE):
+        bind.execute(
+            sa.text(
+                'UPDATE refresh_tokens '
+                "SET token_hash = sha256(convert_to(token, 'UTF8')) "
+                'WHERE id >= :start AND id < :end AND token_hash IS NULL',
+            ),
+            {'start': start, 'end': start + BACKFILL_BATCH_SIZE},
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Исходные токены по хэшу не восстановить: все refresh токены
+    # (и связанные сессии) удаляются, пользователям нужно войти заново
+    op.execute('DELETE FROM refresh_tokens')
+
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(length=512), nullable=False))
+    op.create_index(op.f('ix_refresh_tokens_token'), 'refresh_tokens', ['token'], unique=True)
+    op.drop_index(op.f('ix_refresh_tokens_token_hash'), table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token_hash')
@@ -0,0 +1,40 @@
+"""refresh_token_expires_at_index
+
+Revision ID: 8f2b1c4d9e07
+Revises: 3d65eab73713
+Create Date: 2026-10-18 11:02:17.204519
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '8f2b1c4d9e07'
+down_revision: Union[str, Sequence[str], None] = '3d65eab73713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в refresh_tokens, но недоступен в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_refresh_tokens_expires_at'),
+            'refresh_tokens',
+            ['expires_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f('ix_refresh_tokens_expires_at'),
+            table_name='refresh_tokens',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""users_created_at_id_index
+
+Revision ID: b7e41a9c3f25
+Revises: 8f2b1c4d9e07
+Create Date: 2026-10-18 11:48:05.731942
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'b7e41a9c3f25'
+down_revision: Union[str, Sequence[str], None] = '8f2b1c4d9e07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в users, но недоступен в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_created_at_id',
+            'users',
+            ['created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_created_at_id', table_name='users', postgresql_concurrently=True)
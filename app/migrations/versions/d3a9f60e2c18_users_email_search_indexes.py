@@ -0,0 +1,56 @@
+"""users_email_search_indexes
+
+Revision ID: d3a9f60e2c18
+Revises: b7e41a9c3f25
+Create Date: 2026-10-18 12:21:36.904117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'd3a9f60e2c18'
+down_revision: Union[str, Sequence[str], None] = 'b7e41a9c3f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY не блокирует запись в users, но недоступен в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower_pattern',
+            'users',
+            [sa.text('lower(email) text_pattern_ops')],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_users_email_lower_trgm',
+            'users',
+            [sa.text('lower(email) gin_trgm_ops')],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Расширение pg_trgm не удаляется: им могут пользоваться другие объекты
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_email_lower_trgm',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_users_email_lower_pattern',
+            table_name='users',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,40 @@
+"""login_sessions_user_id_login_at_index
+
+Revision ID: e5c07b2d814a
+Revises: d3a9f60e2c18
+Create Date: 2026-10-18 12:54:12.318650
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'e5c07b2d814a'
+down_revision: Union[str, Sequence[str], None] = 'd3a9f60e2c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись сессий, но недоступен в транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_login_sessions_user_id_login_at',
+            'login_sessions',
+            ['user_id', 'login_at'],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_login_sessions_user_id_login_at',
+            table_name='login_sessions',
+            postgresql_concurrently=True,
+        )
@@ -1,7 +1,18 @@
 from datetime import UTC, datetime
 from typing import Optional
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    text,
+)
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declarative_base
 
@@ -19,8 +30,14 @@ class RefreshToken(Base):
         ForeignKey('users.id', ondelete='CASCADE'),
         nullable=False,
     )
-    token: Mapped[str] = mapped_column(String(512), unique=True, nullable=False, index=True)
-    expires_at: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # SHA-256 от токена: сам токен в БД не хранится
+    token_hash: Mapped[bytes] = mapped_column(
+        LargeBinary(32),
+        unique=True,
+        nullable=False,
+        index=True,
+    )
+    expires_at: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
 
     # Связи
     user: Mapped['User'] = relationship('User', back_populates='refresh_tokens')
@@ -34,6 +51,17 @@ class RefreshToken(Base):
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Keyset пагинация списка пользователей
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+        # Поиск по email: по началу и по подстроке (расширение pg_trgm)
+        Index('ix_users_email_lower_pattern', text('lower(email) text_pattern_ops')),
+        Index(
+            'ix_users_email_lower_trgm',
+            text('lower(email) gin_trgm_ops'),
+            postgresql_using='gin',
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
@@ -67,6 +95,10 @@ class User(Base):
 
 class LoginSession(Base):
     __tablename__ = 'login_sessions'
+    __table_args__ = (
+        # Сессии пользователей списка, начиная с последних
+        Index('ix_login_sessions_user_id_login_at', 'user_id', 'login_at'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     user_id: Mapped[int] = mapped_column(
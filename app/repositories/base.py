@@ -2,21 +2,54 @@
 # pyright: reportAttributeAccessIssue=false
 
 # TODO: Логирование
-# TODO: Кэширование
 
+import asyncio
+import base64
+import binascii
 from collections.abc import Sequence
-from typing import TYPE_CHECKING, TypeVar
+from datetime import datetime
+from enum import Enum
+import functools
+import json
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 
 from pydantic import BaseModel
-from sqlalchemy import delete, exists, select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    delete,
+    event,
+    exists,
+    inspect,
+    literal_column,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached, selectinload
 from sqlalchemy.sql import expression, func
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import ValidationError
+from app.core.metrics import metrics
+from app.core.tasks import spawn
+
 if TYPE_CHECKING:
-    from sqlalchemy.ext.asyncio import AsyncSession
+    from app.repositories.cache import RepositoryCache
 
 
 Id = TypeVar('Id', int, str)
+CountStrategy = Literal['exact', 'estimate', 'cached']
+
+# Точные количества для paginate(count='cached'): ключ - запрос с параметрами
+_count_cache: TTLCache[str, int] = TTLCache(
+    maxsize=settings.REPOSITORY_COUNT_CACHE_SIZE,
+    ttl=settings.REPOSITORY_COUNT_CACHE_TTL,
+)
+metrics.register('repository_count_cache', _count_cache.stats)
 
 
 class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
@@ -25,21 +58,44 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
     Примечание:
         - Требуется commit для сохранения изменений
         - Возвращает None если объект не найден
+        - Наследник может включить кэш строк (get, get_by_unique, exists),
+          он сбрасывается методами изменения и удаления репозитория
     """
 
+    cache: 'RepositoryCache | None' = None
+
     def __init__(self, model: type[Model], session: 'AsyncSession') -> None:
         self.model = model
         self.session = session
 
     async def get(self, id: Id, relations: tuple[str, ...] = ()) -> Model | None:
         """Получить объект по ID."""
+        if self.cache and not relations:
+            row = await self.cache.get(id)
+            if row is not None:
+                return await self._attach(row)
+
         stmt = select(self.model).where(self.model.id == id)
 
         for relation in relations:
             stmt = stmt.options(selectinload(getattr(self.model, relation)))
 
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        obj = result.scalar_one_or_none()
+        await self._store(obj)
+        return obj
+
+    async def get_by_unique(self, field: str, value: object) -> Model | None:
+        """Получить объект по уникальному полю (через кэш, если он включен)."""
+        if self.cache and field in self.cache.unique:
+            id = await self.cache.get_id(field, value)
+            row = await self.cache.get(id) if id is not None else None
+            if row is not None and row[field] == value:
+                return await self._attach(row)
+
+        obj = await self.get_by(getattr(self.model, field) == value)
+        await self._store(obj)
+        return obj
 
     async def get_by(
         self,
@@ -107,6 +163,48 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         result = await self.session.execute(stmt)
         return result.unique().scalars().all()
 
+    async def paginate_after(
+        self,
+        *where: expression.ColumnElement[bool],
+        cursor: str | None = None,
+        limit: int = 20,
+        keys: tuple[str, ...] = ('id',),
+        descending: bool = False,
+        relations: tuple[str, ...] = (),
+    ) -> tuple[list[Model], str | None]:
+        """Получить страницу объектов после курсора (keyset пагинация).
+
+        Сортировка по колонкам keys (последняя - уникальная), курсор
+        следующей страницы - значения keys последнего объекта или None.
+        Для постоянной стоимости страницы нужен индекс по keys.
+        """
+        columns = [getattr(self.model, key) for key in keys]
+        stmt = select(self.model)
+
+        if where:
+            stmt = stmt.where(*where)
+
+        if cursor:
+            values = self._decode_cursor(cursor, keys)
+            row, after = tuple_(*columns), tuple_(*values)
+            stmt = stmt.where(row < after if descending else row > after)
+
+        stmt = stmt.order_by(*(column.desc() if descending else column for column in columns))
+
+        for relation in relations:
+            stmt = stmt.options(selectinload(getattr(self.model, relation)))
+
+        # Лишний объект показывает, что следующая страница есть
+        stmt = stmt.limit(limit + 1)
+
+        result = await self.session.execute(stmt)
+        objs = list(result.unique().scalars().all())
+        if len(objs) <= limit:
+            return objs, None
+
+        objs = objs[:limit]
+        return objs, self._encode_cursor([getattr(objs[-1], key) for key in keys])
+
     async def create(self, data: CreateSchema) -> Model:
         """Создать объект."""
         obj = self.model(**data.model_dump())
@@ -137,7 +235,9 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         )
 
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        obj = result.scalar_one_or_none()
+        await self.invalidate(id)
+        return obj
 
     async def update_many(
         self,
@@ -160,13 +260,17 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         )
 
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        objs = result.scalars().all()
+        await self.invalidate(*ids)
+        return objs
 
     async def delete(self, id: Id) -> bool:
         """Удалить объект по ID."""
         stmt = delete(self.model).where(self.model.id == id).returning(self.model.id)
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        deleted = result.scalar_one_or_none()
+        await self.invalidate(deleted)
+        return deleted is not None
 
     async def delete_by(
         self,
@@ -185,7 +289,9 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         stmt = stmt.limit(1).returning(self.model.id)
 
         result = await self.session.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        deleted = result.scalar_one_or_none()
+        await self.invalidate(deleted)
+        return deleted is not None
 
     async def delete_many(self, ids: Sequence[Id]) -> list[Id]:
         """Удалить несколько объектов по списку ID, вернуть список ID удалённых."""
@@ -194,7 +300,9 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
 
         stmt = delete(self.model).where(self.model.id.in_(ids)).returning(self.model.id)
         result = await self.session.execute(stmt)
-        return [row[0] for row in result.all()]
+        deleted = [row[0] for row in result.all()]
+        await self.invalidate(*deleted)
+        return deleted
 
     async def delete_many_by(
         self,
@@ -213,20 +321,72 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         stmt = stmt.returning(self.model.id)
 
         result = await self.session.execute(stmt)
-        return [row[0] for row in result.all()]
+        deleted = [row[0] for row in result.all()]
+        await self.invalidate(*deleted)
+        return deleted
 
     async def count(
         self,
         *where: expression.ColumnElement[bool],
     ) -> int:
         """Подсчитать количество объектов."""
-        stmt = select(func.count()).select_from(self.model)
+        return await self._count(self.session, *where)
+
+    async def estimate_count(self, *where: expression.ColumnElement[bool]) -> int:
+        """Оценка количества объектов по статистике планировщика PostgreSQL.
 
+        Без условий - pg_class.reltuples, с условиями - оценка строк из EXPLAIN.
+        Небольшие оценки неточны, их заменяет точный подсчет.
+        """
         if where:
-            stmt = stmt.where(*where)
+            stmt = select(literal_column('1')).select_from(self.model).where(*where)
+            try:
+                sql = stmt.compile(
+                    dialect=postgresql.dialect(),
+                    compile_kwargs={'literal_binds': True},
+                )
+            except (CompileError, NotImplementedError):
+                return await self.count(*where)
+            # Двоеточия в литералах text() принял бы за параметры
+            sql = str(sql).replace(':', '\\:')
+            result = await self.session.execute(text(f'EXPLAIN (FORMAT JSON) {sql}'))
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+        else:
+            stmt = (
+                select(text('reltuples::bigint'))
+                .select_from(text('pg_class'))
+                .where(
+                    text('oid = CAST(:table AS regclass)').bindparams(
+                        table=self.model.__tablename__,
+                    ),
+                )
+            )
+            result = await self.session.execute(stmt)
+            # -1: таблица еще не анализировалась
+            estimate = result.scalar_one_or_none() or -1
+
+        if estimate < settings.REPOSITORY_COUNT_ESTIMATE_MIN:
+            return await self.count(*where)
+        return estimate
+
+    async def cached_count(self, *where: expression.ColumnElement[bool]) -> int:
+        """Точное количество объектов, закэшированное на короткое время по условиям."""
+        compiled = (
+            select(func.count())
+            .select_from(self.model)
+            .where(*where)
+            .compile(dialect=postgresql.dialect())
+        )
+        key = f'{compiled}|{compiled.params!r}'
 
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
+        total = _count_cache.get(key)
+        if total is None:
+            total = await self.count(*where)
+            _count_cache.set(key, total)
+        return total
 
     async def paginate(
         self,
@@ -235,23 +395,47 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         page_size: int = 20,
         order_by: Sequence[expression.ColumnElement] | None = None,
         relations: tuple[str, ...] = (),
+        count: CountStrategy = 'exact',
     ) -> tuple[list[Model], int]:
-        """Пагинация с подсчетом общего количества."""
-        # Подсчет общего количества
-        total = await self.count(*where)
-
-        # Получение данных
-        skip = (page - 1) * page_size
-        items = await self.get_many_by(
+        """Пагинация с подсчетом общего количества.
+
+        count: exact - точный подсчет (параллельно с выборкой страницы, в
+        отдельном соединении: видит только зафиксированные данные),
+        estimate - оценка планировщика, cached - точный подсчет из кэша.
+        """
+        fetch = functools.partial(
+            self.get_many_by,
             *where,
             order_by=order_by,
             relations=relations,
-            skip=skip,
+            skip=(page - 1) * page_size,
             limit=page_size,
         )
 
+        if count == 'estimate':
+            return await fetch(), await self.estimate_count(*where)
+        if count == 'cached':
+            return await fetch(), await self.cached_count(*where)
+
+        # Сессия не допускает параллельных запросов: подсчет идет в своей
+        async with AsyncSession(self.session.bind) as session:
+            items, total = await asyncio.gather(fetch(), self._count(session, *where))
         return items, total
 
+    async def _count(
+        self,
+        session: 'AsyncSession',
+        *where: expression.ColumnElement[bool],
+    ) -> int:
+        """Подсчитать количество объектов в указанной сессии."""
+        stmt = select(func.count()).select_from(self.model)
+
+        if where:
+            stmt = stmt.where(*where)
+
+        result = await session.execute(stmt)
+        return result.scalar_one()
+
     async def get_or_create(
         self,
         defaults: CreateSchema | None = None,
@@ -283,6 +467,9 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
 
     async def exists(self, id: Id) -> bool:
         """Проверить существование объекта по ID."""
+        if self.cache and await self.cache.get(id) is not None:
+            return True
+
         stmt = select(exists().where(self.model.id == id))
         result = await self.session.execute(stmt)
         return result.scalar_one()
@@ -292,3 +479,96 @@ class BaseRepository[Model, CreateSchema: BaseModel, UpdateSchema: BaseModel]:
         stmt = select(exists().where(*where))
         result = await self.session.execute(stmt)
         return result.scalar_one()
+
+    async def invalidate(self, *ids: Id | None) -> None:
+        """Сбросить кэш объектов после их изменения.
+
+        Повторно кэш сбрасывается после commit/rollback сессии: иначе
+        параллельный запрос мог закэшировать строку до фиксации изменений.
+        """
+        ids = tuple(id for id in ids if id is not None)
+        if not self.cache or not ids:
+            return
+
+        await self.cache.invalidate(*ids)
+        self._pending_invalidation().update(ids)
+
+    def _pending_invalidation(self) -> set[Id]:
+        """ID для сброса кэша после commit/rollback (слушатели - одни на сессию)."""
+        cache = self.cache
+        key = ('cache_invalidation', cache.namespace)
+        pending = self.session.info.get(key)
+        if pending is not None:
+            return pending
+
+        pending = self.session.info[key] = set()
+
+        def flush(_session: object) -> None:
+            if pending:
+                ids = tuple(pending)
+                pending.clear()
+                spawn(cache.invalidate(*ids))
+
+        for name in ('after_commit', 'after_rollback'):
+            event.listen(self.session.sync_session, name, flush)
+        return pending
+
+    async def _store(self, obj: Model | None) -> None:
+        """Сохранить колонки объекта в кэш."""
+        if not self.cache or obj is None:
+            return
+
+        state = inspect(obj)
+        keys = self.cache.columns
+        if state.modified or any(key not in state.dict for key in keys):
+            return
+        await self.cache.store({key: state.dict[key] for key in keys})
+
+    async def _attach(self, row: dict[str, Any]) -> Model:
+        """Объект из кэша, присоединенный к сессии без запроса к БД.
+
+        Колонки вне cache.columns не загружены. Значения из JSON
+        (datetime, enum) приводятся к типам колонок. Объект, уже
+        загруженный в сессию, возвращается как есть: строка из кэша
+        не перезаписывает его (в том числе несохраненные изменения).
+        """
+        current = self.session.identity_map.get(self.session.identity_key(self.model, row['id']))
+        if current is not None:
+            return current
+
+        obj = self.model(**{key: self._from_cache(key, value) for key, value in row.items()})
+        make_transient_to_detached(obj)
+        return await self.session.merge(obj, load=False)
+
+    def _from_cache(self, key: str, value: Any) -> Any:
+        """Значение колонки из кэша в ее Python тип."""
+        if not isinstance(value, str):
+            return value
+        python_type = getattr(self.model, key).type.python_type
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if issubclass(python_type, Enum):
+            return python_type(value)
+        return value
+
+    def _encode_cursor(self, values: list[Any]) -> str:
+        """Непрозрачный курсор из значений ключей сортировки."""
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+        data = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+    def _decode_cursor(self, cursor: str, keys: tuple[str, ...]) -> list[Any]:
+        """Значения ключей сортировки из курсора."""
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            values = json.loads(data)
+            if not isinstance(values, list) or len(values) != len(keys):
+                raise ValueError
+            return [
+                datetime.fromisoformat(value)
+                if getattr(self.model, key).type.python_type is datetime
+                else value
+                for key, value in zip(keys, values, strict=True)
+            ]
+        except (binascii.Error, TypeError, ValueError) as e:
+            raise ValidationError('Некорректный курсор') from e
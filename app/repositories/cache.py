@@ -0,0 +1,113 @@
+"""Кэш строк репозиториев по первичному ключу и уникальным полям.
+
+Включается в наследнике BaseRepository атрибутом cache
+(REPOSITORY_CACHE_BACKEND: none, memory или redis).
+
+Изменение через репозиторий сбрасывает строку только в хранилище
+процесса, который ее изменил. С memory и несколькими воркерами
+остальные воркеры отдают прежние значения (в том числе role и status
+для проверки прав) до REPOSITORY_CACHE_TTL секунд - для нескольких
+воркеров нужен redis.
+"""
+
+import functools
+import logging
+from typing import Any
+
+from app.core.cache import CacheBackend, MemoryCacheBackend, RedisCacheBackend
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RepositoryCache:
+    """Read-through кэш строк одной модели.
+
+    Хранятся значения колонок из явного списка columns, а не ORM объекты:
+    секреты (например, хэш пароля) в кэш не попадают. Для уникальных полей
+    хранится ссылка на первичный ключ; она проверяется по самой строке,
+    поэтому при изменении поля ее не нужно удалять.
+    Ошибки хранилища считаются промахом.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str,
+        ttl: float,
+        columns: tuple[str, ...],
+        unique: tuple[str, ...] = (),
+    ) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.columns = columns
+        self.unique = unique
+        self._hits = 0
+        self._misses = 0
+        self._errors = 0
+
+    async def get(self, id: Any) -> dict[str, Any] | None:  # noqa: A002
+        """Строка по первичному ключу."""
+        row = await self._call(self.backend.get, self._key('id', id))
+        if row is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return row
+
+    async def get_id(self, field: str, value: Any) -> Any | None:
+        """Первичный ключ по значению уникального поля."""
+        return await self._call(self.backend.get, self._key(field, value))
+
+    async def store(self, row: dict[str, Any]) -> None:
+        """Сохранить строку."""
+        await self._call(self.backend.set, self._key('id', row['id']), row, self.ttl)
+        for field in self.unique:
+            await self._call(self.backend.set, self._key(field, row[field]), row['id'], self.ttl)
+
+    async def invalidate(self, *ids: Any) -> None:
+        """Удалить строки по первичным ключам."""
+        if ids:
+            await self._call(self.backend.delete, *(self._key('id', id) for id in ids))
+
+    def stats(self) -> dict[str, int]:
+        """Метрики кэша."""
+        return {'hits': self._hits, 'misses': self._misses, 'errors': self._errors}
+
+    def _key(self, field: str, value: Any) -> str:
+        return f'{self.namespace}:{field}:{value}'
+
+    async def _call(self, func: Any, *args: Any) -> Any:
+        try:
+            return await func(*args)
+        except Exception:
+            self._errors += 1
+            logger.warning('Ошибка кэша репозитория %s', self.namespace, exc_info=True)
+            return None
+
+
+@functools.cache
+def _backend() -> CacheBackend:
+    """Общее хранилище кэша репозиториев."""
+    if settings.REPOSITORY_CACHE_BACKEND == 'redis':
+        return RedisCacheBackend(settings.REPOSITORY_CACHE_URL)
+
+    backend = MemoryCacheBackend(settings.REPOSITORY_CACHE_SIZE)
+    metrics.register('repository_cache_memory', backend.stats)
+    return backend
+
+
+def build_cache(
+    namespace: str,
+    columns: tuple[str, ...],
+    unique: tuple[str, ...] = (),
+) -> RepositoryCache | None:
+    """Кэш для репозитория или None, если кэширование отключено."""
+    if settings.REPOSITORY_CACHE_BACKEND == 'none':
+        return None
+
+    cache = RepositoryCache(_backend(), namespace, settings.REPOSITORY_CACHE_TTL, columns, unique)
+    metrics.register(f'repository_cache_{namespace}', cache.stats)
+    return cache
@@ -1,6 +1,10 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, String, column, func, select, true, update, values
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import LoginSession
+from app.models import LoginSession, RefreshToken
 from app.repositories import BaseRepository
 from app.schemas import LoginSessionCreate, LoginSessionUpdate
 
@@ -16,3 +20,109 @@ class SessionRepository(
     async def get_by_token_id(self, token_id: int) -> LoginSession | None:
         """Получить сессию по ID refresh токена."""
         return await self.get_by(LoginSession.refresh_token_id == token_id)
+
+    async def create_many(self, items: list[LoginSessionCreate]) -> set[int]:
+        """Создать сессии одним запросом, вернуть ID refresh токенов созданных.
+
+        Сессии для отсутствующих refresh токенов и повторные пропускаются.
+        """
+        if not items:
+            return set()
+
+        data = values(
+            column('user_id', Integer),
+            column('refresh_token_id', Integer),
+            column('ip_address', String),
+            column('user_agent', String),
+            column('device_type', String),
+            column('browser', String),
+            column('os', String),
+            column('login_at', DateTime(timezone=True)),
+            column('last_activity_at', DateTime(timezone=True)),
+            name='new_sessions',
+        ).data(
+            [
+                (
+                    i.user_id,
+                    i.refresh_token_id,
+                    i.ip_address,
+                    i.user_agent,
+                    i.device_type,
+                    i.browser,
+                    i.os,
+                    i.login_at,
+                    i.login_at,
+                )
+                for i in items
+            ],
+        )
+
+        stmt = (
+            insert(LoginSession)
+            .from_select(
+                [c.name for c in data.c],
+                select(data).join(RefreshToken, RefreshToken.id == data.c.refresh_token_id),
+            )
+            .on_conflict_do_nothing(index_elements=[LoginSession.refresh_token_id])
+            .returning(LoginSession.refresh_token_id)
+        )
+        result = await self.session.execute(stmt)
+        return set(result.scalars())
+
+    async def update_many_by_token_id(self, items: dict[int, LoginSessionUpdate]) -> int:
+        """Обновить сессии по ID refresh токенов одним запросом."""
+        if not items:
+            return 0
+
+        data = values(
+            column('refresh_token_id', Integer),
+            column('ip_address', String),
+            column('last_activity_at', DateTime(timezone=True)),
+            name='session_updates',
+        ).data(
+            [
+                (token_id, items[token_id].ip_address, items[token_id].last_activity_at)
+                for token_id in sorted(items)
+            ],
+        )
+
+        stmt = (
+            update(LoginSession)
+            .where(LoginSession.refresh_token_id == data.c.refresh_token_id)
+            .values(
+                ip_address=data.c.ip_address,
+                last_activity_at=func.coalesce(
+                    data.c.last_activity_at,
+                    LoginSession.last_activity_at,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def get_recent_user_agents(
+        self,
+        limit: int,
+        since: datetime,
+        timeout: float | None = None,
+    ) -> list[str]:
+        """Различные User-Agent строки сессий с входом после since, начиная с недавно активных.
+
+        timeout (секунды) ограничивает запрос через statement_timeout
+        текущей транзакции.
+        """
+        if timeout is not None:
+            await self.session.execute(
+                select(func.set_config('statement_timeout', f'{int(timeout * 1000)}', true())),
+            )
+
+        stmt = (
+            select(LoginSession.user_agent)
+            .where(LoginSession.login_at >= since, LoginSession.user_agent.is_not(None))
+            .group_by(LoginSession.user_agent)
+            .order_by(func.max(LoginSession.last_activity_at).desc())
+            .limit(limit)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
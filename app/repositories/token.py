@@ -1,6 +1,10 @@
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+from sqlalchemy import Row, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import RefreshToken
+from app.models import RefreshToken, User
 from app.repositories import BaseRepository
 from app.schemas import RefreshTokenCreate, RefreshTokenUpdate
 
@@ -13,10 +17,75 @@ class TokenRepository(
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(RefreshToken, session)
 
-    async def get_by_token(self, token: str) -> RefreshToken | None:
-        """Найти refresh токен по его значению."""
-        return await self.get_by(RefreshToken.token == token)
+    async def get_by_token_hash(self, token_hash: bytes) -> RefreshToken | None:
+        """Найти refresh токен по SHA-256 от его значения."""
+        return await self.get_by(RefreshToken.token_hash == token_hash)
+
+    async def rotate(
+        self,
+        token_hash: bytes,
+        new_token_hash: bytes,
+        expires_at: int,
+    ) -> Row | None:
+        """Атомарно заменить действующий refresh токен новым.
+
+        Один UPDATE ... FROM users ... RETURNING: при параллельной замене
+        одного и того же токена успешной будет только первая.
+        Возвращает (token_id, user_id, email, role) или None.
+        """
+        now = int(datetime.now(UTC).timestamp())
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.expires_at > now,
+                User.id == RefreshToken.user_id,
+            )
+            .values(token_hash=new_token_hash, expires_at=expires_at)
+            .returning(
+                RefreshToken.id.label('token_id'),
+                User.id.label('user_id'),
+                User.email,
+                User.role,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
 
     async def delete_user_tokens(self, user_id: int) -> int:
         """Удалить все refresh токены пользователя."""
         return len(await self.delete_many_by(RefreshToken.user_id == user_id))
+
+    async def delete_users_tokens(self, user_ids: Sequence[int]) -> int:
+        """Удалить все refresh токены нескольких пользователей одним запросом."""
+        if not user_ids:
+            return 0
+
+        stmt = (
+            delete(RefreshToken)
+            .where(RefreshToken.user_id.in_(user_ids))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
+
+    async def delete_expired(self, now: int, limit: int) -> int:
+        """Удалить до limit истекших токенов (сессии удаляются каскадно).
+
+        Строки, заблокированные другими транзакциями, пропускаются.
+        """
+        expired = (
+            select(RefreshToken.id)
+            .where(RefreshToken.expires_at <= now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount
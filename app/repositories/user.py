@@ -1,29 +1,136 @@
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+import re
 
+import asyncpg
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    RowMapping,
+    case,
+    column,
+    func,
+    select,
+    true,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, load_only
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.core.config import settings
-from app.models import User
+from app.models import LoginSession, User
 from app.repositories import BaseRepository
-from app.schemas import UserCreate, UserUpdate
+from app.repositories.cache import build_cache
+from app.schemas import (
+    Principal,
+    UserCreate,
+    UserRole,
+    UserSearchMode,
+    UserSessionsMode,
+    UserUpdate,
+)
+
+# Колонки пользователей для выгрузки
+EXPORT_COLUMNS = (
+    'id',
+    'email',
+    'role',
+    'status',
+    'is_active',
+    'created_at',
+    'last_active_at',
+    'total_active_time',
+)
+# Колонки пользователей в кэше строк (без password_hash)
+CACHE_COLUMNS = EXPORT_COLUMNS
+# Сводка по сессиям в выгрузке
+EXPORT_SESSION_COLUMNS = ('sessions_count', 'last_login_at')
+
+# Колонки пользователей для импорта через COPY
+IMPORT_COLUMNS = (
+    'email',
+    'password_hash',
+    'role',
+    'status',
+    'is_active',
+    'created_at',
+    'total_active_time',
+)
+
+# Колонки сессий для ответа API (без user_agent)
+_SESSION_COLUMNS = (
+    'id',
+    'user_id',
+    'ip_address',
+    'device_type',
+    'browser',
+    'os',
+    'platform',
+    'login_at',
+    'last_activity_at',
+)
 
 
 class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     """Репозиторий для работы с пользователями."""
 
+    cache = build_cache('users', CACHE_COLUMNS, unique=('email',))
+
     def __init__(self, db: AsyncSession) -> None:
         super().__init__(User, db)
 
-    async def get_by_email(self, email: str) -> User | None:
-        """Найти пользователя по email."""
-        return await self.get_by(User.email == email)
+    async def get_by_email(self, email: str, *, cached: bool = True) -> User | None:
+        """Найти пользователя по email.
+
+        В кэше нет password_hash: для проверки пароля нужен cached=False.
+        """
+        if not cached:
+            return await self.get_by(User.email == email)
+        return await self.get_by_unique('email', email)
+
+    async def update_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Заменить хэш пароля, если он не изменился с момента чтения."""
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.password_hash == old_hash)
+            .values(password_hash=new_hash)
+            .returning(User.id)
+        )
+        result = await self.session.execute(stmt)
+        updated = result.scalar_one_or_none()
+        await self.invalidate(updated)
+        return updated is not None
+
+    async def add_activity(self, activity: dict[int, tuple[int, datetime]]) -> None:
+        """Обновить метрики активности нескольких пользователей одним запросом.
+
+        activity: user_id -> (количество обращений, время последнего обращения).
+        """
+        if not activity:
+            return
 
-    async def update_activity(self, user_id: int) -> None:
-        """Обновить метрики активности пользователя."""
-        user = await self.get(user_id)
-        if user:
-            user.last_active_at = datetime.now(UTC)
-            user.total_active_time += settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        data = values(
+            column('id', Integer),
+            column('hits', Integer),
+            column('last_active_at', DateTime(timezone=True)),
+            name='activity',
+        ).data([(user_id, *activity[user_id]) for user_id in sorted(activity)])
+
+        stmt = (
+            update(User)
+            .where(User.id == data.c.id)
+            .values(
+                total_active_time=User.total_active_time
+                + data.c.hits * (settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60),
+                last_active_at=func.greatest(User.last_active_at, data.c.last_active_at),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.execute(stmt)
+        await self.invalidate(*activity)
 
     async def get_many_with_sessions(
         self,
@@ -31,22 +138,240 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
         limit: int = 20,
         search: str | None = None,
         role: str | None = None,
+        search_mode: UserSearchMode = UserSearchMode.CONTAINS,
+        *,
+        sessions: UserSessionsMode = UserSessionsMode.ALL,
+        sessions_limit: int = 5,
     ) -> list[User]:
         """Получить список пользователей с пагинацией и сессиями."""
+        users = await self.get_many_by(
+            *self._filters(search, role, search_mode),
+            skip=skip,
+            limit=limit,
+            order_by=[User.created_at.desc(), User.id.desc()],
+        )
+        await self.load_sessions(users, sessions, sessions_limit)
+        return users
+
+    async def paginate_with_sessions(
+        self,
+        cursor: str | None = None,
+        limit: int = 20,
+        search: str | None = None,
+        role: str | None = None,
+        search_mode: UserSearchMode = UserSearchMode.CONTAINS,
+        *,
+        sessions: UserSessionsMode = UserSessionsMode.ALL,
+        sessions_limit: int = 5,
+    ) -> tuple[list[User], str | None]:
+        """Получить страницу пользователей с сессиями после курсора."""
+        users, next_cursor = await self.paginate_after(
+            *self._filters(search, role, search_mode),
+            cursor=cursor,
+            limit=limit,
+            keys=('created_at', 'id'),
+            descending=True,
+        )
+        await self.load_sessions(users, sessions, sessions_limit)
+        return users, next_cursor
+
+    async def load_sessions(
+        self,
+        users: Sequence[User],
+        mode: UserSessionsMode = UserSessionsMode.ALL,
+        limit: int = 5,
+        *,
+        with_user_agent: bool = False,
+    ) -> None:
+        """Загрузить сессии пользователей одним запросом.
+
+        all - все сессии, latest - последние limit сессий каждого (LATERAL:
+        по индексу читается не больше limit строк на пользователя),
+        count - только количество (sessions_count), none - ничего.
+        Загружаются только колонки для ответа, user_agent - по запросу.
+        """
+        ids = [user.id for user in users]
+        if not ids or mode == UserSessionsMode.NONE:
+            return
+
+        if mode == UserSessionsMode.COUNT:
+            stmt = (
+                select(LoginSession.user_id, func.count())
+                .where(LoginSession.user_id.in_(ids))
+                .group_by(LoginSession.user_id)
+            )
+            counts = dict((await self.session.execute(stmt)).all())
+            for user in users:
+                user.sessions_count = counts.get(user.id, 0)
+            return
+
+        columns = [getattr(LoginSession, name) for name in _SESSION_COLUMNS]
+        if with_user_agent:
+            columns.append(LoginSession.user_agent)
+
+        stmt = (
+            select(LoginSession)
+            .order_by(LoginSession.user_id, LoginSession.login_at.desc())
+            .options(load_only(*columns))
+        )
+        if mode == UserSessionsMode.LATEST:
+            recent = aliased(LoginSession)
+            latest = (
+                select(recent.id)
+                .where(recent.user_id == User.id)
+                .order_by(recent.login_at.desc())
+                .limit(limit)
+                .correlate(User)
+                .lateral('latest_sessions')
+            )
+            stmt = (
+                stmt.select_from(User)
+                .join(latest, true())
+                .join(LoginSession, LoginSession.id == latest.c.id)
+                .where(User.id.in_(ids))
+            )
+        else:
+            stmt = stmt.where(LoginSession.user_id.in_(ids))
+
+        by_user: dict[int, list[LoginSession]] = {user_id: [] for user_id in ids}
+        for login_session in (await self.session.execute(stmt)).scalars():
+            by_user[login_session.user_id].append(login_session)
+
+        for user in users:
+            set_committed_value(user, 'login_sessions', by_user[user.id])
+
+    async def check_access(
+        self,
+        current_user: Principal,
+        ids: Sequence[int] | None = None,
+        role: UserRole | None = None,
+        status: str | None = None,
+        limit: int | None = None,
+    ) -> dict[int, bool]:
+        """Выбранные пользователи и право текущего пользователя на их изменение.
+
+        Одним запросом: доступ есть к себе и к пользователям с ролью ниже.
+        При выборе по условию (без ids) текущий пользователь не выбирается.
+        """
+        priority = case(
+            {member: member.priority for member in UserRole},
+            value=User.role,
+            else_=1,
+        )
+        allowed = (User.id == current_user.id) | (priority < current_user.rank)
+        stmt = select(User.id, allowed)
+
+        if ids is not None:
+            stmt = stmt.where(User.id.in_(ids))
+        else:
+            stmt = stmt.where(User.id != current_user.id)
+        if role:
+            stmt = stmt.where(User.role == role)
+        if status:
+            stmt = stmt.where(User.status == status)
+        if limit is not None:
+            stmt = stmt.order_by(User.id).limit(limit)
+
+        result = await self.session.execute(stmt)
+        return dict(result.all())
+
+    async def existing_emails(self, emails: Sequence[str]) -> set[str]:
+        """Email из списка, которые уже заняты (одним запросом)."""
+        if not emails:
+            return set()
+
+        result = await self.session.execute(select(User.email).where(User.email.in_(emails)))
+        return set(result.scalars())
+
+    async def copy_many(self, rows: Sequence[tuple]) -> set[str]:
+        """Вставить пользователей через COPY, вернуть email созданных.
+
+        rows - значения IMPORT_COLUMNS (роль - объект UserRole).
+        Если COPY упал на уникальности email (пользователь появился после
+        проверки), пачка вставляется INSERT ... ON CONFLICT DO NOTHING.
+        """
+        if not rows:
+            return set()
+
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        # Тип enum в БД хранит имена членов UserRole
+        records = [(*row[:2], row[2].name, *row[3:]) for row in rows]
+        try:
+            async with self.session.begin_nested():
+                await raw.driver_connection.copy_records_to_table(
+                    User.__tablename__,
+                    records=records,
+                    columns=IMPORT_COLUMNS,
+                )
+            return {row[0] for row in rows}
+        except asyncpg.UniqueViolationError:
+            stmt = (
+                insert(User)
+                .values([dict(zip(IMPORT_COLUMNS, row, strict=True)) for row in rows])
+                .on_conflict_do_nothing(index_elements=[User.email])
+                .returning(User.email)
+            )
+            result = await self.session.execute(stmt)
+            return set(result.scalars())
+
+    async def stream_export(
+        self,
+        role: str | None = None,
+        *,
+        with_sessions: bool = False,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list[RowMapping]]:
+        """Строки пользователей для выгрузки пачками через серверный курсор.
+
+        with_sessions добавляет сводку по сессиям: количество и последний вход.
+        """
+        columns = [getattr(User, name) for name in EXPORT_COLUMNS]
+        stmt = select(*columns).order_by(User.id)
+
+        if role:
+            stmt = stmt.where(User.role == role)
+
+        if with_sessions:
+            summary = (
+                select(
+                    LoginSession.user_id,
+                    func.count().label('sessions_count'),
+                    func.max(LoginSession.login_at).label('last_login_at'),
+                )
+                .group_by(LoginSession.user_id)
+                .subquery()
+            )
+            stmt = stmt.outerjoin(summary, summary.c.user_id == User.id).add_columns(
+                func.coalesce(summary.c.sessions_count, 0).label('sessions_count'),
+                summary.c.last_login_at,
+            )
+
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for batch in result.mappings().partitions():
+            yield batch
+
+    def _filters(
+        self,
+        search: str | None,
+        role: str | None,
+        search_mode: UserSearchMode = UserSearchMode.CONTAINS,
+    ) -> list:
+        """Условия поиска и фильтрации списка пользователей."""
         where = []
 
-        # Поиск
+        # Поиск по lower(email): префикс - индекс text_pattern_ops,
+        # подстрока - триграммный GIN индекс
         if search:
-            where.append(User.email.ilike(f'%{search}%'))
+            pattern = re.sub(r'([\\%_])', r'\\\1', search.lower())
+            if search_mode == UserSearchMode.PREFIX:
+                pattern = f'{pattern}%'
+            else:
+                pattern = f'%{pattern}%'
+            where.append(func.lower(User.email).like(pattern, escape='\\'))
 
         # Фильтр по роли
         if role:
             where.append(User.role == role)
 
-        return await self.get_many_by(
-            *where,
-            skip=skip,
-            limit=limit,
-            order_by=[User.created_at.desc()],
-            relations=('login_sessions',),
-        )
+        return where
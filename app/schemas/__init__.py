@@ -2,12 +2,26 @@ from .common import ErrorResponse
 from .session import LoginSessionCreate, LoginSessionUpdate
 from .token import RefreshTokenCreate, RefreshTokenRequest, RefreshTokenUpdate, TokensResponse
 from .user import (
+    Principal,
+    UserBatchFilter,
+    UserBatchItem,
+    UserBatchRequest,
+    UserBatchResponse,
+    UserBatchStatus,
+    UserBatchUpdateRequest,
     UserCreate,
     UserCreateRequest,
+    UserExportFormat,
+    UserImportError,
+    UserImportFormat,
+    UserImportReport,
+    UserImportRow,
     UserLogin,
     UserResponse,
     UserRole,
     UserSchema,
+    UserSearchMode,
+    UserSessionsMode,
     UserUpdate,
     UserUpdateRequest,
 )
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import UTC, datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LoginSessionCreate(BaseModel):
@@ -13,6 +13,7 @@ class LoginSessionCreate(BaseModel):
     device_type: str | None = None
     browser: str | None = None
     os: str | None = None
+    login_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 
 class LoginSessionUpdate(BaseModel):
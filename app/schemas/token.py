@@ -13,14 +13,14 @@ class RefreshTokenCreate(BaseModel):
     """Создание refresh токена в БД."""
 
     user_id: int
-    token: str
+    token_hash: bytes
     expires_at: int
 
 
 class RefreshTokenUpdate(BaseModel):
     """Обновление refresh токена в БД."""
 
-    token: str
+    token_hash: bytes
     expires_at: int
 
 
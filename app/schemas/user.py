@@ -1,11 +1,30 @@
+from dataclasses import dataclass
 from datetime import UTC, datetime
 from enum import Enum
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field, computed_field
+from passlib.hash import bcrypt
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    computed_field,
+    field_validator,
+    model_validator,
+)
+from sqlalchemy import inspect
 
 from app.core.config import settings
 from app.schemas.session import LoginSessionResponse
 
+# Статусы, допустимые в файле импорта
+IMPORT_STATUSES = frozenset({'active', 'inactive', 'blocked'})
+
+# bcrypt хэш, который passlib проверяет при входе: без '2x' / '2'
+# и с cost-фактором 04-31
+BCRYPT_HASH_PATTERN = r'^\$2[aby]\$(0[4-9]|[12]\d|3[01])\$[./A-Za-z0-9]{53}$'
+
 
 class UserRole(str, Enum):
     """Роли пользователей."""
@@ -17,11 +36,44 @@ class UserRole(str, Enum):
     @property
     def priority(self) -> int:
         """Приоритет роли (чем выше, тем больше прав)."""
-        return {
-            UserRole.USER: 1,
-            UserRole.MODERATOR: 2,
-            UserRole.ADMIN: 3,
-        }.get(self, 1)
+        return _ROLE_PRIORITY[self]
+
+
+_ROLE_PRIORITY = {
+    UserRole.USER: 1,
+    UserRole.MODERATOR: 2,
+    UserRole.ADMIN: 3,
+}
+
+
+class UserSearchMode(str, Enum):
+    """Режимы поиска пользователей по email."""
+
+    CONTAINS = 'contains'
+    PREFIX = 'prefix'
+
+
+class UserSessionsMode(str, Enum):
+    """Загрузка сессий в списке пользователей."""
+
+    ALL = 'all'
+    LATEST = 'latest'
+    COUNT = 'count'
+    NONE = 'none'
+
+
+class UserExportFormat(str, Enum):
+    """Форматы выгрузки пользователей."""
+
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+class UserImportFormat(str, Enum):
+    """Форматы импорта пользователей."""
+
+    NDJSON = 'ndjson'
+    CSV = 'csv'
 
 
 class UserSchema(BaseModel):
@@ -32,6 +84,25 @@ class UserSchema(BaseModel):
     role: UserRole = UserRole.USER
 
 
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Текущий пользователь из access токена (без валидации Pydantic).
+
+    Создается один раз за запрос и общий для зависимостей роутера
+    и эндпоинта; rank - приоритет роли, вычисленный заранее.
+    """
+
+    id: int
+    role: UserRole
+    rank: int
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> 'Principal':
+        """Из payload access токена (KeyError / ValueError - некорректный токен)."""
+        role = UserRole(payload['role'])
+        return cls(int(payload['sub']), role, _ROLE_PRIORITY[role])
+
+
 class UserCreateRequest(BaseModel):
     """Создание нового пользователя."""
 
@@ -41,6 +112,65 @@ class UserCreateRequest(BaseModel):
     status: str = 'active'
 
 
+class UserImportRow(BaseModel):
+    """Пользователь в файле импорта.
+
+    Вместо пароля можно передать готовый bcrypt хэш (перенос из другой
+    системы): хэш с другим cost-фактором пересчитается при входе.
+    """
+
+    email: EmailStr
+    password: str | None = None
+    password_hash: str | None = Field(None, pattern=BCRYPT_HASH_PATTERN)
+    role: UserRole = UserRole.USER
+    status: str = Field('active', max_length=50)
+
+    @field_validator('status')
+    @classmethod
+    def check_status(cls, value: str) -> str:
+        """Статус из допустимых для импорта."""
+        if value not in IMPORT_STATUSES:
+            raise ValueError(f'Допустимые статусы: {", ".join(sorted(IMPORT_STATUSES))}')
+        return value
+
+    @field_validator('password_hash')
+    @classmethod
+    def check_password_hash(cls, value: str | None) -> str | None:
+        """Хэш, который разберет passlib (иначе вход упадет с 500)."""
+        if value is not None:
+            try:
+                bcrypt.from_string(value)
+            except ValueError as e:
+                raise ValueError('Некорректный bcrypt хэш') from e
+        return value
+
+    @model_validator(mode='after')
+    def check_password(self) -> 'UserImportRow':
+        """Нужен ровно один из password и password_hash."""
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError('Нужно указать password или password_hash')
+        return self
+
+
+class UserImportError(BaseModel):
+    """Ошибка в строке файла импорта."""
+
+    line: int
+    email: str | None = None
+    error: str
+
+
+class UserImportReport(BaseModel):
+    """Результат импорта пользователей."""
+
+    created: int = 0
+    failed: int = 0
+    errors: list[UserImportError] = Field(
+        default_factory=list,
+        description='Ошибки по строкам (первые USER_IMPORT_MAX_ERRORS)',
+    )
+
+
 class UserUpdateRequest(BaseModel):
     """Обновление данных пользователя."""
 
@@ -52,16 +182,32 @@ class UserResponse(BaseModel):
     """Ответ с данными пользователя."""
 
     id: int
-    email: EmailStr
+    # Email из БД уже проверен при записи: повторная проверка EmailStr
+    # (email-validator) - основная часть времени сериализации списков
+    email: str = Field(json_schema_extra={'format': 'email'})
     role: UserRole
     status: str
     created_at: datetime | None = None
     last_active_at: datetime| None = None
     total_active_time: int = Field(0, description='Общее время на сайте в секундах')
     login_sessions: list[LoginSessionResponse] | None = None
+    sessions_count: int | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
+    @model_validator(mode='before')
+    @classmethod
+    def skip_unloaded(cls, data: Any) -> Any:
+        """Незагруженные сессии ORM объекта не подгружаются, а опускаются."""
+        state = inspect(data, raiseerr=False)
+        if state is not None and 'login_sessions' in state.unloaded:
+            return {
+                name: getattr(data, name)
+                for name in cls.model_fields
+                if name not in state.unloaded and hasattr(data, name)
+            }
+        return data
+
     @computed_field
     @property
     def online(self) -> bool:
@@ -94,3 +240,68 @@ class UserUpdate(BaseModel):
 
     role: UserRole = UserRole.USER
     status: str = 'active'
+
+
+class UserBatchFilter(BaseModel):
+    """Выбор пользователей для пакетной операции по условию."""
+
+    role: UserRole | None = None
+    status: str | None = None
+
+    @model_validator(mode='after')
+    def check_not_empty(self) -> 'UserBatchFilter':
+        """Пустое условие выбрало бы всех пользователей."""
+        if self.role is None and not self.status:
+            raise ValueError('Условие должно содержать role или status')
+        return self
+
+
+class UserBatchRequest(BaseModel):
+    """Пакетная операция: список ID или условие."""
+
+    ids: list[int] | None = Field(
+        None,
+        min_length=1,
+        max_length=settings.USER_BATCH_MAX_IDS,
+        description='ID пользователей',
+    )
+    filter: UserBatchFilter | None = Field(
+        None,
+        description='Условие вместо списка ID (текущий пользователь не выбирается)',
+    )
+
+    @model_validator(mode='after')
+    def check_selection(self) -> 'UserBatchRequest':
+        """Нужен ровно один из ids и filter."""
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError('Нужно указать ids или filter')
+        return self
+
+
+class UserBatchUpdateRequest(UserBatchRequest):
+    """Пакетное обновление пользователей (применяются только переданные поля)."""
+
+    changes: UserUpdateRequest
+
+
+class UserBatchStatus(str, Enum):
+    """Результат пакетной операции для пользователя."""
+
+    OK = 'ok'
+    NOT_FOUND = 'not_found'
+    FORBIDDEN = 'forbidden'
+
+
+class UserBatchItem(BaseModel):
+    """Результат пакетной операции для одного ID."""
+
+    id: int
+    status: UserBatchStatus
+
+
+class UserBatchResponse(BaseModel):
+    """Результат пакетной операции."""
+
+    succeeded: int = 0
+    failed: int = 0
+    results: list[UserBatchItem] = Field(default_factory=list)
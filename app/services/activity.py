@@ -0,0 +1,85 @@
+from collections.abc import Callable
+from datetime import UTC, datetime
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.tasks import spawn
+from app.repositories import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """Буфер активности пользователей с отложенной записью в БД.
+
+    Обращения одного пользователя схлопываются в одну запись,
+    буфер сбрасывается одним UPDATE по таймеру или при заполнении.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        max_users: int = 10000,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_users = max_users
+        self._pending: dict[int, tuple[int, datetime]] = {}
+        self._hits = 0
+        self._flushes = 0
+        self._flushed_users = 0
+        self._failed_users = 0
+
+    def record(self, user_id: int) -> None:
+        """Учесть обращение пользователя."""
+        hits, _ = self._pending.get(user_id, (0, None))
+        self._pending[user_id] = (hits + 1, datetime.now(UTC))
+        self._hits += 1
+
+        # Переполненный буфер сбрасывается сразу, не дожидаясь таймера
+        if len(self._pending) >= self.max_users:
+            spawn(self._write(self._take()))
+
+    async def flush(self) -> int:
+        """Записать накопленную активность, вернуть количество пользователей."""
+        return await self._write(self._take())
+
+    def stats(self) -> dict[str, int]:
+        """Метрики буфера."""
+        return {
+            'pending': len(self._pending),
+            'max_users': self.max_users,
+            'hits': self._hits,
+            'flushes': self._flushes,
+            'flushed_users': self._flushed_users,
+            'failed_users': self._failed_users,
+        }
+
+    def _take(self) -> dict[int, tuple[int, datetime]]:
+        """Забрать накопленные записи, освободив буфер."""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    async def _write(self, activity: dict[int, tuple[int, datetime]]) -> int:
+        if not activity:
+            return 0
+
+        try:
+            async with self.session_factory() as session, session.begin():
+                await UserRepository(session).add_activity(activity)
+        except Exception:
+            # Активность - некритичная статистика: при ошибке записи она теряется
+            self._failed_users += len(activity)
+            logger.exception('Ошибка записи активности пользователей')
+            return 0
+
+        self._flushes += 1
+        self._flushed_users += len(activity)
+        return len(activity)
+
+
+activity_buffer = ActivityBuffer(max_users=settings.ACTIVITY_BUFFER_SIZE)
+metrics.register('activity_buffer', activity_buffer.stats)
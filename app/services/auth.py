@@ -1,11 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import AsyncSessionLocal
 from app.core.exceptions import AuthenticationError
+from app.core.revocation import TokenRevocation, token_revocation
 from app.core.security import SecurityService
-from app.repositories import TokenRepository
+from app.core.tasks import spawn
+from app.core.throttle import LoginThrottle, login_throttle
+from app.repositories import TokenRepository, UserRepository
 from app.schemas import (
+    Principal,
     RefreshTokenCreate,
-    RefreshTokenUpdate,
+    UserBatchRequest,
+    UserBatchResponse,
     UserCreateRequest,
     UserLogin,
     UserRole,
@@ -24,11 +30,15 @@ class AuthService:
         token_repo: TokenRepository | None = None,
         user_service: UserService | None = None,
         security: SecurityService | None = None,
+        throttle: LoginThrottle | None = None,
+        revocation: TokenRevocation | None = None,
     ) -> None:
         self.session = session
         self.token_repo = token_repo or TokenRepository(session)
         self.user_service = user_service or UserService(session)
         self.security = security or SecurityService()
+        self.throttle = throttle or login_throttle
+        self.revocation = revocation or token_revocation
 
     async def register(self, user_data: UserLogin) -> tuple[TokensResponse, int, int]:
         """Регистрация пользователя (роль USER)."""
@@ -40,10 +50,20 @@ class AuthService:
 
     async def login(self, user_data: UserLogin) -> tuple[TokensResponse, int, int]:
         """Аутентификация пользователя."""
-        user = await self.user_service.get_user_by_email(user_data.email)
-        if user and self.security.verify_password(user_data.password, user.password_hash):
+        # Заблокированная попытка не доходит до БД и bcrypt
+        self.throttle.check(user_data.email)
+
+        user = await self.user_service.get_user_by_email(user_data.email, cached=False)
+        if user and await self.security.verify_password_async(
+            user_data.password,
+            user.password_hash,
+        ):
+            self.throttle.success(user_data.email)
+            if self.security.password_needs_rehash(user.password_hash):
+                spawn(self._rehash_password(user.id, user.password_hash, user_data.password))
             return await self._create_tokens(user)
 
+        self.throttle.failure(user_data.email)
         raise AuthenticationError('Неверный email или пароль')
 
     async def refresh_tokens(self, refresh_token: str) -> tuple[TokensResponse, int, int]:
@@ -53,46 +73,56 @@ class AuthService:
         if payload.get('type') != 'refresh' or not payload.get('sub'):
             raise AuthenticationError('Невалидный refresh токен')
 
-        # Проверка в БД
-        stored_token = await self.token_repo.get_by_token(refresh_token)
-        if not stored_token:
-            raise AuthenticationError('Токен не найден в базе')
-
-        # Проверка срока действия
-        if self.security.is_token_expired(stored_token.expires_at):
-            await self.token_repo.delete(stored_token.id)
-            raise AuthenticationError('Токен истек')
-
-        # Генерация новых токенов
+        # Новый refresh токен зависит только от ID пользователя
         user_id = int(payload['sub'])
-        user = await self.user_service.get_user_by_id(user_id)
-        access_token, refresh_token, refresh_expires_at = self._generate_tokens(user)
-
-        # Обновление токена в БД
-        token_update = RefreshTokenUpdate(
-            token=refresh_token,
-            expires_at=refresh_expires_at,
+        new_refresh_token, refresh_expires_at = self._generate_refresh_token(UserSchema(id=user_id))
+
+        # Замена токена в БД одним запросом: повторное использование
+        # (в том числе параллельное) старого токена не пройдет
+        rotated = await self.token_repo.rotate(
+            self.security.hash_token(refresh_token),
+            self.security.hash_token(new_refresh_token),
+            refresh_expires_at,
         )
+        if not rotated:
+            raise AuthenticationError('Токен не найден или истек')
 
-        await self.token_repo.update(stored_token.id, token_update)
-
+        user = UserSchema(id=rotated.user_id, email=rotated.email, role=rotated.role)
         tokens = TokensResponse(
-            access_token=access_token,
-            refresh_token=refresh_token,
+            access_token=self.security.create_access_token(user),
+            refresh_token=new_refresh_token,
         )
-        return tokens, user_id, stored_token.id
+        return tokens, user.id, rotated.token_id
 
     async def logout(self, refresh_token: str) -> bool:
         """Выход из системы."""
-        token = await self.token_repo.get_by_token(refresh_token)
+        token = await self.token_repo.get_by_token_hash(self.security.hash_token(refresh_token))
         if token:
             return await self.token_repo.delete(token.id)
         return False
 
     async def logout_all(self, user_id: int) -> bool:
-        """Выход из всех устройств."""
+        """Выход из всех устройств (выданные access токены отзываются)."""
+        await self.revocation.revoke([user_id])
         return bool(await self.token_repo.delete_user_tokens(user_id))
 
+    async def batch_logout(
+        self,
+        request: UserBatchRequest,
+        current_user: Principal,
+    ) -> UserBatchResponse:
+        """Выход пакета пользователей со всех устройств одним запросом."""
+        allowed, response = await self.user_service.resolve_batch(request, current_user)
+        await self.revocation.revoke(allowed)
+        await self.token_repo.delete_users_tokens(allowed)
+        return response
+
+    async def _rehash_password(self, user_id: int, old_hash: str, password: str) -> None:
+        """Пересчитать устаревший хэш пароля в отдельной сессии БД."""
+        new_hash = await self.security.get_password_hash_async(password)
+        async with AsyncSessionLocal() as session, session.begin():
+            await UserRepository(session).update_password_hash(user_id, old_hash, new_hash)
+
     async def _create_tokens(self, user: UserSchema) -> tuple[TokensResponse, int, int]:
         """Создание пары токенов с сохранением refresh в БД."""
         access_token, refresh_token, refresh_expires_at = self._generate_tokens(user)
@@ -100,7 +130,7 @@ class AuthService:
         # Сохраняем refresh токен в базу
         token_data = RefreshTokenCreate(
             user_id=user.id,
-            token=refresh_token,
+            token_hash=self.security.hash_token(refresh_token),
             expires_at=refresh_expires_at,
         )
 
@@ -119,10 +149,14 @@ class AuthService:
             raise AuthenticationError('Пользователь не найден')
 
         access_token = self.security.create_access_token(user)
+        refresh_token, refresh_expires_at = self._generate_refresh_token(user)
+        return access_token, refresh_token, refresh_expires_at
+
+    def _generate_refresh_token(self, user: UserSchema) -> tuple[str, int]:
+        """Генерация refresh токена и времени его истечения."""
         refresh_token = self.security.create_refresh_token(user)
 
         # Валидация сгенерированного refresh токена
         refresh_payload = self.security.verify_token(refresh_token)
 
-        refresh_expires_at = refresh_payload['exp']
-        return access_token, refresh_token, refresh_expires_at
+        return refresh_token, refresh_payload['exp']
@@ -0,0 +1,92 @@
+"""Потоковая выгрузка пользователей (NDJSON / CSV).
+
+Строки читаются серверным курсором пачками и сразу отдаются клиенту,
+поэтому память не зависит от размера таблицы.
+"""
+
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+import csv
+from datetime import datetime
+from enum import Enum
+import io
+import json
+from typing import Any
+
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.repositories.user import EXPORT_COLUMNS, EXPORT_SESSION_COLUMNS, UserRepository
+from app.schemas import UserExportFormat
+
+
+class UserExportService:
+    """Сервис выгрузки пользователей.
+
+    Работает в своей сессии БД: выгрузка продолжается после
+    завершения обработчика запроса.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = settings.USER_EXPORT_BATCH_SIZE,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    async def stream(
+        self,
+        export_format: UserExportFormat = UserExportFormat.NDJSON,
+        role: str | None = None,
+        *,
+        with_sessions: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """Выгрузка пачками строк в заданном формате."""
+        columns = EXPORT_COLUMNS + (EXPORT_SESSION_COLUMNS if with_sessions else ())
+        encode = self._csv if export_format == UserExportFormat.CSV else self._ndjson
+
+        if export_format == UserExportFormat.CSV:
+            yield _csv_lines([columns])
+
+        async with self.session_factory() as session:
+            batches = UserRepository(session).stream_export(
+                role,
+                with_sessions=with_sessions,
+                batch_size=self.batch_size,
+            )
+            async for batch in batches:
+                yield encode(batch, columns)
+
+    def _ndjson(self, rows: list[RowMapping], columns: tuple[str, ...]) -> bytes:
+        """Пачка строк в NDJSON."""
+        return b''.join(
+            json.dumps(
+                {name: _value(row[name]) for name in columns},
+                ensure_ascii=False,
+                separators=(',', ':'),
+            ).encode()
+            + b'\n'
+            for row in rows
+        )
+
+    def _csv(self, rows: list[RowMapping], columns: tuple[str, ...]) -> bytes:
+        """Пачка строк в CSV."""
+        return _csv_lines([_value(row[name]) for name in columns] for row in rows)
+
+
+def _csv_lines(lines: Iterable[Sequence[Any]]) -> bytes:
+    """Строки CSV."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(lines)
+    return buffer.getvalue().encode()
+
+
+def _value(value: Any) -> Any:
+    """Значение колонки для JSON / CSV."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
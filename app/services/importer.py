@@ -0,0 +1,292 @@
+"""Массовый импорт пользователей из NDJSON / CSV.
+
+Файл читается потоком и обрабатывается пачками: проверка строк,
+один запрос на занятые email, хэширование паролей в пуле воркеров
+и вставка через COPY. Каждая пачка фиксируется отдельно, ошибки
+собираются в отчет по номерам строк.
+"""
+
+import asyncio
+import codecs
+from collections.abc import AsyncIterable, AsyncIterator, Callable
+import csv
+from datetime import UTC, datetime
+import json
+import logging
+from typing import Any
+
+import asyncpg
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import ServiceOverloadedError
+from app.core.security import SecurityService
+from app.core.workers import password_hash_pool
+from app.repositories.user import UserRepository
+from app.schemas import (
+    Principal,
+    UserImportError,
+    UserImportFormat,
+    UserImportReport,
+    UserImportRow,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class UserImportService:
+    """Сервис массового импорта пользователей."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        security: SecurityService | None = None,
+        chunk_size: int = settings.USER_IMPORT_CHUNK_SIZE,
+        max_errors: int = settings.USER_IMPORT_MAX_ERRORS,
+    ) -> None:
+        self.session_factory = session_factory
+        self.security = security or SecurityService()
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    async def run(
+        self,
+        data: AsyncIterable[bytes],
+        import_format: UserImportFormat = UserImportFormat.NDJSON,
+        current_user: Principal | None = None,
+    ) -> UserImportReport:
+        """Импортировать пользователей.
+
+        current_user ограничивает роли (как при создании пользователя),
+        без него (консольная команда) допустимы любые роли.
+        """
+        report = UserImportReport()
+        chunk: list[tuple[int, Any]] = []
+
+        async for line_number, record in self._records(data, import_format):
+            chunk.append((line_number, record))
+            if len(chunk) >= self.chunk_size:
+                await self._import_chunk(chunk, report, current_user)
+                chunk = []
+
+        if chunk:
+            await self._import_chunk(chunk, report, current_user)
+        return report
+
+    async def _import_chunk(
+        self,
+        chunk: list[tuple[int, Any]],
+        report: UserImportReport,
+        current_user: Principal | None,
+    ) -> None:
+        """Проверить и вставить пачку строк."""
+        rows = self._validate_chunk(chunk, report, current_user)
+        if rows:
+            await self._drop_existing(rows, report)
+        if rows:
+            await self._insert(list(rows.values()), report)
+
+    def _validate_chunk(
+        self,
+        chunk: list[tuple[int, Any]],
+        report: UserImportReport,
+        current_user: Principal | None,
+    ) -> dict[str, tuple[int, UserImportRow]]:
+        """Проверенные строки пачки по email (без повторов email в файле)."""
+        rows: dict[str, tuple[int, UserImportRow]] = {}
+        for line_number, record in chunk:
+            row = self._validate_row(line_number, record, report)
+            if row is None:
+                continue
+
+            if current_user and row.role.priority >= current_user.rank:
+                self._fail(
+                    report,
+                    line_number,
+                    row.email,
+                    'Нельзя назначать права, равные или превышающие ваши',
+                )
+            elif row.email in rows:
+                self._fail(report, line_number, row.email, 'Email повторяется в файле')
+            else:
+                rows[row.email] = (line_number, row)
+        return rows
+
+    def _validate_row(
+        self,
+        line_number: int,
+        record: Any,
+        report: UserImportReport,
+    ) -> UserImportRow | None:
+        """Строка файла или None (ошибка - в отчете)."""
+        if record is None:
+            self._fail(report, line_number, None, 'Некорректный JSON')
+            return None
+
+        try:
+            return UserImportRow.model_validate(record)
+        except PydanticValidationError as e:
+            email = record.get('email') if isinstance(record, dict) else None
+            self._fail(report, line_number, email, _error_message(e))
+            return None
+
+    async def _drop_existing(
+        self,
+        rows: dict[str, tuple[int, UserImportRow]],
+        report: UserImportReport,
+    ) -> None:
+        """Убрать из rows пользователей, уже существующих в БД."""
+        async with self.session_factory() as session:
+            existing = await UserRepository(session).existing_emails(list(rows))
+        for email in existing:
+            line_number, _ = rows.pop(email)
+            self._fail(report, line_number, email, 'Пользователь уже существует')
+
+    async def _insert(
+        self,
+        items: list[tuple[int, UserImportRow]],
+        report: UserImportReport,
+    ) -> None:
+        """Захэшировать пароли и вставить строки."""
+        # Хэширование - вне транзакции, чтобы не держать соединение
+        hashes = await self._hash_passwords([row for _, row in items])
+        now = datetime.now(UTC)
+        records = [
+            (row.email, password_hash, row.role, row.status, True, now, 0)
+            for (_, row), password_hash in zip(items, hashes, strict=True)
+        ]
+
+        rejected: set[str] = set()
+        try:
+            async with self.session_factory() as session, session.begin():
+                created = await UserRepository(session).copy_many(records)
+        except (DBAPIError, asyncpg.PostgresError):
+            # Пачку отклонила одна из строк: вставка по одной, ошибки - в отчет
+            logger.warning('Ошибка вставки пачки, вставка по одной строке', exc_info=True)
+            created, rejected = await self._copy_rows(records, items, report)
+
+        report.created += len(created)
+        for line_number, row in items:
+            if row.email not in created and row.email not in rejected:
+                self._fail(report, line_number, row.email, 'Пользователь уже существует')
+
+    async def _copy_rows(
+        self,
+        records: list[tuple],
+        items: list[tuple[int, UserImportRow]],
+        report: UserImportReport,
+    ) -> tuple[set[str], set[str]]:
+        """Вставить строки по одной (в точках сохранения).
+
+        Возвращает email созданных и отклоненных БД (они уже в отчете).
+        """
+        created: set[str] = set()
+        rejected: set[str] = set()
+        async with self.session_factory() as session, session.begin():
+            repo = UserRepository(session)
+            for record, (line_number, row) in zip(records, items, strict=True):
+                try:
+                    async with session.begin_nested():
+                        created |= await repo.copy_many([record])
+                except (DBAPIError, asyncpg.PostgresError) as e:
+                    logger.warning('Ошибка вставки строки %s импорта: %s', line_number, e)
+                    rejected.add(row.email)
+                    self._fail(report, line_number, row.email, 'Ошибка записи в БД')
+        return created, rejected
+
+    async def _hash_passwords(self, rows: list[UserImportRow]) -> list[str]:
+        """Хэши паролей: готовые как есть, остальные - в пуле воркеров.
+
+        Хэши считаются волнами по числу воркеров, чтобы импорт не занимал
+        очередь пула, нужную для входа пользователей.
+        """
+        hashes = [row.password_hash for row in rows]
+        pending = [index for index, row in enumerate(rows) if row.password_hash is None]
+
+        step = max(password_hash_pool.workers, 1)
+        for start in range(0, len(pending), step):
+            wave = pending[start : start + step]
+            results = await asyncio.gather(*(self._hash(rows[index].password) for index in wave))
+            for index, password_hash in zip(wave, results, strict=True):
+                hashes[index] = password_hash
+        return hashes
+
+    async def _hash(self, password: str) -> str:
+        """Хэш пароля с ожиданием места в очереди пула."""
+        while True:
+            try:
+                return await self.security.get_password_hash_async(password)
+            except ServiceOverloadedError:
+                await asyncio.sleep(0.05)
+
+    async def _records(
+        self,
+        data: AsyncIterable[bytes],
+        import_format: UserImportFormat,
+    ) -> AsyncIterator[tuple[int, Any]]:
+        """Записи файла с номерами строк (пустые строки пропускаются).
+
+        CSV - с заголовком, без переводов строк внутри значений.
+        """
+        header = None
+        async for line_number, line in _lines(data):
+            if not line.strip():
+                continue
+
+            if import_format == UserImportFormat.NDJSON:
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+                continue
+
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            # Пустые значения CSV - отсутствующие поля
+            yield (
+                line_number,
+                {name: value for name, value in zip(header, values, strict=False) if value != ''},
+            )
+
+    def _fail(
+        self,
+        report: UserImportReport,
+        line_number: int,
+        email: str | None,
+        error: str,
+    ) -> None:
+        """Учесть ошибку строки (в отчет попадают первые max_errors)."""
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append(UserImportError(line=line_number, email=email, error=error))
+
+
+async def _lines(data: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Строки UTF-8 из потока байтов с номерами (с 1)."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    tail = ''
+    line_number = 0
+
+    async for block in data:
+        lines = (tail + decoder.decode(block)).split('\n')
+        tail = lines.pop()
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip('\r')
+
+    tail += decoder.decode(b'', final=True)
+    if tail:
+        yield line_number + 1, tail.rstrip('\r')
+
+
+def _error_message(error: PydanticValidationError) -> str:
+    """Краткое описание ошибок валидации строки."""
+    return '; '.join(
+        f'{".".join(map(str, item["loc"]))}: {item["msg"]}' if item['loc'] else item['msg']
+        for item in error.errors()
+    )
@@ -0,0 +1,68 @@
+import asyncio
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.repositories import TokenRepository
+
+
+class TokenReaper:
+    """Удаление истекших refresh токенов пакетами.
+
+    Каждый пакет удаляется в отдельной короткой транзакции,
+    между пакетами - пауза, чтобы не нагружать БД.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        batch_size: int = 1000,
+        pause: float = 0.1,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.pause = pause
+        self._runs = 0
+        self._batches = 0
+        self._deleted = 0
+        self._last_run_at = 0
+
+    async def run(self) -> int:
+        """Удалить все истекшие на текущий момент токены."""
+        now = int(datetime.now(UTC).timestamp())
+        total = 0
+
+        while True:
+            async with self.session_factory() as session, session.begin():
+                deleted = await TokenRepository(session).delete_expired(now, self.batch_size)
+
+            total += deleted
+            self._batches += 1
+            self._deleted += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.pause)
+
+        self._runs += 1
+        self._last_run_at = now
+        return total
+
+    def stats(self) -> dict[str, int]:
+        """Метрики удаления."""
+        return {
+            'runs': self._runs,
+            'batches': self._batches,
+            'deleted': self._deleted,
+            'last_run_at': self._last_run_at,
+        }
+
+
+token_reaper = TokenReaper(
+    batch_size=settings.TOKEN_REAPER_BATCH_SIZE,
+    pause=settings.TOKEN_REAPER_PAUSE,
+)
+metrics.register('token_reaper', token_reaper.stats)
@@ -1,26 +1,33 @@
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
+import logging
 
 from fastapi import Request
-from sqlalchemy.ext.asyncio import AsyncSession
-from user_agents import parse
 
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.user_agent import parse_user_agent, warm_up
 from app.core.utils import get_real_ip
-from app.repositories import SessionRepository, TokenRepository
+from app.models import LoginSession
+from app.repositories import SessionRepository
 from app.schemas import LoginSessionCreate, LoginSessionUpdate
+from app.services.session_writer import SessionWriter, session_writer
+
+logger = logging.getLogger(__name__)
+
+# Длины колонок: строка длиннее отклонила бы весь пакет записи
+IP_ADDRESS_LENGTH = LoginSession.ip_address.type.length
+USER_AGENT_LENGTH = LoginSession.user_agent.type.length
 
 
 class SessionService:
-    """Сервис для управления сессиями входа пользователей."""
+    """Сервис для управления сессиями входа пользователей.
 
-    def __init__(
-        self,
-        session: AsyncSession,
-        session_repo: SessionRepository | None = None,
-        token_repo: TokenRepository | None = None,
-    ) -> None:
-        self.session = session
-        self.repo = session_repo or SessionRepository(session)
-        self.token_repo = token_repo or TokenRepository(session)
+    Запись в БД выполняется в фоне через SessionWriter,
+    сессия БД запроса не используется.
+    """
+
+    def __init__(self, writer: SessionWriter | None = None) -> None:
+        self.writer = writer or session_writer
 
     async def create_session(
         self,
@@ -29,8 +36,7 @@ class SessionService:
         request: Request,
     ) -> None:
         """Создает запись о новой сессии входа."""
-        ip_address = get_real_ip(request)
-        user_agent = request.headers.get('user-agent')
+        ip_address, user_agent = self._client_info(request)
 
         session_info = self._parse_user_agent(user_agent)
 
@@ -41,7 +47,7 @@ class SessionService:
             user_agent=user_agent,
             **session_info,
         )
-        await self.repo.create(login_session)
+        self.writer.create(login_session)
 
     async def update_session(
         self,
@@ -49,12 +55,7 @@ class SessionService:
         request: Request,
     ) -> None:
         """Обновить запись о сессии входа."""
-        db_login_session = await self.repo.get_by_token_id(refresh_token_id)
-        if not db_login_session:
-            return
-
-        ip_address = get_real_ip(request)
-        user_agent = request.headers.get('user-agent')
+        ip_address, user_agent = self._client_info(request)
 
         session_info = self._parse_user_agent(user_agent)
 
@@ -64,26 +65,35 @@ class SessionService:
             user_agent=user_agent,
             **session_info,
         )
-        await self.repo.update(db_login_session.id, login_session)
+        self.writer.update(refresh_token_id, login_session)
+
+    @staticmethod
+    def _client_info(request: Request) -> tuple[str | None, str | None]:
+        """IP адрес и User-Agent клиента, обрезанные до длины колонок."""
+        ip_address = get_real_ip(request)
+        user_agent = request.headers.get('user-agent')
+        return (
+            ip_address[:IP_ADDRESS_LENGTH] if ip_address else ip_address,
+            user_agent[:USER_AGENT_LENGTH] if user_agent else user_agent,
+        )
 
     @staticmethod
     def _parse_user_agent(user_agent_string: str) -> dict:
-        """Парсит User-Agent строку."""
-        if not user_agent_string:
-            return {}
-
-        ua = parse(user_agent_string)
-
-        device_type = 'unknown'
-        if ua.is_mobile:
-            device_type = 'mobile'
-        elif ua.is_tablet:
-            device_type = 'tablet'
-        elif ua.is_pc:
-            device_type = 'desktop'
-
-        return {
-            'browser': ua.browser.family,
-            'os': ua.os.family,
-            'device_type': device_type,
-        }
+        """Парсит User-Agent строку (результат кэшируется)."""
+        return dict(parse_user_agent(user_agent_string))
+
+
+async def prewarm_user_agent_cache() -> int:
+    """Заполнить кэш User-Agent строками из недавних сессий."""
+    since = datetime.now(UTC) - timedelta(days=settings.USER_AGENT_PREWARM_DAYS)
+    try:
+        async with AsyncSessionLocal() as session:
+            user_agents = await SessionRepository(session).get_recent_user_agents(
+                settings.USER_AGENT_CACHE_SIZE,
+                since,
+                timeout=settings.USER_AGENT_PREWARM_TIMEOUT,
+            )
+    except Exception:
+        logger.exception('Не удалось загрузить User-Agent для прогрева кэша')
+        return 0
+    return warm_up(user_agents)
@@ -0,0 +1,163 @@
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.core.tasks import spawn
+from app.repositories import SessionRepository
+from app.schemas import LoginSessionCreate, LoginSessionUpdate
+
+logger = logging.getLogger(__name__)
+
+
+class SessionWriter:
+    """Отложенная запись сессий входа в отдельной сессии БД.
+
+    События копятся в памяти и записываются пакетами: новые сессии -
+    одним INSERT, обновления (последнее на каждый токен) - одним UPDATE.
+
+    Refresh токен сохраняется в транзакции запроса, которая может быть
+    еще не зафиксирована к моменту записи: такие сессии повторяются
+    в следующих пакетах в течение retry_window.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        max_events: int = 10000,
+        retry_window: float = 30,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_events = max_events
+        self.retry_window = timedelta(seconds=retry_window)
+        self._creates: list[LoginSessionCreate] = []
+        self._updates: dict[int, LoginSessionUpdate] = {}
+        self._flushes = 0
+        self._created = 0
+        self._updated = 0
+        self._failed = 0
+
+    def create(self, data: LoginSessionCreate) -> None:
+        """Добавить новую сессию в очередь записи."""
+        self._creates.append(data)
+        self._check_size()
+
+    def update(self, refresh_token_id: int, data: LoginSessionUpdate) -> None:
+        """Добавить обновление сессии в очередь записи."""
+        self._updates[refresh_token_id] = data
+        self._check_size()
+
+    async def flush(self) -> int:
+        """Записать накопленные события, вернуть их количество."""
+        return await self._write(*self._take())
+
+    def stats(self) -> dict[str, int]:
+        """Метрики записи."""
+        return {
+            'pending': len(self._creates) + len(self._updates),
+            'max_events': self.max_events,
+            'flushes': self._flushes,
+            'created': self._created,
+            'updated': self._updated,
+            'failed': self._failed,
+        }
+
+    def _check_size(self) -> None:
+        """Сбросить переполненную очередь, не дожидаясь таймера."""
+        if len(self._creates) + len(self._updates) >= self.max_events:
+            spawn(self._write(*self._take()))
+
+    def _take(self) -> tuple[list[LoginSessionCreate], dict[int, LoginSessionUpdate]]:
+        """Забрать накопленные события, освободив очередь."""
+        creates, self._creates = self._creates, []
+        updates, self._updates = self._updates, {}
+        return creates, updates
+
+    async def _write(
+        self,
+        creates: list[LoginSessionCreate],
+        updates: dict[int, LoginSessionUpdate],
+    ) -> int:
+        if not creates and not updates:
+            return 0
+
+        rejected: set[int] = set()
+        try:
+            created, updated = await self._write_batch(creates, updates)
+        except Exception:
+            # Одна ошибочная строка не должна отменять запись всего пакета
+            logger.warning('Ошибка пакетной записи сессий, запись по одной', exc_info=True)
+            try:
+                created, updated, rejected = await self._write_rows(creates, updates)
+            except Exception:
+                self._failed += len(creates) + len(updates)
+                logger.exception('Ошибка записи сессий входа')
+                return 0
+
+        self._flushes += 1
+        self._created += len(created)
+        self._updated += updated
+        # Отклоненные сессии не повторяются
+        done = created | rejected
+        self._retry([item for item in creates if item.refresh_token_id not in done])
+        return len(created) + updated
+
+    async def _write_batch(
+        self,
+        creates: list[LoginSessionCreate],
+        updates: dict[int, LoginSessionUpdate],
+    ) -> tuple[set[int], int]:
+        """Записать события одной транзакцией."""
+        async with self.session_factory() as session:
+            repo = SessionRepository(session)
+            # Сначала создание: обновление может относиться к сессии из этого же пакета
+            created = await repo.create_many(creates)
+            updated = await repo.update_many_by_token_id(updates)
+            await session.commit()
+        return created, updated
+
+    async def _write_rows(
+        self,
+        creates: list[LoginSessionCreate],
+        updates: dict[int, LoginSessionUpdate],
+    ) -> tuple[set[int], int, set[int]]:
+        """Записать события по одному (в точках сохранения), пропуская ошибочные.
+
+        Возвращает ID токенов созданных сессий, число обновленных
+        и ID токенов отклоненных сессий.
+        """
+        created: set[int] = set()
+        rejected: set[int] = set()
+        updated = 0
+        async with self.session_factory() as session:
+            repo = SessionRepository(session)
+            for item in creates:
+                try:
+                    async with session.begin_nested():
+                        created |= await repo.create_many([item])
+                except Exception:
+                    rejected.add(item.refresh_token_id)
+                    logger.exception('Ошибка записи сессии входа')
+            for token_id, item in updates.items():
+                try:
+                    async with session.begin_nested():
+                        updated += await repo.update_many_by_token_id({token_id: item})
+                except Exception:
+                    self._failed += 1
+                    logger.exception('Ошибка обновления сессии входа')
+            await session.commit()
+        self._failed += len(rejected)
+        return created, updated, rejected
+
+    def _retry(self, creates: list[LoginSessionCreate]) -> None:
+        """Вернуть в очередь недавние сессии, токены которых еще не видны."""
+        deadline = datetime.now(UTC) - self.retry_window
+        self._creates.extend(item for item in creates if item.login_at > deadline)
+
+
+session_writer = SessionWriter(max_events=settings.SESSION_WRITER_BUFFER_SIZE)
+metrics.register('session_writer', session_writer.stats)
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.exceptions import (
     ConflictError,
     NotFoundError,
@@ -10,13 +11,21 @@ from app.core.security import SecurityService
 from app.models import User
 from app.repositories import UserRepository
 from app.schemas import (
-    UserSchema,
+    Principal,
+    UserBatchItem,
+    UserBatchRequest,
+    UserBatchResponse,
+    UserBatchStatus,
+    UserBatchUpdateRequest,
     UserCreate,
     UserCreateRequest,
     UserRole,
+    UserSearchMode,
+    UserSessionsMode,
     UserUpdate,
     UserUpdateRequest,
 )
+from app.services.activity import ActivityBuffer, activity_buffer
 
 
 class UserService:
@@ -27,18 +36,20 @@ class UserService:
         session: AsyncSession,
         user_repo: UserRepository | None = None,
         security_service: SecurityService | None = None,
+        activity: ActivityBuffer | None = None,
     ) -> None:
         self.session = session
         self.repo = user_repo or UserRepository(session)
         self.security = security_service or SecurityService()
+        self.activity = activity or activity_buffer
 
     async def get_user_by_id(self, user_id: int) -> User | None:
         """Получить пользователя по ID."""
         return await self.repo.get(user_id)
 
-    async def get_user_by_email(self, email: str) -> User | None:
-        """Получить пользователя по email."""
-        return await self.repo.get_by_email(email)
+    async def get_user_by_email(self, email: str, *, cached: bool = True) -> User | None:
+        """Получить пользователя по email (cached=False - с хэшем пароля из БД)."""
+        return await self.repo.get_by_email(email, cached=cached)
 
     async def get_user_with_details(self, user_id: int) -> User | None:
         """Получить пользователя по ID с детальной информацией."""
@@ -53,21 +64,60 @@ class UserService:
         limit: int = 20,
         search: str | None = None,
         role: str | None = None,
+        search_mode: UserSearchMode = UserSearchMode.CONTAINS,
+        *,
+        sessions: UserSessionsMode = UserSessionsMode.ALL,
+        sessions_limit: int = 5,
     ) -> list[User]:
-        """Получить спис пользователей."""
-        return await self.repo.get_many_with_sessions(skip, limit, search, role)
+        """Получить спис пользователей.
+
+        sessions, sessions_limit - режим загрузки сессий (см. UserRepository.load_sessions).
+        """
+        search, limit = self._validate_search(search, limit)
+        return await self.repo.get_many_with_sessions(
+            skip,
+            limit,
+            search,
+            role,
+            search_mode,
+            sessions=sessions,
+            sessions_limit=sessions_limit,
+        )
+
+    async def paginate_users_with_details(
+        self,
+        cursor: str | None = None,
+        limit: int = 20,
+        search: str | None = None,
+        role: str | None = None,
+        search_mode: UserSearchMode = UserSearchMode.CONTAINS,
+        *,
+        sessions: UserSessionsMode = UserSessionsMode.ALL,
+        sessions_limit: int = 5,
+    ) -> tuple[list[User], str | None]:
+        """Получить страницу пользователей и курсор следующей страницы."""
+        search, limit = self._validate_search(search, limit)
+        return await self.repo.paginate_with_sessions(
+            cursor,
+            limit,
+            search,
+            role,
+            search_mode,
+            sessions=sessions,
+            sessions_limit=sessions_limit,
+        )
 
     async def create_user(
         self,
         user_data: UserCreateRequest,
-        current_user: UserSchema | None = None,
+        current_user: Principal | None = None,
     ) -> User:
         """Создать нового пользователя."""
         await self._validate_create_data(user_data, current_user)
 
         user_to_db = UserCreate(
             **user_data.model_dump(exclude={'password'}),
-            password_hash=self.security.get_password_hash(user_data.password),
+            password_hash=await self.security.get_password_hash_async(user_data.password),
         )
 
         user = await self.repo.create(user_to_db)
@@ -79,7 +129,7 @@ class UserService:
         self,
         user_id: int,
         user_data: UserUpdateRequest,
-        current_user: UserSchema,
+        current_user: Principal,
     ) -> User:
         """Обновить пользователя."""
         await self._check_permission(current_user, user_id)
@@ -92,21 +142,104 @@ class UserService:
         await self.session.refresh(user)
         return user
 
-    async def delete_user(self, user_id: int, current_user: UserSchema) -> None:
+    async def delete_user(self, user_id: int, current_user: Principal) -> None:
         """Удалить пользователя."""
         await self._check_permission(current_user, user_id)
 
         await self.repo.delete(user_id)
         await self.session.flush()
 
+    async def batch_update(
+        self,
+        request: UserBatchUpdateRequest,
+        current_user: Principal,
+    ) -> UserBatchResponse:
+        """Обновить пользователей пакетом (одна транзакция)."""
+        changes = request.changes.model_dump(exclude_unset=True)
+        if not changes:
+            raise ValidationError('Не указаны изменения')
+        role = changes.get('role')
+        if role and UserRole(role).priority >= current_user.rank:
+            raise ValidationError('Нельзя назначать права, равные или превышающие ваши')
+
+        allowed, response = await self.resolve_batch(request, current_user)
+        await self.repo.update_many(allowed, UserUpdate(**changes))
+        await self.session.flush()
+        return response
+
+    async def batch_delete(
+        self,
+        request: UserBatchRequest,
+        current_user: Principal,
+    ) -> UserBatchResponse:
+        """Удалить пользователей пакетом (одна транзакция)."""
+        allowed, response = await self.resolve_batch(request, current_user)
+        await self.repo.delete_many(allowed)
+        await self.session.flush()
+        return response
+
+    async def resolve_batch(
+        self,
+        request: UserBatchRequest,
+        current_user: Principal,
+    ) -> tuple[list[int], UserBatchResponse]:
+        """Пользователи, к которым есть доступ, и результат по каждому ID."""
+        if request.filter is None:
+            access = await self.repo.check_access(current_user, request.ids)
+        else:
+            # По условию - не больше USER_BATCH_MAX_IDS, как и по списку ID
+            max_ids = settings.USER_BATCH_MAX_IDS
+            access = await self.repo.check_access(
+                current_user,
+                **request.filter.model_dump(),
+                limit=max_ids + 1,
+            )
+            if len(access) > max_ids:
+                raise ValidationError(
+                    f'Условию соответствует больше {max_ids} пользователей',
+                )
+
+        results = [
+            UserBatchItem(
+                id=user_id,
+                status=UserBatchStatus.OK if allowed else UserBatchStatus.FORBIDDEN,
+            )
+            for user_id, allowed in access.items()
+        ]
+        results += [
+            UserBatchItem(id=user_id, status=UserBatchStatus.NOT_FOUND)
+            for user_id in dict.fromkeys(request.ids or ())
+            if user_id not in access
+        ]
+
+        allowed = [user_id for user_id, allowed in access.items() if allowed]
+        response = UserBatchResponse(
+            succeeded=len(allowed),
+            failed=len(results) - len(allowed),
+            results=results,
+        )
+        return allowed, response
+
+    def _validate_search(self, search: str | None, limit: int) -> tuple[str | None, int]:
+        """Проверить строку поиска и ограничить число результатов."""
+        search = search.strip() if search else None
+        if not search:
+            return None, limit
+
+        if len(search) < settings.USER_SEARCH_MIN_LENGTH:
+            raise ValidationError(
+                f'Строка поиска должна быть не короче {settings.USER_SEARCH_MIN_LENGTH} символов',
+            )
+        return search, min(limit, settings.USER_SEARCH_MAX_RESULTS)
+
     async def _validate_create_data(
         self,
         user_data: UserCreateRequest,
-        current_user: UserSchema | None = None,
+        current_user: Principal | None = None,
     ) -> None:
         """Валидация данных для создания пользователя."""
         # Проверка правильности роли
-        if current_user and user_data.role.priority >= current_user.role.priority:
+        if current_user and user_data.role.priority >= current_user.rank:
             raise ValidationError('Нельзя назначать права, равные или превышающие ваши')
 
         if not current_user and user_data.role != UserRole.USER:
@@ -119,22 +252,22 @@ class UserService:
     async def _validate_update_data(
         self,
         user_data: UserUpdateRequest,
-        current_user: UserSchema,
+        current_user: Principal,
         user_id: int,
     ) -> None:
         """Валидация данных для обновления пользователя."""
         # Проверка правильности роли
-        if user_id == current_user.id and user_data.role.priority <= current_user.role.priority:
+        if user_id == current_user.id and user_data.role.priority <= current_user.rank:
             return
 
-        if user_data.role.priority >= current_user.role.priority:
+        if user_data.role.priority >= current_user.rank:
             raise ValidationError('Нельзя назначать права, равные или превышающие ваши')
 
     async def update_user_activity(self, user_id:int) -> None:
-        """Обновить метрики активности пользователя."""
-        await self.repo.update_activity(user_id)
+        """Обновить метрики активности пользователя (запись в БД - пакетами в фоне)."""
+        self.activity.record(user_id)
 
-    async def _check_permission(self, current_user: UserSchema, target_user_id: int) -> None:
+    async def _check_permission(self, current_user: Principal, target_user_id: int) -> None:
         """Проверка прав доступа к пользователю."""
         target_user = await self.repo.get(target_user_id)
         if not target_user:
@@ -142,7 +275,7 @@ class UserService:
 
         if current_user.id == target_user.id:
             return
-        if current_user.role.priority > target_user.role.priority:
+        if current_user.rank > target_user.role.priority:
             return
 
         raise PermissionDeniedError('Недостаточно прав для изменения пользователя')
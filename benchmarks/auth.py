@@ -0,0 +1,120 @@
+"""Накладные расходы зависимостей аутентификации на запрос.
+
+Сравнивает прежнюю цепочку (UserSchema через Pydantic, словарь
+приоритетов на каждое обращение, синхронная проверка роли в пуле
+потоков) с текущей (Principal и async require_role). Проверка
+токена подменена: замеряются только зависимости.
+
+Запуск: python -m benchmarks.auth [--requests N]
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import time
+from typing import Annotated, Any
+from unittest.mock import patch
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import SecurityService
+from app.dependencies.auth import get_current_user, require_role, security
+from app.schemas import UserRole, UserSchema
+
+PAYLOAD = {'sub': '1', 'role': 'admin', 'type': 'access', 'iat': 0, 'exp': 2**40}
+
+
+def legacy_priority(role: UserRole) -> int:
+    """Приоритет роли через новый словарь на каждое обращение (как было)."""
+    return {
+        UserRole.USER: 1,
+        UserRole.MODERATOR: 2,
+        UserRole.ADMIN: 3,
+    }.get(role, 1)
+
+
+async def legacy_current_user(
+    credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
+) -> UserSchema:
+    """Прежняя get_current_user."""
+    payload = SecurityService.verify_access_token(credentials.credentials)
+    return UserSchema(id=payload.get('sub'), role=payload.get('role'))
+
+
+def legacy_require_role(required_role: UserRole) -> Callable[[UserSchema], None]:
+    """Прежняя require_role (синхронная - выполняется в пуле потоков)."""
+
+    def role_checker(current_user: Annotated[UserSchema, Depends(legacy_current_user)]) -> None:
+        if legacy_priority(required_role) > legacy_priority(current_user.role):
+            raise PermissionError
+
+    return role_checker
+
+
+async def no_dependency() -> None:
+    """Пустая зависимость (базовое время запроса)."""
+
+
+def build_app(current_user: Callable[..., Any], role_dependency: Callable[..., Any]) -> FastAPI:
+    """Приложение с проверкой роли на роутере и пользователем в эндпоинте."""
+    router = APIRouter(dependencies=[Depends(role_dependency)])
+
+    @router.get('/me')
+    async def me(user: Annotated[Any, Depends(current_user)]) -> None:
+        return None
+
+    app = FastAPI()
+    app.include_router(router)
+    return app
+
+
+async def measure(app: FastAPI, requests: int) -> float:
+    """Время запроса, мкс."""
+    headers = {'Authorization': 'Bearer token'}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as client:
+        await client.get('/me', headers=headers)
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get('/me', headers=headers)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+def measure_sync(func: Callable[[], Any], calls: int) -> float:
+    """Время вызова, нс."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1_000_000_000
+
+
+async def run(requests: int) -> None:
+    apps = {
+        'legacy': build_app(legacy_current_user, legacy_require_role(UserRole.ADMIN)),
+        'principal': build_app(get_current_user, require_role(UserRole.ADMIN)),
+    }
+    baseline = build_app(no_dependency, no_dependency)
+
+    with patch.object(SecurityService, 'verify_access_token', return_value=PAYLOAD):
+        empty = await measure(baseline, requests)
+        print(f'{"chain":<12}{"us/request":>12}{"deps, us":>12}')
+        for name, app in apps.items():
+            elapsed = await measure(app, requests)
+            print(f'{name:<12}{elapsed:>12.1f}{elapsed - empty:>12.1f}')
+
+    print(f'\n{"priority":<12}{"ns/call":>12}')
+    print(f'{"legacy":<12}{measure_sync(lambda: legacy_priority(UserRole.ADMIN), 10**6):>12.0f}')
+    print(f'{"precomputed":<12}{measure_sync(lambda: UserRole.ADMIN.priority, 10**6):>12.0f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.auth')
+    parser.add_argument('--requests', type=int, default=5_000, help='Количество запросов')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests))
+
+
+if __name__ == '__main__':
+    main()
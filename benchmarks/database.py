@@ -0,0 +1,76 @@
+"""Накладные расходы БД на запрос для профилей движка (DB_PROFILE).
+
+Каждый "запрос" повторяет обработчик API: сессия из пула, выборка
+пользователя по email и commit. Нужна база из DATABASE_URL
+(для профиля pgbouncer - адрес PgBouncer, см. --url).
+
+Запуск: python -m benchmarks.database [--requests N] [--concurrency N] [--url URL]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.database import ENGINE_PROFILES
+from app.models import User
+
+
+async def request(session_factory: async_sessionmaker[AsyncSession], i: int) -> None:
+    """Один запрос обработчика."""
+    async with session_factory() as session:
+        await session.execute(select(User).where(User.email == f'user{i % 1000}@example.com'))
+        await session.commit()
+
+
+async def measure(engine: AsyncEngine, requests: int, concurrency: int) -> float:
+    """Время запроса, мкс (при concurrency одновременных клиентах)."""
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    for i in range(concurrency):
+        await request(session_factory, i)
+
+    async def client(start: int) -> None:
+        for i in range(start, requests, concurrency):
+            await request(session_factory, i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(url: str, requests: int, concurrency: int) -> None:
+    print(f'{"profile":<14}{"us/request":>12}')
+    for name, profile in ENGINE_PROFILES.items():
+        engine = create_async_engine(
+            url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            **profile.engine_kwargs(),
+        )
+        try:
+            elapsed = await measure(engine, requests, concurrency)
+        finally:
+            await engine.dispose()
+        print(f'{name:<14}{elapsed:>12.1f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.database')
+    parser.add_argument('--requests', type=int, default=5_000, help='Количество запросов')
+    parser.add_argument('--concurrency', type=int, default=4, help='Одновременных клиентов')
+    parser.add_argument('--url', default=settings.database_url, help='Адрес БД')
+    args = parser.parse_args()
+
+    asyncio.run(run(args.url, args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
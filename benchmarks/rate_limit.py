@@ -0,0 +1,64 @@
+"""Сравнение стратегий rate limit в памяти процесса.
+
+Запуск: python -m benchmarks.rate_limit [--keys N] [--hits N]
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import (
+    FixedWindowRateLimiter,
+    MovingWindowRateLimiter,
+    RateLimiter,
+    SlidingWindowCounterRateLimiter,
+)
+
+from app.core.gcra import GCRARateLimiter
+
+STRATEGIES = {
+    'fixed-window': lambda: FixedWindowRateLimiter(MemoryStorage()),
+    'moving-window': lambda: MovingWindowRateLimiter(MemoryStorage()),
+    'sliding-window-counter': lambda: SlidingWindowCounterRateLimiter(MemoryStorage()),
+    'gcra': lambda: GCRARateLimiter(),
+}
+
+
+def run(limiter: RateLimiter, keys: list[str], hits: int) -> float:
+    """Время одной проверки, мкс."""
+    item = parse('5/minute')
+
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, keys[i % len(keys)], '/login')
+    return (time.perf_counter() - start) / hits * 1_000_000
+
+
+def measure_memory(limiter: RateLimiter, keys: list[str]) -> int:
+    """Память под состояние всех ключей, байт."""
+    tracemalloc.start()
+    run(limiter, keys, len(keys))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return memory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.rate_limit')
+    parser.add_argument('--keys', type=int, default=10_000, help='Количество различных IP')
+    parser.add_argument('--hits', type=int, default=200_000, help='Количество проверок')
+    args = parser.parse_args()
+
+    keys = [f'10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}' for i in range(args.keys)]
+
+    print(f'{"strategy":<24}{"us/hit":>10}{"memory, KiB":>14}')
+    for name, factory in STRATEGIES.items():
+        per_hit = run(factory(), keys, args.hits)
+        memory = measure_memory(factory(), keys)
+        print(f'{name:<24}{per_hit:>10.2f}{memory / 1024:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
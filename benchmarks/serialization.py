@@ -0,0 +1,114 @@
+"""Сериализация ответов API: списка пользователей и пары токенов.
+
+Сравнивает прежний путь FastAPI (jsonable_encoder + json.dumps),
+запись сразу в байты через Pydantic (dump_json - используется FastAPI
+для эндпоинтов с моделью ответа) и orjson, если он установлен.
+
+Запуск: python -m benchmarks.serialization [--users N] [--sessions N] [--repeat N]
+"""
+
+import argparse
+from collections.abc import Callable
+from datetime import UTC, datetime
+import json
+import time
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import EmailStr, TypeAdapter
+
+from app.models import LoginSession, User
+from app.schemas import TokensResponse, UserResponse, UserRole
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость
+    orjson = None
+
+
+class EmailStrUserResponse(UserResponse):
+    """Модель ответа с повторной проверкой email (как было)."""
+
+    email: EmailStr
+
+
+def make_users(count: int, sessions: int) -> list[User]:
+    """ORM объекты пользователей с сессиями (без БД)."""
+    now = datetime.now(UTC)
+    users = []
+    for i in range(count):
+        user = User(
+            id=i,
+            email=f'user{i}@example.com',
+            role=UserRole.USER,
+            status='active',
+            created_at=now,
+            last_active_at=now,
+            total_active_time=i,
+        )
+        user.login_sessions = [
+            LoginSession(
+                id=i * sessions + j,
+                ip_address='10.0.0.1',
+                device_type='desktop',
+                browser='Firefox',
+                os='Linux',
+                login_at=now,
+                last_activity_at=now,
+            )
+            for j in range(sessions)
+        ]
+        users.append(user)
+    return users
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Среднее время вызова, мс."""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def serializers(adapter: TypeAdapter, value: Any) -> dict[str, Callable[[], Any]]:
+    """Способы записи проверенного ответа в байты."""
+    result = {
+        'jsonable_encoder+json': lambda: json.dumps(jsonable_encoder(value)).encode(),
+        'dump_json': lambda: adapter.dump_json(value),
+    }
+    if orjson is not None:
+        result['orjson'] = lambda: orjson.dumps(adapter.dump_python(value, mode='json'))
+    return result
+
+
+def report(name: str, adapter: TypeAdapter, content: Any, repeat: int) -> None:
+    """Время проверки и записи ответа (как в FastAPI: validate, затем serialize)."""
+
+    def validate() -> Any:
+        return adapter.validate_python(content, from_attributes=True)
+
+    value = validate()
+    print(f'{name}: validate {measure(validate, repeat):.3f} ms')
+    for serializer, func in serializers(adapter, value).items():
+        print(f'  {serializer:<24}{measure(func, repeat):>10.3f} ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.serialization')
+    parser.add_argument('--users', type=int, default=1000, help='Пользователей в списке')
+    parser.add_argument('--sessions', type=int, default=5, help='Сессий у пользователя')
+    parser.add_argument('--repeat', type=int, default=20, help='Повторов замера')
+    args = parser.parse_args()
+
+    users = make_users(args.users, args.sessions)
+    report('GET /admin/users', TypeAdapter(list[UserResponse]), users, args.repeat)
+    legacy = TypeAdapter(list[EmailStrUserResponse])
+    report('GET /admin/users (EmailStr)', legacy, users, args.repeat)
+
+    tokens = TokensResponse(access_token='a' * 400, refresh_token='r' * 300)
+    report('POST /login', TypeAdapter(TokensResponse), tokens, args.repeat * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
 import os
 from pathlib import Path
 import sys
@@ -6,17 +7,20 @@ import sys
 from asgi_lifespan import LifespanManager
 from httpx import ASGITransport, AsyncClient
 import pytest_asyncio
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import NullPool
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 
+from app.core.config import settings
 from app.dependencies import get_db_session
 from app.main import app
 from app.models import Base, User
 from app.repositories import UserRepository
 from app.schemas import UserCreate
+from app.services.session_writer import session_writer
 
 TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
 if not TEST_DATABASE_URL:
@@ -35,6 +39,8 @@ async def test_engine():
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        # Триграммный индекс поиска по email
+        await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
@@ -62,14 +68,27 @@ async def db_session(test_engine) -> AsyncGenerator[AsyncSession]:
 
 
 @pytest_asyncio.fixture
-async def client(db_session: AsyncSession):
+async def client(db_session: AsyncSession, monkeypatch):
     """Асинхронный клиент."""
     # Подменяем зависимость
     app.dependency_overrides[get_db_session] = lambda: db_session
 
+    # Сессии входа пишутся в тестовую сессию БД после каждого ответа,
+    # а не по таймеру, чтобы тесты сразу видели результат
+    @asynccontextmanager
+    async def test_session_factory():
+        yield db_session
+
+    async def flush_sessions(_response):
+        await session_writer.flush()
+
+    monkeypatch.setattr(session_writer, 'session_factory', test_session_factory)
+    monkeypatch.setattr(settings, 'SESSION_WRITER_INTERVAL', 3600)
+
     async with LifespanManager(app) as manager, AsyncClient(
         transport=ASGITransport(app=manager.app),
         base_url='http://testserver',
+        event_hooks={'response': [flush_sessions]},
     ) as client:
         yield client
 
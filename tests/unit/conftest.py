@@ -6,7 +6,7 @@ import pytest
 
 from app.core.security import SecurityService
 from app.repositories import SessionRepository, TokenRepository, UserRepository
-from app.schemas import UserLogin, UserRole, UserSchema
+from app.schemas import Principal, UserLogin, UserRole, UserSchema
 from app.services.user import UserService
 
 
@@ -43,15 +43,15 @@ def mock_user() -> UserSchema:
 
 
 @pytest.fixture
-def mock_admin() -> UserSchema:
-    """Мок пользователя ADMIN роли."""
-    return UserSchema(id=2, role=UserRole.ADMIN, email='admin@example.com')
+def mock_admin() -> Principal:
+    """Текущий пользователь ADMIN роли."""
+    return Principal(2, UserRole.ADMIN, UserRole.ADMIN.priority)
 
 
 @pytest.fixture
-def mock_moderator() -> UserSchema:
-    """Мок пользователя MODERATOR роли."""
-    return UserSchema(id=3, role=UserRole.MODERATOR, email='moderator@example.com')
+def mock_moderator() -> Principal:
+    """Текущий пользователь MODERATOR роли."""
+    return Principal(3, UserRole.MODERATOR, UserRole.MODERATOR.priority)
 
 
 @pytest.fixture
@@ -60,7 +60,8 @@ def mock_token_repo(mock_async_session) -> MagicMock:
     repo = MagicMock(spec=TokenRepository)
     repo.session = mock_async_session
 
-    repo.get_by_token = AsyncMock()
+    repo.get_by_token_hash = AsyncMock()
+    repo.rotate = AsyncMock()
     repo.create = AsyncMock()
     repo.update = AsyncMock()
     repo.delete = AsyncMock()
@@ -82,7 +83,7 @@ def mock_user_repo(mock_async_session) -> MagicMock:
     repo.create = AsyncMock()
     repo.update = AsyncMock()
     repo.delete = AsyncMock()
-    repo.update_activity = AsyncMock()
+    repo.add_activity = AsyncMock()
     repo.exists_by = AsyncMock()
 
     return repo
@@ -95,6 +96,8 @@ def mock_session_repo(mock_async_session) -> MagicMock:
     repo.session = mock_async_session
 
     repo.get_by_token_id = AsyncMock()
+    repo.create_many = AsyncMock()
+    repo.update_many_by_token_id = AsyncMock()
     repo.create = AsyncMock()
     repo.update = AsyncMock()
 
@@ -125,10 +128,14 @@ def mock_security_service() -> MagicMock:
 
     service.get_password_hash = Mock()
     service.verify_password = Mock()
+    service.get_password_hash_async = AsyncMock()
+    service.verify_password_async = AsyncMock()
+    service.password_needs_rehash = Mock(return_value=False)
     service.create_access_token = Mock()
     service.create_refresh_token = Mock()
     service.verify_token = Mock()
     service.is_token_expired = Mock()
+    service.hash_token = Mock(side_effect=SecurityService.hash_token)
 
     return service
 
@@ -156,7 +163,7 @@ def mock_db_token() -> MagicMock:
     token = MagicMock()
     token.id = 100
     token.user_id = 1
-    token.token = 'refresh.token.value'
+    token.token_hash = SecurityService.hash_token('refresh.token.value')
     token.expires_at = 9999999999
 
     return token
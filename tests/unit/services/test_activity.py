@@ -0,0 +1,75 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.repositories import UserRepository
+from app.services.activity import ActivityBuffer
+
+
+class TestActivityBuffer:
+    """Тесты для ActivityBuffer."""
+
+    @pytest.fixture
+    def session_factory(self, mock_async_session):
+        """Фабрика сессий, возвращающая мок сессии."""
+        mock_async_session.__aenter__ = AsyncMock(return_value=mock_async_session)
+        mock_async_session.__aexit__ = AsyncMock(return_value=None)
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=None)
+        mock_async_session.begin = MagicMock(return_value=transaction)
+        return MagicMock(return_value=mock_async_session)
+
+    @pytest.mark.asyncio
+    async def test_flush_coalesces_hits(self, session_factory):
+        """Тест схлопывания обращений одного пользователя."""
+        buffer = ActivityBuffer(session_factory)
+        for user_id in (1, 2, 1, 1):
+            buffer.record(user_id)
+
+        with patch.object(UserRepository, 'add_activity') as add_activity:
+            assert await buffer.flush() == 2
+
+            add_activity.assert_called_once()
+            activity = add_activity.call_args[0][0]
+            assert activity[1][0] == 3
+            assert activity[2][0] == 1
+
+        # Один запрос на весь буфер
+        assert session_factory.call_count == 1
+        assert buffer.stats()['pending'] == 0
+        assert buffer.stats()['flushed_users'] == 2
+
+    @pytest.mark.asyncio
+    async def test_flush_empty(self, session_factory):
+        """Тест сброса пустого буфера без обращения к БД."""
+        buffer = ActivityBuffer(session_factory)
+
+        assert await buffer.flush() == 0
+        session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_record_flushes_when_full(self, session_factory):
+        """Тест немедленного сброса переполненного буфера."""
+        buffer = ActivityBuffer(session_factory, max_users=2)
+
+        with patch('app.services.activity.spawn') as spawn:
+            buffer.record(1)
+            spawn.assert_not_called()
+
+            buffer.record(2)
+            spawn.assert_called_once()
+            spawn.call_args[0][0].close()
+
+        assert buffer.stats()['pending'] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_error(self, session_factory):
+        """Тест что ошибка записи не выходит за пределы буфера."""
+        buffer = ActivityBuffer(session_factory)
+        buffer.record(1)
+
+        with patch.object(UserRepository, 'add_activity', side_effect=RuntimeError('db')):
+            assert await buffer.flush() == 0
+
+        assert buffer.stats()['failed_users'] == 1
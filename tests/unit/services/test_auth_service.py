@@ -1,11 +1,11 @@
-from datetime import UTC, datetime
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
-from freezegun import freeze_time
 import pytest
 
-from app.core.exceptions import AuthenticationError
-from app.schemas import TokensResponse, UserRole
+from app.core.exceptions import AuthenticationError, TooManyRequestsError
+from app.core.security import SecurityService
+from app.core.throttle import LoginThrottle
+from app.schemas import TokensResponse, UserBatchRequest, UserBatchResponse, UserRole
 from app.services.auth import AuthService
 
 
@@ -20,6 +20,8 @@ class TestAuthService:
             token_repo=mock_token_repo,
             user_service=mock_user_service,
             security=mock_security_service,
+            throttle=LoginThrottle(free_attempts=2),
+            revocation=MagicMock(revoke=AsyncMock()),
         )
 
     @pytest.mark.asyncio
@@ -55,13 +57,16 @@ class TestAuthService:
 
         with (
             patch.object(service.user_service, 'get_user_by_email', return_value=mock_db_user),
-            patch.object(service.security, 'verify_password', return_value=True),
+            patch.object(service.security, 'verify_password_async', return_value=True),
             patch.object(service, '_create_tokens', return_value=(mock_tokens, 1, 100)),
         ):
             tokens, user_id, token_id = await service.login(mock_login_data)
 
-            service.user_service.get_user_by_email.assert_called_once_with('test@example.com')
-            service.security.verify_password.assert_called_once()
+            service.user_service.get_user_by_email.assert_called_once_with(
+                'test@example.com',
+                cached=False,
+            )
+            service.security.verify_password_async.assert_called_once()
             assert user_id == 1
             assert token_id == 100
             assert tokens == mock_tokens
@@ -80,29 +85,95 @@ class TestAuthService:
         """Тест входа с неверным паролем."""
         with (
             patch.object(service.user_service, 'get_user_by_email', return_value=mock_db_user),
-            patch.object(service.security, 'verify_password', return_value=False),
+            patch.object(service.security, 'verify_password_async', return_value=False),
             pytest.raises(AuthenticationError, match='Неверный email или пароль'),
         ):
             await service.login(mock_login_data)
 
     @pytest.mark.asyncio
-    async def test_refresh_tokens_success(self, service, mock_db_user, mock_db_token):
+    async def test_login_throttled(self, service, mock_login_data, mock_db_user):
+        """Тест отказа без обращения к БД после серии неудачных попыток."""
+        with (
+            patch.object(service.user_service, 'get_user_by_email', return_value=mock_db_user),
+            patch.object(service.security, 'verify_password_async', return_value=False),
+        ):
+            for _ in range(2):
+                with pytest.raises(AuthenticationError):
+                    await service.login(mock_login_data)
+
+            with pytest.raises(TooManyRequestsError) as exc_info:
+                await service.login(mock_login_data)
+
+            assert service.user_service.get_user_by_email.call_count == 2
+            assert service.security.verify_password_async.call_count == 2
+        assert exc_info.value.retry_after == 1
+
+    @pytest.mark.asyncio
+    async def test_login_success_resets_throttle(self, service, mock_login_data, mock_db_user):
+        """Тест сброса счетчика неудач успешным входом."""
+        mock_tokens = TokensResponse(access_token='access', refresh_token='refresh', token_type='bearer')
+
+        with (
+            patch.object(service.user_service, 'get_user_by_email', return_value=mock_db_user),
+            patch.object(service.security, 'verify_password_async', side_effect=[False, True, False]),
+            patch.object(service, '_create_tokens', return_value=(mock_tokens, 1, 100)),
+        ):
+            with pytest.raises(AuthenticationError):
+                await service.login(mock_login_data)
+            await service.login(mock_login_data)
+
+            # После сброса до блокировки снова две попытки
+            with pytest.raises(AuthenticationError):
+                await service.login(mock_login_data)
+
+    @pytest.mark.asyncio
+    async def test_login_rehashes_stale_password(self, service, mock_login_data, mock_db_user):
+        """Тест фонового пересчета устаревшего хэша после входа."""
+        mock_tokens = TokensResponse(access_token='access', refresh_token='refresh', token_type='bearer')
+
+        with (
+            patch.object(service.user_service, 'get_user_by_email', return_value=mock_db_user),
+            patch.object(service.security, 'verify_password_async', return_value=True),
+            patch.object(service.security, 'password_needs_rehash', return_value=True),
+            patch.object(service, '_create_tokens', return_value=(mock_tokens, 1, 100)),
+            patch.object(service, '_rehash_password', new=Mock()) as rehash,
+            patch('app.services.auth.spawn') as spawn,
+        ):
+            await service.login(mock_login_data)
+
+        rehash.assert_called_once_with(1, mock_db_user.password_hash, 'password123')
+        spawn.assert_called_once_with(rehash.return_value)
+
+    @pytest.fixture
+    def mock_rotated_token(self):
+        """Результат атомарной замены refresh токена."""
+        return MagicMock(token_id=100, user_id=1, email='test@example.com', role=UserRole.USER)
+
+    @pytest.mark.asyncio
+    async def test_refresh_tokens_success(self, service, mock_rotated_token):
         """Тест успешного обновления токенов."""
         token = 'valid.refresh.token'
         payload = {'sub': '1', 'type': 'refresh', 'exp': 9999999999}
 
         with (
             patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
-            patch.object(service.security, 'is_token_expired', return_value=False),
-            patch.object(service.user_service, 'get_user_by_id', return_value=mock_db_user),
-            patch.object(service, '_generate_tokens', return_value=('new_access', 'new_refresh', 9999999999)),
+            patch.object(service.security, 'create_access_token', return_value='new_access'),
+            patch.object(service, '_generate_refresh_token', return_value=('new_refresh', 9999999999)),
+            patch.object(service.token_repo, 'rotate', return_value=mock_rotated_token),
         ):
             tokens, user_id, token_id = await service.refresh_tokens(token)
 
             service.security.verify_token.assert_called_once_with(token)
-            service.token_repo.get_by_token.assert_called_once_with(token)
-            service.token_repo.update.assert_called_once()
+            service.token_repo.rotate.assert_called_once_with(
+                SecurityService.hash_token(token),
+                SecurityService.hash_token('new_refresh'),
+                9999999999,
+            )
+            # Данные пользователя для access токена берутся из того же запроса
+            access_user = service.security.create_access_token.call_args[0][0]
+            assert access_user.email == 'test@example.com'
+            assert access_user.role == UserRole.USER
+            service.user_service.get_user_by_id.assert_not_called()
             assert user_id == 1
             assert token_id == 100
             assert tokens.access_token == 'new_access'
@@ -120,79 +191,39 @@ class TestAuthService:
         ):
             await service.refresh_tokens(access_token)
 
+        service.token_repo.rotate.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_refresh_tokens_not_found_in_db(self, service):
-        """Тест обновления с токеном, которого нет в БД."""
+        """Тест обновления с токеном, которого нет в БД (или он истек)."""
         token = 'valid.but.not.in.db'
         payload = {'sub': '1', 'type': 'refresh', 'exp': 9999999999}
 
         with (
             patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.token_repo, 'get_by_token', return_value=None),
-            pytest.raises(AuthenticationError, match='Токен не найден'),
+            patch.object(service, '_generate_refresh_token', return_value=('new_refresh', 9999999999)),
+            patch.object(service.token_repo, 'rotate', return_value=None),
+            pytest.raises(AuthenticationError, match='Токен не найден или истек'),
         ):
             await service.refresh_tokens(token)
 
     @pytest.mark.asyncio
-    async def test_refresh_tokens_expired(self, service, mock_db_token):
-        """Тест обновления истекшего токена."""
-        token = 'expired.token'
-        payload = {'sub': '1', 'type': 'refresh', 'exp': 9999999999}
-
-        mock_db_token.expires_at = 1000000000  # Истекший срок
-
-        with (
-            patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.security, 'is_token_expired', return_value=True),
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
-            pytest.raises(AuthenticationError, match='Токен истек'),
-        ):
-            await service.refresh_tokens(token)
-
-        service.token_repo.delete.assert_called_once_with(100)
-
-    @freeze_time('2026-01-01 12:00:00')
-    @pytest.mark.asyncio
-    async def test_refresh_token_near_expiry(self, service, mock_db_user, mock_db_token):
-        """Тест обновления токена с истекающим сроком."""
-        token = 'almost.expired.token'
-        exp_time = int(datetime.now(UTC).timestamp()) + 5  # Токен истекает через 5 секунд
-        payload = {'sub': '1', 'type': 'refresh', 'exp': exp_time}
-        mock_db_token.expires_at = exp_time
-
-        with (
-            patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.security, 'is_token_expired', return_value=False),
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
-            patch.object(service.user_service, 'get_user_by_id', return_value=mock_db_user),
-            patch.object(service, '_generate_tokens', return_value=('access_token', 'refresh_token', 9999999999)),
-        ):
-            # Должен работать нормально
-            await service.refresh_tokens(token)
-
-    @pytest.mark.asyncio
-    async def test_prevent_token_reuse(self, service, mock_db_user, mock_db_token):
+    async def test_prevent_token_reuse(self, service, mock_rotated_token):
         """Тест предотвращения повторного использования refresh токена."""
         token = 'used.refresh.token'
         payload = {'sub': '1', 'type': 'refresh', 'exp': 9999999999}
 
-        # Первый успешный вызов
+        # Первая замена проходит, вторая не находит старый токен
         with (
             patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.security, 'is_token_expired', return_value=False),
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
-            patch.object(service.user_service, 'get_user_by_id', return_value=mock_db_user),
-            patch.object(service, '_generate_tokens', return_value=('access_token', 'refresh_token', 9999999999)),
+            patch.object(service.security, 'create_access_token', return_value='new_access'),
+            patch.object(service, '_generate_refresh_token', return_value=('new_refresh', 9999999999)),
+            patch.object(service.token_repo, 'rotate', side_effect=[mock_rotated_token, None]),
         ):
             await service.refresh_tokens(token)
 
-        # Второй вызов с тем же токеном должен падать
-        with (
-            patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.token_repo, 'get_by_token', return_value=None),
-            pytest.raises(AuthenticationError, match='Токен не найден'),
-        ):
-            await service.refresh_tokens(token)
+            with pytest.raises(AuthenticationError, match='Токен не найден'):
+                await service.refresh_tokens(token)
 
     @pytest.mark.asyncio
     async def test_logout_success(self, service, mock_db_token):
@@ -200,12 +231,12 @@ class TestAuthService:
         token = 'valid.token.to.logout'
 
         with (
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
+            patch.object(service.token_repo, 'get_by_token_hash', return_value=mock_db_token),
             patch.object(service.token_repo, 'delete', return_value=True),
         ):
             result = await service.logout(token)
 
-            service.token_repo.get_by_token.assert_called_once_with(token)
+            service.token_repo.get_by_token_hash.assert_called_once_with(SecurityService.hash_token(token))
             service.token_repo.delete.assert_called_once_with(100)
 
         assert result is True
@@ -216,7 +247,7 @@ class TestAuthService:
         token = 'nonexistent.token'
 
         with (
-            patch.object(service.token_repo, 'get_by_token', return_value=None),
+            patch.object(service.token_repo, 'get_by_token_hash', return_value=None),
         ):
             result = await service.logout(token)
 
@@ -234,8 +265,9 @@ class TestAuthService:
         ):
             result = await service.logout_all(user_id)
 
-            # Проверяем что токены удаляются
+            # Проверяем что токены удаляются, а выданные access токены отзываются
             service.token_repo.delete_user_tokens.assert_called_once_with(user_id)
+            service.revocation.revoke.assert_awaited_once_with([user_id])
 
         assert result is True
 
@@ -250,6 +282,21 @@ class TestAuthService:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_batch_logout(self, service, mock_admin):
+        """Тест пакетного выхода: токены разрешенных пользователей удаляются одним запросом."""
+        response = UserBatchResponse(succeeded=2, failed=0)
+        service.user_service.resolve_batch = AsyncMock(return_value=([1, 5], response))
+        request = UserBatchRequest(ids=[1, 5])
+
+        with patch.object(service.token_repo, 'delete_users_tokens', return_value=4):
+            result = await service.batch_logout(request, mock_admin)
+
+            service.token_repo.delete_users_tokens.assert_called_once_with([1, 5])
+            service.revocation.revoke.assert_awaited_once_with([1, 5])
+
+        assert result is response
+
     @pytest.mark.asyncio
     async def test_create_tokens_success(self, service, mock_db_user, mock_db_token):
         """Тест создания пары токенов."""
@@ -259,6 +306,10 @@ class TestAuthService:
         ):
             tokens, user_id, token_id = await service._create_tokens(mock_db_user)
 
+            # В БД сохраняется только SHA-256 от токена
+            token_data = service.token_repo.create.call_args[0][0]
+            assert token_data.token_hash == SecurityService.hash_token('refresh_token')
+
         assert tokens.access_token == 'access_token'
         assert tokens.refresh_token == 'refresh_token'
         assert user_id == 1
@@ -300,15 +351,13 @@ class TestAuthService:
         assert user_create_request.role == UserRole.USER
 
     @pytest.mark.asyncio
-    async def test_token_payload_validation_on_refresh(self, service, mock_db_token):
+    async def test_token_payload_validation_on_refresh(self, service):
         """Тест валидации payload при обновлении токенов."""
         token = 'valid.token'
         payload = {'type': 'refresh', 'exp': 9999999999}  # без sub
 
         with (
             patch.object(service.security, 'verify_token', return_value=payload),
-            patch.object(service.security, 'is_token_expired', return_value=False),
-            patch.object(service.token_repo, 'get_by_token', return_value=mock_db_token),
             pytest.raises(AuthenticationError, match='Невалидный refresh токен'),
         ):
             await service.refresh_tokens(token)
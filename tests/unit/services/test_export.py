@@ -0,0 +1,83 @@
+from datetime import UTC, datetime
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.schemas import UserExportFormat, UserRole
+from app.services.export import UserExportService
+
+ROW = {
+    'id': 1,
+    'email': 'test@example.com',
+    'role': UserRole.ADMIN,
+    'status': 'active',
+    'is_active': True,
+    'created_at': datetime(2026, 1, 1, tzinfo=UTC),
+    'last_active_at': None,
+    'total_active_time': 60,
+    'sessions_count': 2,
+    'last_login_at': datetime(2026, 1, 2, tzinfo=UTC),
+}
+
+
+class TestUserExportService:
+    """Тесты для UserExportService."""
+
+    @pytest.fixture
+    def session_factory(self, mock_async_session):
+        """Фабрика сессий с потоковым результатом из двух пачек."""
+        result = MagicMock()
+        result.mappings.return_value.partitions.return_value.__aiter__.return_value = [
+            [ROW],
+            [ROW | {'id': 2, 'email': 'b@example.com'}],
+        ]
+        mock_async_session.stream = AsyncMock(return_value=result)
+        mock_async_session.__aenter__ = AsyncMock(return_value=mock_async_session)
+        mock_async_session.__aexit__ = AsyncMock(return_value=None)
+        return MagicMock(return_value=mock_async_session)
+
+    async def collect(self, service, *args, **kwargs) -> list[bytes]:
+        """Все части выгрузки."""
+        return [chunk async for chunk in service.stream(*args, **kwargs)]
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self, session_factory, mock_async_session):
+        """Тест выгрузки NDJSON пачками через серверный курсор."""
+        service = UserExportService(session_factory, batch_size=500)
+
+        chunks = await self.collect(service)
+
+        assert len(chunks) == 2
+        first = json.loads(chunks[0])
+        assert first['role'] == 'admin'
+        assert first['created_at'] == '2026-01-01T00:00:00+00:00'
+        assert 'sessions_count' not in first
+        assert 'password_hash' not in first
+
+        stmt = mock_async_session.stream.call_args.args[0]
+        assert stmt.get_execution_options()['yield_per'] == 500
+
+    @pytest.mark.asyncio
+    async def test_csv_with_sessions(self, session_factory, mock_async_session):
+        """Тест выгрузки CSV со сводкой по сессиям."""
+        service = UserExportService(session_factory)
+
+        chunks = await self.collect(
+            service,
+            UserExportFormat.CSV,
+            UserRole.ADMIN,
+            with_sessions=True,
+        )
+
+        lines = b''.join(chunks).decode().splitlines()
+        assert lines[0].endswith('total_active_time,sessions_count,last_login_at')
+        assert lines[1].startswith('1,test@example.com,admin,active,True,')
+        assert lines[1].endswith(',60,2,2026-01-02T00:00:00+00:00')
+        assert len(lines) == 3
+
+        stmt = mock_async_session.stream.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert 'LEFT OUTER JOIN' in sql
+        assert 'users.role = %(role_1)s' in sql
@@ -0,0 +1,225 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncpg
+import pytest
+
+from app.repositories import UserRepository
+from app.schemas import Principal, UserImportFormat, UserRole
+from app.services.importer import UserImportService
+
+BCRYPT_HASH = '$2b$04$MZTs8Tlf6.ATj1jBZ322seQsSmNF5myBzeNs.SreqkAu9Ue7vPXXm'
+
+
+async def chunks(*blocks: bytes):
+    """Поток байтов из блоков."""
+    for block in blocks:
+        yield block
+
+
+def ndjson(*records) -> bytes:
+    """Строки NDJSON."""
+    return b''.join(
+        (record if isinstance(record, bytes) else json.dumps(record).encode()) + b'\n'
+        for record in records
+    )
+
+
+class TestUserImportService:
+    """Тесты для UserImportService."""
+
+    @pytest.fixture
+    def session_factory(self, mock_async_session):
+        """Фабрика сессий, возвращающая мок сессии."""
+        mock_async_session.__aenter__ = AsyncMock(return_value=mock_async_session)
+        mock_async_session.__aexit__ = AsyncMock(return_value=None)
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=None)
+        mock_async_session.begin = MagicMock(return_value=transaction)
+        mock_async_session.begin_nested = MagicMock(return_value=transaction)
+        return MagicMock(return_value=mock_async_session)
+
+    @pytest.fixture
+    def service(self, session_factory, mock_security_service):
+        """Сервис импорта с моками БД и хэширования."""
+        mock_security_service.get_password_hash_async = AsyncMock(
+            side_effect=lambda password: f'hashed:{password}',
+        )
+        return UserImportService(session_factory, mock_security_service, chunk_size=10)
+
+    @pytest.fixture
+    def repo(self):
+        """Подмена запросов репозитория."""
+        with (
+            patch.object(
+                UserRepository,
+                'existing_emails',
+                side_effect=lambda emails: {'old@example.com'} & set(emails),
+            ),
+            patch.object(
+                UserRepository,
+                'copy_many',
+                side_effect=lambda rows: {row[0] for row in rows},
+            ) as copy_many,
+        ):
+            yield copy_many
+
+    @pytest.mark.asyncio
+    async def test_ndjson_report(self, service, repo):
+        """Тест импорта с отчетом об ошибках по строкам."""
+        data = ndjson(
+            {'email': 'a@example.com', 'password': 'secret'},
+            {'email': 'b@example.com', 'password_hash': BCRYPT_HASH, 'role': 'moderator'},
+            {'email': 'not-an-email', 'password': 'secret'},
+            {'email': 'a@example.com', 'password': 'other'},
+            b'{broken',
+            {'email': 'old@example.com', 'password': 'secret'},
+            {'email': 'c@example.com'},
+        )
+
+        report = await service.run(chunks(data))
+
+        assert report.created == 2
+        assert report.failed == 5
+        assert [error.line for error in report.errors] == [3, 4, 5, 7, 6]
+        assert report.errors[1].error == 'Email повторяется в файле'
+        assert report.errors[4].error == 'Пользователь уже существует'
+
+        rows = repo.call_args.args[0]
+        assert [row[:3] for row in rows] == [
+            ('a@example.com', 'hashed:secret', UserRole.USER),
+            ('b@example.com', BCRYPT_HASH, UserRole.MODERATOR),
+        ]
+        # Готовый хэш не пересчитывается
+        service.security.get_password_hash_async.assert_awaited_once_with('secret')
+
+    @pytest.mark.asyncio
+    async def test_csv_split_blocks(self, service, repo):
+        """Тест CSV из блоков, разрезающих строки и символы UTF-8."""
+        data = 'email,password,role\r\nä@example.com,pässword,\r\nb@example.com,secret,user'
+        raw = data.encode()
+
+        report = await service.run(
+            chunks(raw[:25], raw[25:31], raw[31:]),
+            UserImportFormat.CSV,
+        )
+
+        assert report.created == 2
+        assert report.failed == 0
+        assert repo.call_args.args[0][0][:2] == ('ä@example.com', 'hashed:pässword')
+
+    @pytest.mark.asyncio
+    async def test_chunks_and_roles(self, service, repo):
+        """Тест пачек и ограничения ролей текущим пользователем."""
+        records = [{'email': f'{i}@example.com', 'password': 'secret'} for i in range(15)]
+        records.append({'email': 'admin@example.com', 'password': 'secret', 'role': 'admin'})
+        moderator = Principal(1, UserRole.MODERATOR, UserRole.MODERATOR.priority)
+
+        report = await service.run(chunks(ndjson(*records)), current_user=moderator)
+
+        assert repo.call_count == 2
+        assert report.created == 15
+        assert report.errors[0].email == 'admin@example.com'
+
+    @pytest.mark.asyncio
+    async def test_status_validation(self, service, repo):
+        """Тест отклонения недопустимого статуса."""
+        data = ndjson(
+            {'email': 'a@example.com', 'password': 'secret', 'status': 'blocked'},
+            {'email': 'b@example.com', 'password': 'secret', 'status': 'x' * 60},
+            {'email': 'c@example.com', 'password': 'secret', 'status': 'unknown'},
+        )
+
+        report = await service.run(chunks(data))
+
+        assert report.created == 1
+        assert [error.line for error in report.errors] == [2, 3]
+        assert 'Допустимые статусы' in report.errors[1].error
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        'password_hash',
+        [
+            BCRYPT_HASH.replace('$2b$', '$2x$', 1),
+            BCRYPT_HASH.replace('$2b$', '$2$', 1),
+            BCRYPT_HASH.replace('$04$', '$99$', 1),
+            BCRYPT_HASH[:-1] + '!',
+        ],
+    )
+    async def test_password_hash_validation(self, service, repo, password_hash):
+        """Тест отклонения хэша, который passlib не проверит при входе."""
+        data = ndjson({'email': 'a@example.com', 'password_hash': password_hash})
+
+        report = await service.run(chunks(data))
+
+        assert report.created == 0
+        assert report.failed == 1
+        repo.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_db_error_per_row(self, service, repo):
+        """Тест ошибки БД в пачке: вставка по одной, ошибка - строке отчета."""
+
+        def copy_many(rows):
+            if any(row[0] == 'b@example.com' for row in rows):
+                raise asyncpg.StringDataRightTruncationError('value too long')
+            return {row[0] for row in rows}
+
+        repo.side_effect = copy_many
+        data = ndjson(*({'email': f'{name}@example.com', 'password': 'secret'} for name in 'abc'))
+
+        report = await service.run(chunks(data))
+
+        assert repo.call_count == 4
+        assert report.created == 2
+        assert report.failed == 1
+        assert (report.errors[0].line, report.errors[0].error) == (2, 'Ошибка записи в БД')
+
+
+class TestCopyMany:
+    """Тесты для UserRepository.copy_many."""
+
+    @pytest.fixture
+    def repo(self, mock_async_session):
+        """Репозиторий с моком соединения asyncpg."""
+        raw = MagicMock()
+        raw.driver_connection.copy_records_to_table = AsyncMock()
+        connection = MagicMock()
+        connection.get_raw_connection = AsyncMock(return_value=raw)
+        mock_async_session.connection = AsyncMock(return_value=connection)
+        savepoint = MagicMock()
+        savepoint.__aenter__ = AsyncMock()
+        savepoint.__aexit__ = AsyncMock(return_value=None)
+        mock_async_session.begin_nested = MagicMock(return_value=savepoint)
+        repo = UserRepository(mock_async_session)
+        repo.cache = None
+        return repo
+
+    @pytest.fixture
+    def rows(self):
+        """Строки для вставки."""
+        return [('a@example.com', 'hash', UserRole.ADMIN, 'active', True, None, 0)]
+
+    @pytest.mark.asyncio
+    async def test_copy(self, repo, rows):
+        """Тест вставки через COPY с ролью по имени enum."""
+        created = await repo.copy_many(rows)
+
+        raw = await (await repo.session.connection()).get_raw_connection()
+        copy = raw.driver_connection.copy_records_to_table
+        assert copy.call_args.kwargs['records'][0][:3] == ('a@example.com', 'hash', 'ADMIN')
+        assert created == {'a@example.com'}
+
+    @pytest.mark.asyncio
+    async def test_conflict_fallback(self, repo, rows):
+        """Тест вставки с пропуском конфликтов, если COPY упал на уникальности."""
+        raw = await (await repo.session.connection()).get_raw_connection()
+        raw.driver_connection.copy_records_to_table.side_effect = asyncpg.UniqueViolationError
+        result = MagicMock()
+        result.scalars.return_value = []
+        repo.session.execute = AsyncMock(return_value=result)
+
+        assert await repo.copy_many(rows) == set()
+        stmt = str(repo.session.execute.call_args.args[0])
+        assert 'ON CONFLICT (email) DO NOTHING' in stmt
@@ -0,0 +1,61 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.repositories import TokenRepository
+from app.services.reaper import TokenReaper
+
+
+class TestTokenReaper:
+    """Тесты для TokenReaper."""
+
+    @pytest.fixture
+    def session_factory(self, mock_async_session):
+        """Фабрика сессий, возвращающая мок сессии."""
+        mock_async_session.__aenter__ = AsyncMock(return_value=mock_async_session)
+        mock_async_session.__aexit__ = AsyncMock(return_value=None)
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=None)
+        mock_async_session.begin = MagicMock(return_value=transaction)
+        return MagicMock(return_value=mock_async_session)
+
+    @pytest.mark.asyncio
+    async def test_run_deletes_in_batches(self, session_factory):
+        """Тест удаления пакетами до первого неполного пакета."""
+        reaper = TokenReaper(session_factory, batch_size=100, pause=0.5)
+
+        with (
+            patch.object(TokenRepository, 'delete_expired', side_effect=[100, 100, 7]) as delete,
+            patch('app.services.reaper.asyncio.sleep') as sleep,
+        ):
+            deleted = await reaper.run()
+
+            assert delete.call_count == 3
+            assert all(call.args[1] == 100 for call in delete.call_args_list)
+            # Пауза только между полными пакетами
+            assert sleep.call_count == 2
+            sleep.assert_called_with(0.5)
+
+        # Каждый пакет - в отдельной транзакции
+        assert session_factory.call_count == 3
+        assert deleted == 207
+        stats = reaper.stats()
+        assert stats['runs'] == 1
+        assert stats['batches'] == 3
+        assert stats['deleted'] == 207
+
+    @pytest.mark.asyncio
+    async def test_run_nothing_to_delete(self, session_factory):
+        """Тест запуска без истекших токенов."""
+        reaper = TokenReaper(session_factory, batch_size=100)
+
+        with (
+            patch.object(TokenRepository, 'delete_expired', return_value=0),
+            patch('app.services.reaper.asyncio.sleep') as sleep,
+        ):
+            assert await reaper.run() == 0
+
+            sleep.assert_not_called()
+
+        assert reaper.stats()['batches'] == 1
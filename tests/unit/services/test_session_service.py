@@ -1,24 +1,23 @@
 from datetime import UTC, datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from freezegun import freeze_time
 import pytest
 
+from app.core.config import settings
+from app.repositories import SessionRepository
 from app.schemas import LoginSessionCreate, LoginSessionUpdate
-from app.services.session import SessionService
+from app.services.session import SessionService, prewarm_user_agent_cache
+from app.services.session_writer import SessionWriter
 
 
 class TestSessionService:
     """Тесты SessionService."""
 
     @pytest.fixture
-    def service(self, mock_async_session, mock_session_repo, mock_token_repo):
+    def service(self):
         """Фикстура для создания SessionService."""
-        return SessionService(
-            session=mock_async_session,
-            session_repo=mock_session_repo,
-            token_repo=mock_token_repo,
-        )
+        return SessionService(writer=MagicMock(spec=SessionWriter))
 
     @pytest.mark.asyncio
     async def test_create_session_success(self, service, mock_request):
@@ -32,10 +31,10 @@ class TestSessionService:
         ):
             await service.create_session(user_id, refresh_token_id, mock_request)
 
-        service.repo.create.assert_called_once()
+        service.writer.create.assert_called_once()
 
         # Проверяем аргументы вызова
-        call_args = service.repo.create.call_args
+        call_args = service.writer.create.call_args
         assert call_args is not None
 
         session_data = call_args[0][0]
@@ -48,6 +47,18 @@ class TestSessionService:
         assert session_data.browser == 'Other'
         assert session_data.os == 'Windows'
 
+    @pytest.mark.asyncio
+    async def test_create_session_truncates(self, service, mock_request):
+        """Тест обрезки IP и User-Agent до длины колонок."""
+        mock_request.headers = {'user-agent': 'Mozilla/5.0 ' + 'x' * 500}
+
+        with patch('app.services.session.get_real_ip', return_value='f' * 60):
+            await service.create_session(1, 100, mock_request)
+
+        session_data = service.writer.create.call_args[0][0]
+        assert session_data.ip_address == 'f' * 45
+        assert len(session_data.user_agent) == 255
+
     @pytest.mark.asyncio
     async def test_create_session_no_headers(self, service, mock_request):
         """Тест создания сессии без заголовков."""
@@ -62,9 +73,9 @@ class TestSessionService:
         ):
             await service.create_session(user_id, refresh_token_id, mock_request)
 
-        service.repo.create.assert_called_once()
+        service.writer.create.assert_called_once()
 
-        session_data = service.repo.create.call_args[0][0]
+        session_data = service.writer.create.call_args[0][0]
         assert session_data.ip_address is None
         assert session_data.user_agent is None
         assert session_data.device_type is None
@@ -74,33 +85,49 @@ class TestSessionService:
     @pytest.mark.asyncio
     @freeze_time('2026-01-01 12:00:00', tz_offset=0)
     async def test_update_session_success(self, service, mock_request):
-        """Тест успешного обновления сессии."""
+        """Тест успешного обновления сессии одним запросом."""
         refresh_token_id = 100
         ip = '10.0.0.1'
 
         with (
-            patch.object(service.repo, 'get_by_token_id', return_value=MagicMock(id=50)),
             patch('app.services.session.get_real_ip', return_value=ip),
         ):
             await service.update_session(refresh_token_id, mock_request)
 
-            service.repo.get_by_token_id.assert_called_once_with(refresh_token_id)
-            service.repo.update.assert_called_once()
+        service.writer.update.assert_called_once()
 
-        update_data = service.repo.update.call_args[0][1]
+        token_id, update_data = service.writer.update.call_args[0]
+        assert token_id == refresh_token_id
         assert isinstance(update_data, LoginSessionUpdate)
         assert update_data.ip_address == ip
         assert update_data.last_activity_at == datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
 
     @pytest.mark.asyncio
-    async def test_update_session_not_found(self, service, mock_request):
-        """Тест обновления несуществующей сессии."""
-        refresh_token_id = 999
-
+    @freeze_time('2026-01-08 12:00:00')
+    async def test_prewarm_user_agent_cache(self):
+        """Тест прогрева кэша User-Agent из недавних сессий."""
         with (
-            patch.object(service.repo, 'get_by_token_id', return_value=None),
+            patch('app.services.session.AsyncSessionLocal', return_value=AsyncMock()),
+            patch.object(
+                SessionRepository,
+                'get_recent_user_agents',
+                return_value=['ua-1', 'ua-2'],
+            ) as get_recent,
+            patch('app.services.session.warm_up', return_value=2) as warm_up,
+            patch.object(settings, 'USER_AGENT_PREWARM_DAYS', 7),
         ):
-            await service.update_session(refresh_token_id, mock_request)
+            assert await prewarm_user_agent_cache() == 2
+
+            warm_up.assert_called_once_with(['ua-1', 'ua-2'])
+            since = get_recent.call_args.args[1]
+            assert since == datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
+            assert get_recent.call_args.kwargs['timeout'] == settings.USER_AGENT_PREWARM_TIMEOUT
 
-            service.repo.get_by_token_id.assert_called_once_with(refresh_token_id)
-            service.repo.update.assert_not_called()
+    @pytest.mark.asyncio
+    async def test_prewarm_user_agent_cache_db_error(self):
+        """Тест что недоступность БД не мешает запуску сервиса."""
+        with (
+            patch('app.services.session.AsyncSessionLocal', return_value=AsyncMock()),
+            patch.object(SessionRepository, 'get_recent_user_agents', side_effect=OSError('db')),
+        ):
+            assert await prewarm_user_agent_cache() == 0
@@ -0,0 +1,132 @@
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.repositories import SessionRepository
+from app.schemas import LoginSessionCreate, LoginSessionUpdate
+from app.services.session_writer import SessionWriter
+
+
+class TestSessionWriter:
+    """Тесты для SessionWriter."""
+
+    @pytest.fixture
+    def session_factory(self, mock_async_session):
+        """Фабрика сессий, возвращающая мок сессии."""
+        mock_async_session.__aenter__ = AsyncMock(return_value=mock_async_session)
+        mock_async_session.__aexit__ = AsyncMock(return_value=None)
+        savepoint = MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=None))
+        mock_async_session.begin_nested = MagicMock(return_value=savepoint)
+        return MagicMock(return_value=mock_async_session)
+
+    @pytest.fixture
+    def writer(self, session_factory):
+        """Фикстура для создания SessionWriter."""
+        return SessionWriter(session_factory)
+
+    @pytest.mark.asyncio
+    async def test_flush_batches(self, writer, session_factory, mock_async_session):
+        """Тест записи накопленных событий одним пакетом."""
+        writer.create(LoginSessionCreate(user_id=1, refresh_token_id=10))
+        writer.create(LoginSessionCreate(user_id=2, refresh_token_id=20))
+        writer.update(30, LoginSessionUpdate(ip_address='10.0.0.1'))
+        writer.update(30, LoginSessionUpdate(ip_address='10.0.0.2'))
+
+        with (
+            patch.object(SessionRepository, 'create_many', return_value={10, 20}) as create_many,
+            patch.object(
+                SessionRepository,
+                'update_many_by_token_id',
+                return_value=1,
+            ) as update_many,
+        ):
+            assert await writer.flush() == 3
+
+            assert len(create_many.call_args[0][0]) == 2
+            # Из обновлений одного токена остается последнее
+            updates = update_many.call_args[0][0]
+            assert list(updates) == [30]
+            assert updates[30].ip_address == '10.0.0.2'
+
+        session_factory.assert_called_once()
+        mock_async_session.commit.assert_called_once()
+        stats = writer.stats()
+        assert stats['pending'] == 0
+        assert stats['created'] == 2
+        assert stats['updated'] == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_empty(self, writer, session_factory):
+        """Тест сброса пустой очереди без обращения к БД."""
+        assert await writer.flush() == 0
+        session_factory.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_flush_retries_recent_unmatched(self, writer):
+        """Тест повтора сессий, токен которых еще не зафиксирован."""
+        stale = datetime.now(UTC) - timedelta(minutes=5)
+        writer.create(LoginSessionCreate(user_id=1, refresh_token_id=10))
+        writer.create(LoginSessionCreate(user_id=2, refresh_token_id=20))
+        writer.create(LoginSessionCreate(user_id=3, refresh_token_id=30, login_at=stale))
+
+        with (
+            patch.object(SessionRepository, 'create_many', return_value={10}),
+            patch.object(SessionRepository, 'update_many_by_token_id', return_value=0),
+        ):
+            await writer.flush()
+
+        # Недавняя сессия ждет следующего пакета, старая отброшена
+        assert [item.refresh_token_id for item in writer._creates] == [20]
+
+    @pytest.mark.asyncio
+    async def test_create_flushes_when_full(self, session_factory):
+        """Тест немедленного сброса переполненной очереди."""
+        writer = SessionWriter(session_factory, max_events=2)
+
+        with patch('app.services.session_writer.spawn') as spawn:
+            writer.create(LoginSessionCreate(user_id=1, refresh_token_id=10))
+            spawn.assert_not_called()
+
+            writer.update(10, LoginSessionUpdate())
+            spawn.assert_called_once()
+            spawn.call_args[0][0].close()
+
+        assert writer.stats()['pending'] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_error(self, writer):
+        """Тест что ошибка записи не выходит за пределы очереди."""
+        writer.create(LoginSessionCreate(user_id=1, refresh_token_id=10))
+
+        with patch.object(SessionRepository, 'create_many', side_effect=RuntimeError('db')):
+            assert await writer.flush() == 0
+
+        assert writer.stats()['failed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_flush_rows_after_batch_error(self, writer, mock_async_session):
+        """Тест записи по одной строке, если пакет отклонен из-за одной из них."""
+        writer.create(LoginSessionCreate(user_id=1, refresh_token_id=10))
+        writer.create(LoginSessionCreate(user_id=2, refresh_token_id=20))
+        writer.update(30, LoginSessionUpdate(ip_address='10.0.0.1'))
+
+        async def create_many(items):
+            if len(items) > 1 or items[0].refresh_token_id == 20:
+                raise RuntimeError('value too long')
+            return {items[0].refresh_token_id}
+
+        with (
+            patch.object(SessionRepository, 'create_many', side_effect=create_many),
+            patch.object(SessionRepository, 'update_many_by_token_id', return_value=1),
+        ):
+            assert await writer.flush() == 2
+
+        assert mock_async_session.begin_nested.call_count == 3
+        mock_async_session.commit.assert_called_once()
+        # Отклоненная строка не повторяется
+        assert writer._creates == []
+        stats = writer.stats()
+        assert stats['created'] == 1
+        assert stats['updated'] == 1
+        assert stats['failed'] == 1
@@ -1,9 +1,21 @@
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from app.core.exceptions import ConflictError, NotFoundError, PermissionDeniedError, ValidationError
-from app.schemas import UserCreateRequest, UserRole, UserUpdateRequest
+from app.schemas import (
+    Principal,
+    UserBatchFilter,
+    UserBatchRequest,
+    UserBatchStatus,
+    UserBatchUpdateRequest,
+    UserCreateRequest,
+    UserRole,
+    UserSearchMode,
+    UserSessionsMode,
+    UserUpdateRequest,
+)
+from app.services.activity import ActivityBuffer
 from app.services.user import UserService
 
 USER = UserRole.USER
@@ -21,6 +33,7 @@ class TestUserService:
             session=mock_async_session,
             user_repo=mock_user_repo,
             security_service=mock_security_service,
+            activity=MagicMock(spec=ActivityBuffer),
         )
 
     @pytest.fixture
@@ -70,7 +83,7 @@ class TestUserService:
         with patch.object(service.repo, 'get_by_email', return_value=mock_db_user):
             result = await service.get_user_by_email(email)
 
-            service.repo.get_by_email.assert_called_once_with(email)
+            service.repo.get_by_email.assert_called_once_with(email, cached=True)
             assert result == mock_db_user
 
     @pytest.mark.asyncio
@@ -112,12 +125,12 @@ class TestUserService:
 
         with (
             patch.object(service.repo, 'exists_by', return_value=False),
-            patch.object(service.security, 'get_password_hash', return_value=password_hash),
+            patch.object(service.security, 'get_password_hash_async', return_value=password_hash),
             patch.object(service.repo, 'create', return_value=mock_db_user),
         ):
             result = await service.create_user(user_create_request, current_user=None)
 
-            service.security.get_password_hash.assert_called_once_with('Password123!')
+            service.security.get_password_hash_async.assert_called_once_with('Password123!')
             service.repo.create.assert_called_once()
 
             # Проверяем что передается UserCreate с хэшем пароля
@@ -136,7 +149,7 @@ class TestUserService:
         """Тест успешного создания пользователя текущим админом."""
         with (
             patch.object(service.repo, 'exists_by', return_value=False),
-            patch.object(service.security, 'get_password_hash', return_value='hashed'),
+            patch.object(service.security, 'get_password_hash_async', return_value='hashed'),
             patch.object(service.repo, 'create', return_value=mock_db_user),
         ):
             result = await service.create_user(user_create_request, current_user=mock_admin)
@@ -161,11 +174,11 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_create_user_role_validation(self, service, user_create_request, current_role, target_role, should_raise):
         """Тест валидации ролей при создании пользователя."""
-        current_user = MagicMock(role=current_role) if current_role else None
+        current_user = Principal(1, current_role, current_role.priority) if current_role else None
         user_create_request.role = target_role
 
         with (
-            patch.object(service.security, 'get_password_hash', return_value='hash'),
+            patch.object(service.security, 'get_password_hash_async', return_value='hash'),
             patch.object(service.repo, 'create', return_value=MagicMock()),
             patch.object(service.repo, 'exists_by', return_value=False),
         ):
@@ -177,19 +190,20 @@ class TestUserService:
 
                 assert result is not None
                 service.repo.create.assert_called_once()
-                service.security.get_password_hash.assert_called_once_with('Password123!')
+                service.security.get_password_hash_async.assert_called_once_with('Password123!')
 
     @pytest.mark.asyncio
-    async def test_update_user_success(self, service, user_update_request, mock_db_user, mock_user):
+    async def test_update_user_success(self, service, user_update_request, mock_db_user):
         """Тест успешного обновления пользователя."""
         user_id = 1  # ID обычного пользователя
+        current_user = Principal(user_id, UserRole.USER, UserRole.USER.priority)
 
         with (
             patch.object(service.repo, 'get', return_value=mock_db_user),
-            patch.object(service.security, 'get_password_hash', return_value='hash'),
+            patch.object(service.security, 'get_password_hash_async', return_value='hash'),
             patch.object(service.repo, 'update', return_value=mock_db_user),
         ):
-            result = await service.update_user(user_id, user_update_request, current_user=mock_user)
+            result = await service.update_user(user_id, user_update_request, current_user=current_user)
 
             service.repo.update.assert_called_once()
             service.session.flush.assert_called_once()
@@ -221,7 +235,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_update_user_role_check(self, service, user_update_request, current_role, target_role, should_raise, operation_for):
         """Тест проверки прав при обновлении пользователя."""
-        current_user = MagicMock(id=1, role=current_role)
+        current_user = Principal(1, current_role, current_role.priority)
 
         target_user_id = 1 if operation_for == 'self' else 2
         target_user_role = current_role if operation_for == 'self' else target_role
@@ -229,7 +243,7 @@ class TestUserService:
 
         with (
             patch.object(service.repo, 'get', return_value=target_user),
-            patch.object(service.security, 'get_password_hash', return_value='hash'),
+            patch.object(service.security, 'get_password_hash_async', return_value='hash'),
             patch.object(service.repo, 'update', return_value=MagicMock()),
         ):
             if should_raise:
@@ -255,7 +269,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_update_user_role_validation(self, service, user_update_request, current_role, target_role, should_raise, operation_for):
         """Тест валидации ролей при обновлении пользователя."""
-        current_user = MagicMock(id=1, role=current_role)
+        current_user = Principal(1, current_role, current_role.priority)
 
         target_user_id = 1 if operation_for == 'self' else 2
         target_user_role = current_role if operation_for == 'self' else target_role
@@ -265,7 +279,7 @@ class TestUserService:
 
         with (
             patch.object(service.repo, 'get', return_value=target_user),
-            patch.object(service.security, 'get_password_hash', return_value='hash'),
+            patch.object(service.security, 'get_password_hash_async', return_value='hash'),
             patch.object(service.repo, 'update', return_value=MagicMock()),
         ):
             if should_raise:
@@ -315,7 +329,7 @@ class TestUserService:
     @pytest.mark.asyncio
     async def test_delete_user_role_check(self, service, current_role, target_role, should_raise, operation_for):
         """Тест прав при удалении пользователя."""
-        current_user = MagicMock(id=1, role=current_role)
+        current_user = Principal(1, current_role, current_role.priority)
 
         target_user_id = 1 if operation_for == 'self' else 2
         target_user = current_user if operation_for == 'self' else MagicMock(id=2, role=target_role)
@@ -336,4 +350,107 @@ class TestUserService:
 
         await service.update_user_activity(user_id)
 
-        service.repo.update_activity.assert_called_once_with(user_id)
+        # Запись в БД откладывается до сброса буфера
+        service.activity.record.assert_called_once_with(user_id)
+        service.repo.add_activity.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_search_users_capped(self, service):
+        """Тест ограничения числа результатов поиска."""
+        service.repo.paginate_with_sessions = AsyncMock(return_value=([], None))
+
+        await service.paginate_users_with_details(
+            limit=1000,
+            search=' Test ',
+            search_mode=UserSearchMode.PREFIX,
+        )
+
+        service.repo.paginate_with_sessions.assert_called_once_with(
+            None,
+            100,
+            'Test',
+            None,
+            UserSearchMode.PREFIX,
+            sessions=UserSessionsMode.ALL,
+            sessions_limit=5,
+        )
+
+    @pytest.mark.asyncio
+    async def test_search_users_too_short(self, service):
+        """Тест отказа на слишком короткую строку поиска."""
+        service.repo.get_many_with_sessions = AsyncMock()
+
+        with pytest.raises(ValidationError, match='не короче 3 символов'):
+            await service.get_users_with_details(search='ab')
+
+        service.repo.get_many_with_sessions.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_update(self, service, mock_admin):
+        """Тест пакетного изменения: результат по каждому ID, запись одним запросом."""
+        service.repo.check_access = AsyncMock(return_value={1: True, 4: False})
+        service.repo.update_many = AsyncMock()
+        request = UserBatchUpdateRequest(
+            ids=[1, 4, 999, 999],
+            changes=UserUpdateRequest(status='blocked'),
+        )
+
+        result = await service.batch_update(request, mock_admin)
+
+        assert (result.succeeded, result.failed) == (1, 2)
+        assert [(item.id, item.status) for item in result.results] == [
+            (1, UserBatchStatus.OK),
+            (4, UserBatchStatus.FORBIDDEN),
+            (999, UserBatchStatus.NOT_FOUND),
+        ]
+        ids, changes = service.repo.update_many.call_args.args
+        assert ids == [1]
+        # Изменяются только переданные поля
+        assert changes.model_dump(exclude_unset=True) == {'status': 'blocked'}
+
+    @pytest.mark.asyncio
+    async def test_batch_update_role_check(self, service, mock_moderator):
+        """Тест запрета пакетного назначения роли не ниже своей."""
+        service.repo.check_access = AsyncMock()
+        request = UserBatchUpdateRequest(ids=[1], changes=UserUpdateRequest(role=MODERATOR))
+
+        with pytest.raises(ValidationError, match='равные или превышающие'):
+            await service.batch_update(request, mock_moderator)
+
+        service.repo.check_access.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_delete_by_filter(self, service, mock_admin):
+        """Тест пакетного удаления по условию."""
+        service.repo.check_access = AsyncMock(return_value={1: True, 5: True})
+        service.repo.delete_many = AsyncMock()
+        request = UserBatchRequest(filter=UserBatchFilter(status='blocked'))
+
+        result = await service.batch_delete(request, mock_admin)
+
+        service.repo.check_access.assert_called_once_with(
+            mock_admin, role=None, status='blocked', limit=1001,
+        )
+        service.repo.delete_many.assert_called_once_with([1, 5])
+        assert result.succeeded == 2
+
+    @pytest.mark.asyncio
+    async def test_batch_filter_limit(self, service, mock_admin):
+        """Тест отказа, если условию соответствует больше USER_BATCH_MAX_IDS."""
+        service.repo.check_access = AsyncMock(return_value=dict.fromkeys(range(1001), True))
+        service.repo.delete_many = AsyncMock()
+        request = UserBatchRequest(filter=UserBatchFilter(status='blocked'))
+
+        with pytest.raises(ValidationError, match='больше 1000'):
+            await service.batch_delete(request, mock_admin)
+
+        service.repo.delete_many.assert_not_called()
+
+    def test_batch_request_selection(self):
+        """Тест выбора пользователей: либо список ID, либо условие."""
+        with pytest.raises(ValueError, match='ids'):
+            UserBatchRequest()
+        with pytest.raises(ValueError, match='ids'):
+            UserBatchRequest(ids=[1], filter=UserBatchFilter(status='blocked'))
+        with pytest.raises(ValueError, match='role или status'):
+            UserBatchRequest.model_validate({'filter': {}})
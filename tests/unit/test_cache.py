@@ -0,0 +1,58 @@
+from freezegun import freeze_time
+import pytest
+
+from app.core.cache import TTLCache
+
+
+class TestTTLCache:
+    """Тесты для TTLCache."""
+
+    @pytest.fixture
+    def cache(self):
+        """Фикстура кэша на две записи."""
+        return TTLCache(maxsize=2, ttl=60)
+
+    def test_get_set(self, cache):
+        """Тест сохранения и получения значения."""
+        cache.set('a', 1)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_lru_eviction(self, cache):
+        """Тест вытеснения давно не использованной записи."""
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+        assert len(cache) == 2
+
+    def test_ttl_expiry(self, cache):
+        """Тест истечения записи по ttl кэша."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            cache.set('a', 1)
+            frozen.tick(59)
+            assert cache.get('a') == 1
+            frozen.tick(2)
+            assert cache.get('a') is None
+
+    def test_own_expiry(self, cache):
+        """Тест истечения записи раньше ttl кэша."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            now = frozen().timestamp()
+            cache.set('a', 1, expires_at=now + 5)
+            frozen.tick(6)
+            assert cache.get('a') is None
+
+    def test_disabled(self):
+        """Тест отключенного кэша."""
+        cache = TTLCache(maxsize=0)
+        cache.set('a', 1)
+
+        assert cache.get('a') is None
@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.config import settings
+from app.core.database import engine_profile
+
+
+class TestEngineProfile:
+    """Тесты для профилей движка БД."""
+
+    def test_default(self):
+        """Тест профиля по умолчанию (прежние параметры движка)."""
+        kwargs = engine_profile('default').engine_kwargs()
+
+        assert kwargs['pool_pre_ping'] is True
+        assert kwargs['pool_recycle'] == 3600
+        assert 'prepared_statement_name_func' not in kwargs['connect_args']
+
+    def test_pgbouncer(self):
+        """Тест профиля для PgBouncer в transaction mode."""
+        kwargs = engine_profile('pgbouncer').engine_kwargs()
+        connect_args = kwargs['connect_args']
+
+        assert kwargs['pool_pre_ping'] is False
+        assert connect_args['statement_cache_size'] == 0
+        assert connect_args['prepared_statement_cache_size'] == 0
+        name_func = connect_args['prepared_statement_name_func']
+        assert name_func() != name_func()
+
+    def test_overrides(self):
+        """Тест переопределения параметров профиля настройками."""
+        with (
+            patch.object(settings, 'DB_POOL_PRE_PING', True),
+            patch.object(settings, 'DB_COMMAND_TIMEOUT', 5.0),
+        ):
+            profile = engine_profile('performance')
+
+        assert profile.pool_pre_ping is True
+        assert profile.command_timeout == 5.0
+        assert profile.pool_use_lifo is True
+
+    def test_unknown(self):
+        """Тест неизвестного профиля."""
+        with pytest.raises(ValueError, match='Неизвестный профиль'):
+            engine_profile('fast')
@@ -0,0 +1,74 @@
+from typing import Annotated
+from unittest.mock import patch
+
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from httpx import ASGITransport, AsyncClient
+import pytest
+
+from app.core.exceptions import UnauthorizedException
+from app.core.security import SecurityService
+from app.dependencies import get_current_user, require_role
+from app.schemas import Principal, UserRole
+
+
+class TestAuthDependencies:
+    """Тесты для зависимостей аутентификации."""
+
+    @pytest.fixture
+    def app(self):
+        """Приложение с проверкой роли на роутере и пользователем в эндпоинте."""
+        router = APIRouter(dependencies=[Depends(require_role(UserRole.MODERATOR))])
+
+        @router.get('/me')
+        async def me(current_user: Annotated[Principal, Depends(get_current_user)]) -> dict:
+            return {'id': current_user.id, 'rank': current_user.rank}
+
+        app = FastAPI()
+        app.include_router(router)
+        return app
+
+    async def get(self, app, payload) -> tuple[int, dict, int]:
+        """Запрос к /me: статус, тело и число проверок токена."""
+        with patch.object(SecurityService, 'verify_access_token', return_value=payload) as verify:
+            transport = ASGITransport(app=app)
+            async with AsyncClient(transport=transport, base_url='http://test') as client:
+                response = await client.get('/me', headers={'Authorization': 'Bearer token'})
+        return response.status_code, response.json(), verify.call_count
+
+    @pytest.mark.asyncio
+    async def test_principal_shared(self, app):
+        """Тест: пользователь определяется один раз для роутера и эндпоинта."""
+        status, body, calls = await self.get(app, {'sub': '7', 'role': 'admin', 'iat': 0})
+
+        assert status == 200
+        assert body == {'id': 7, 'rank': 3}
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_role_forbidden(self, app):
+        """Тест отказа при роли ниже требуемой."""
+        status, _, _ = await self.get(app, {'sub': '7', 'role': 'user', 'iat': 0})
+
+        assert status == 403
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('payload', [{'role': 'user'}, {'sub': '7', 'role': 'root'}])
+    async def test_invalid_payload(self, payload):
+        """Тест некорректного payload токена."""
+        credentials = HTTPAuthorizationCredentials(scheme='Bearer', credentials='token')
+
+        with (
+            patch.object(SecurityService, 'verify_access_token', return_value=payload),
+            pytest.raises(UnauthorizedException),
+        ):
+            await get_current_user(credentials)
+
+    def test_principal_frozen(self):
+        """Тест неизменяемости пользователя без __dict__."""
+        principal = Principal.from_payload({'sub': '1', 'role': 'moderator'})
+
+        assert principal == Principal(1, UserRole.MODERATOR, 2)
+        assert not hasattr(principal, '__dict__')
+        with pytest.raises(AttributeError):
+            principal.rank = 3
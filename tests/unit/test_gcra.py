@@ -0,0 +1,88 @@
+from unittest.mock import patch
+
+from limits import parse
+import pytest
+
+from app.core.gcra import GCRARateLimiter
+
+
+class TestGCRARateLimiter:
+    """Тесты для GCRARateLimiter."""
+
+    @pytest.fixture
+    def clock(self):
+        """Управляемое монотонное время."""
+        now = [1000.0]
+        with patch('app.core.gcra.time.monotonic', side_effect=lambda: now[0]):
+            yield now
+
+    def test_burst_then_rate(self, clock):
+        """Тест всплеска до лимита и восстановления по одному запросу."""
+        limiter = GCRARateLimiter()
+        item = parse('5/minute')
+
+        assert all(limiter.hit(item, '10.0.0.1') for _ in range(5))
+        assert limiter.hit(item, '10.0.0.1') is False
+        # Другой ключ не затронут
+        assert limiter.hit(item, '10.0.0.2') is True
+
+        # Через 12 секунд (60/5) доступен ровно один запрос
+        clock[0] += 12
+        assert limiter.test(item, '10.0.0.1') is True
+        assert limiter.hit(item, '10.0.0.1') is True
+        assert limiter.hit(item, '10.0.0.1') is False
+
+    def test_get_window_stats(self, clock):
+        """Тест остатка лимита."""
+        limiter = GCRARateLimiter()
+        item = parse('5/minute')
+
+        assert limiter.get_window_stats(item, 'ip').remaining == 5
+        limiter.hit(item, 'ip')
+        limiter.hit(item, 'ip')
+        assert limiter.get_window_stats(item, 'ip').remaining == 3
+
+        limiter.clear(item, 'ip')
+        assert limiter.get_window_stats(item, 'ip').remaining == 5
+
+    def test_sweep_idle_keys(self, clock):
+        """Тест удаления ключей с восстановленным лимитом."""
+        limiter = GCRARateLimiter(shards=1, sweep_every=10)
+        item = parse('5/minute')
+
+        for i in range(5):
+            limiter.hit(item, f'10.0.0.{i}')
+        assert limiter.stats()['keys'] == 5
+
+        clock[0] += 60
+        for _ in range(5):
+            limiter.hit(item, 'active')
+
+        assert limiter.stats()['keys'] == 1
+
+    def test_max_keys(self, clock):
+        """Тест ограничения памяти при переборе IP адресов."""
+        limiter = GCRARateLimiter(shards=4, max_keys=100)
+        item = parse('5/minute')
+
+        for i in range(1000):
+            assert limiter.hit(item, f'10.0.{i >> 8}.{i & 255}') is True
+
+        stats = limiter.stats()
+        assert stats['keys'] <= 100
+        assert stats['evicted'] >= 900
+
+    def test_evict_least_recently_used(self, clock):
+        """Тест вытеснения ключа, к которому дольше всех не обращались."""
+        limiter = GCRARateLimiter(shards=1, max_keys=3)
+        item = parse('5/minute')
+
+        for key in ('a', 'b', 'c'):
+            limiter.hit(item, key)
+        # Обращение к первому ключу делает его последним в очереди вытеснения
+        limiter.hit(item, 'a')
+        limiter.hit(item, 'd')
+
+        assert limiter.get_window_stats(item, 'a').remaining == 3
+        assert limiter.get_window_stats(item, 'b').remaining == 5
+        assert limiter.stats()['evicted'] == 1
@@ -0,0 +1,143 @@
+import json
+import os
+import time
+
+from cryptography.hazmat.primitives import serialization
+from freezegun import freeze_time
+import jwt
+import pytest
+
+from app.core.keys import KeyRing, generate_private_key
+
+
+class TestKeyRing:
+    """Тесты для KeyRing."""
+
+    @pytest.fixture
+    def keyring(self):
+        """Фикстура набора ключей EdDSA со сроком хранения 1 час."""
+        keyring = KeyRing(algorithm='EdDSA', retention=3600)
+        keyring.add(generate_private_key('EdDSA'), 'key-1')
+        return keyring
+
+    def _sign(self, keyring, payload=None):
+        key, headers = keyring.signing_params()
+        return jwt.encode(
+            payload or {'sub': '1'},
+            key,
+            algorithm=keyring.algorithm,
+            headers=headers,
+        )
+
+    def _verify(self, keyring, token):
+        key = keyring.verification_key(token)
+        return jwt.decode(token, key, algorithms=[keyring.algorithm])
+
+    def test_sign_and_verify(self, keyring):
+        """Тест подписи с kid и проверки открытым ключом."""
+        token = self._sign(keyring)
+
+        assert jwt.get_unverified_header(token)['kid'] == 'key-1'
+        assert self._verify(keyring, token)['sub'] == '1'
+
+    def test_unknown_kid(self, keyring):
+        """Тест отказа для токена с неизвестным kid."""
+        other = KeyRing(algorithm='EdDSA')
+        other.add(generate_private_key('EdDSA'), 'key-x')
+
+        with pytest.raises(jwt.InvalidTokenError, match='Неизвестный kid'):
+            self._verify(keyring, self._sign(other))
+
+    def test_jwks(self, keyring):
+        """Тест формата JWKS и стабильности ETag."""
+        body, etag = keyring.jwks()
+        keys = json.loads(body)['keys']
+
+        assert keys == [
+            {**keys[0], 'kid': 'key-1', 'alg': 'EdDSA', 'use': 'sig', 'kty': 'OKP'},
+        ]
+        assert 'd' not in keys[0]
+        assert keyring.jwks()[1] == etag
+
+    def test_rotation_keeps_old_key_until_tokens_expire(self, keyring):
+        """Тест ротации: старый ключ опубликован, пока живут его токены."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            old_token = self._sign(keyring)
+            _, old_etag = keyring.jwks()
+            keyring.rotate(kid='key-2')
+
+            new_token = self._sign(keyring)
+            assert jwt.get_unverified_header(new_token)['kid'] == 'key-2'
+            assert self._verify(keyring, old_token)['sub'] == '1'
+            assert keyring.jwks()[1] != old_etag
+
+            frozen.tick(3601)
+            kids = [key['kid'] for key in json.loads(keyring.jwks()[0])['keys']]
+            assert kids == ['key-2']
+            with pytest.raises(jwt.InvalidTokenError):
+                self._verify(keyring, old_token)
+
+    def test_rsa_thumbprint_kid(self):
+        """Тест kid по умолчанию (JWK thumbprint) для RS256."""
+        keyring = KeyRing(algorithm='RS256')
+        key = keyring.add(generate_private_key('RS256'))
+
+        assert len(key.kid) == 43
+        assert jwt.get_unverified_header(self._sign(keyring))['kid'] == key.kid
+
+    def _write_keys(self, path, kids):
+        """Каталог ключей ES256 с файлами <kid>.pem."""
+        for kid in kids:
+            pem = generate_private_key('ES256').private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+            (path / f'{kid}.pem').write_bytes(pem)
+
+    @freeze_time('2026-01-01 12:00:00')
+    def test_load_dir(self, tmp_path):
+        """Тест загрузки ключей из каталога: активный - из JWT_ACTIVE_KID, не по mtime."""
+        self._write_keys(tmp_path, ['2026-01', '2026-02', '2026-03'])
+        # Самый новый файл - прежний ключ
+        os.utime(tmp_path / '2026-01.pem')
+
+        keyring = KeyRing(
+            algorithm='ES256',
+            retention=3600,
+            keys_dir=str(tmp_path),
+            active_kid='2026-02',
+        )
+
+        assert keyring.active.kid == '2026-02'
+        assert keyring.get('2026-01').retired_at == time.time()
+        # Следующий ключ опубликован заранее
+        assert keyring.get('2026-03').retired_at is None
+
+    def test_load_dir_requires_active_kid(self, tmp_path):
+        """Тест: из нескольких ключей активный задается явно."""
+        self._write_keys(tmp_path, ['a', 'b'])
+
+        with pytest.raises(RuntimeError, match='JWT_ACTIVE_KID'):
+            KeyRing(algorithm='ES256', keys_dir=str(tmp_path)).load()
+        with pytest.raises(RuntimeError, match='не найден'):
+            KeyRing(algorithm='ES256', keys_dir=str(tmp_path), active_kid='c').load()
+
+        (tmp_path / 'b.pem').unlink()
+        assert KeyRing(algorithm='ES256', keys_dir=str(tmp_path)).active.kid == 'a'
+
+    def test_ephemeral_key(self):
+        """Тест: временный ключ без JWT_KEYS_DIR - только если разрешен явно."""
+        with pytest.raises(RuntimeError, match='JWT_KEYS_DIR'):
+            KeyRing(algorithm='EdDSA').load()
+
+        keyring = KeyRing(algorithm='EdDSA', allow_ephemeral=True)
+        keyring.load()
+        assert keyring.active.kid
+
+    def test_symmetric_has_no_public_keys(self):
+        """Тест что общий секрет не публикуется."""
+        keyring = KeyRing(algorithm='HS256', secret='secret')
+
+        assert json.loads(keyring.jwks()[0]) == {'keys': []}
+        assert keyring.signing_params() == ('secret', None)
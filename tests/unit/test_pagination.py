@@ -0,0 +1,270 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.exceptions import ValidationError
+from app.models import LoginSession, User
+from app.repositories import UserRepository
+from app.repositories.base import _count_cache
+from app.schemas import UserResponse, UserRole, UserSearchMode, UserSessionsMode
+
+
+class TestKeysetPagination:
+    """Тесты для keyset пагинации BaseRepository."""
+
+    @pytest.fixture
+    def repo(self):
+        """Фикстура репозитория с моком сессии."""
+        repo = UserRepository(MagicMock())
+        repo.cache = None
+        return repo
+
+    def mock_rows(self, repo, rows):
+        """Подменить результат запроса."""
+        result = MagicMock()
+        result.unique.return_value.scalars.return_value.all.return_value = rows
+        repo.session.execute = AsyncMock(return_value=result)
+
+    def compiled(self, repo) -> str:
+        """SQL запроса страницы пользователей."""
+        stmt = repo.session.execute.call_args_list[0].args[0]
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    def test_cursor_roundtrip(self, repo):
+        """Тест кодирования и декодирования курсора."""
+        created_at = datetime(2026, 1, 1, 12, tzinfo=UTC)
+        cursor = repo._encode_cursor([created_at, 42])
+
+        assert repo._decode_cursor(cursor, ('created_at', 'id')) == [created_at, 42]
+
+    @pytest.mark.parametrize('cursor', ['!!!', 'e30', 'WzFd'])
+    def test_invalid_cursor(self, repo, cursor):
+        """Тест отказа на испорченный курсор."""
+        with pytest.raises(ValidationError, match='Некорректный курсор'):
+            repo._decode_cursor(cursor, ('created_at', 'id'))
+
+    @pytest.mark.asyncio
+    async def test_first_page(self, repo):
+        """Тест первой страницы с курсором следующей."""
+        rows = [
+            MagicMock(created_at=datetime(2026, 1, 3 - i, tzinfo=UTC), id=3 - i) for i in range(3)
+        ]
+        self.mock_rows(repo, rows)
+
+        users, next_cursor = await repo.paginate_with_sessions(limit=2)
+
+        assert users == rows[:2]
+        assert repo._decode_cursor(next_cursor, ('created_at', 'id')) == [rows[1].created_at, 2]
+        sql = self.compiled(repo)
+        assert 'ORDER BY users.created_at DESC, users.id DESC' in sql
+        assert 'LIMIT' in sql
+        assert 'OFFSET' not in sql
+
+    @pytest.mark.asyncio
+    async def test_next_page(self, repo):
+        """Тест что страница после курсора выбирается без OFFSET."""
+        self.mock_rows(repo, [MagicMock()])
+        cursor = repo._encode_cursor([datetime(2026, 1, 1, tzinfo=UTC), 10])
+
+        users, next_cursor = await repo.paginate_with_sessions(cursor=cursor, limit=2)
+
+        assert len(users) == 1
+        assert next_cursor is None
+        sql = self.compiled(repo)
+        assert '(users.created_at, users.id) < (' in sql
+        assert 'OFFSET' not in sql
+
+    @pytest.mark.parametrize(
+        ('mode', 'pattern'),
+        [
+            (UserSearchMode.PREFIX, 'a\\_b%'),
+            (UserSearchMode.CONTAINS, '%a\\_b%'),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_search_filter(self, repo, mode, pattern):
+        """Тест поиска по lower(email) с экранированием шаблона."""
+        self.mock_rows(repo, [])
+
+        await repo.paginate_with_sessions(search='A_b', search_mode=mode)
+
+        stmt = repo.session.execute.call_args_list[0].args[0]
+        sql = self.compiled(repo)
+        assert 'lower(users.email) LIKE %(lower_1)s' in sql
+        assert "ESCAPE '\\'" in sql
+        assert stmt.compile().params['lower_1'] == pattern
+
+
+class TestPaginateCount:
+    """Тесты для стратегий подсчета в BaseRepository.paginate."""
+
+    @pytest.fixture
+    def repo(self):
+        """Фикстура репозитория с моком сессии и пустым кэшем количеств."""
+        _count_cache.clear()
+        repo = UserRepository(MagicMock())
+        repo.cache = None
+        repo.get_many_by = AsyncMock(return_value=['user'])
+        return repo
+
+    def mock_scalar(self, repo, value):
+        """Подменить скалярный результат запроса."""
+        result = MagicMock()
+        result.scalar_one.return_value = value
+        result.scalar_one_or_none.return_value = value
+        repo.session.execute = AsyncMock(return_value=result)
+
+    @pytest.mark.asyncio
+    async def test_exact_separate_session(self, repo):
+        """Тест точного подсчета в отдельной сессии."""
+        with patch.object(repo, '_count', AsyncMock(return_value=5)) as count:
+            items, total = await repo.paginate(page=2, page_size=10)
+
+        assert (items, total) == (['user'], 5)
+        assert count.call_args.args[0] is not repo.session
+        assert repo.get_many_by.call_args.kwargs['skip'] == 10
+
+    @pytest.mark.asyncio
+    async def test_estimate_reltuples(self, repo):
+        """Тест оценки без условий по pg_class.reltuples."""
+        self.mock_scalar(repo, 1_000_000)
+
+        _, total = await repo.paginate(count='estimate')
+
+        assert total == 1_000_000
+        assert 'pg_class' in str(repo.session.execute.call_args.args[0])
+
+    @pytest.mark.asyncio
+    async def test_estimate_explain(self, repo):
+        """Тест оценки с условиями по EXPLAIN."""
+        self.mock_scalar(repo, [{'Plan': {'Plan Rows': 250_000}}])
+
+        total = await repo.estimate_count(
+            User.role == 'user',
+            User.created_at > datetime(2026, 1, 1, 12, 30, tzinfo=UTC),
+        )
+
+        assert total == 250_000
+        sql = str(repo.session.execute.call_args.args[0])
+        assert sql.startswith('EXPLAIN (FORMAT JSON) SELECT 1')
+        assert "users.role = 'USER'" in sql
+        assert "'2026-01-01 12:30:00+00:00'" in sql
+
+    @pytest.mark.asyncio
+    async def test_estimate_small_is_exact(self, repo):
+        """Тест точного подсчета вместо неточной малой оценки."""
+        self.mock_scalar(repo, -1)
+
+        with patch.object(repo, 'count', AsyncMock(return_value=3)):
+            assert await repo.estimate_count() == 3
+
+    @pytest.mark.asyncio
+    async def test_cached(self, repo):
+        """Тест кэширования количества по условиям."""
+        with patch.object(repo, 'count', AsyncMock(return_value=7)) as count:
+            assert (await repo.paginate(User.role == 'user', count='cached'))[1] == 7
+            assert (await repo.paginate(User.role == 'user', count='cached'))[1] == 7
+            await repo.paginate(User.role == 'admin', count='cached')
+
+        assert count.await_count == 2
+
+
+class TestLoadSessions:
+    """Тесты для загрузки сессий в списке пользователей."""
+
+    @pytest.fixture
+    def repo(self):
+        """Фикстура репозитория с моком сессии."""
+        repo = UserRepository(MagicMock())
+        repo.cache = None
+        return repo
+
+    @pytest.fixture
+    def users(self):
+        """Пользователи страницы."""
+        return [
+            User(id=id, email=f'{id}@example.com', role=UserRole.USER, status='active')
+            for id in (1, 2)
+        ]
+
+    def mock_result(self, repo, rows):
+        """Подменить результат запроса."""
+        result = MagicMock()
+        result.all.return_value = rows
+        result.scalars.return_value = rows
+        repo.session.execute = AsyncMock(return_value=result)
+
+    def compiled(self, repo) -> str:
+        """SQL запроса сессий."""
+        stmt = repo.session.execute.call_args.args[0]
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    @pytest.mark.asyncio
+    async def test_latest(self, repo, users):
+        """Тест загрузки последних сессий без user_agent."""
+        rows = [LoginSession(id=10, user_id=1), LoginSession(id=11, user_id=1)]
+        self.mock_result(repo, rows)
+
+        await repo.load_sessions(users, UserSessionsMode.LATEST, limit=2)
+
+        assert users[0].login_sessions == rows
+        assert users[1].login_sessions == []
+        sql = self.compiled(repo)
+        assert 'JOIN LATERAL (SELECT login_sessions_1.id' in sql
+        assert (
+            'WHERE login_sessions_1.user_id = users.id ORDER BY login_sessions_1.login_at DESC'
+            in sql
+        )
+        assert 'LIMIT %(param_1)s' in sql
+        assert 'user_agent' not in sql
+
+    @pytest.mark.asyncio
+    async def test_count(self, repo, users):
+        """Тест загрузки только количества сессий."""
+        self.mock_result(repo, [(1, 3)])
+
+        await repo.load_sessions(users, UserSessionsMode.COUNT)
+
+        assert [user.sessions_count for user in users] == [3, 0]
+        assert 'count(*)' in self.compiled(repo)
+
+    @pytest.mark.asyncio
+    async def test_none(self, repo, users):
+        """Тест списка без сессий."""
+        repo.session.execute = AsyncMock()
+
+        await repo.load_sessions(users, UserSessionsMode.NONE)
+
+        repo.session.execute.assert_not_called()
+
+    def test_response_skips_unloaded(self, users):
+        """Тест что ответ не подгружает незагруженные сессии."""
+        user = users[0]
+        user.sessions_count = 3
+
+        response = UserResponse.model_validate(user)
+
+        assert response.login_sessions is None
+        assert response.sessions_count == 3
+
+
+class TestCheckAccess:
+    """Тесты для проверки доступа к пакету пользователей."""
+
+    @pytest.mark.asyncio
+    async def test_filter_excludes_current_user(self, mock_admin):
+        """Тест: выбор по условию ограничен и не включает текущего пользователя."""
+        repo = UserRepository(MagicMock())
+        result = MagicMock()
+        result.all.return_value = [(5, True)]
+        repo.session.execute = AsyncMock(return_value=result)
+
+        assert await repo.check_access(mock_admin, status='blocked', limit=11) == {5: True}
+
+        stmt = repo.session.execute.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert 'WHERE users.id != %(id_2)s' in sql
+        assert 'ORDER BY users.id' in sql
+        assert 'LIMIT' in sql
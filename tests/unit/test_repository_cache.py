@@ -0,0 +1,219 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import MemoryCacheBackend, RedisCacheBackend
+from app.models import User
+from app.repositories import UserRepository
+from app.repositories.cache import RepositoryCache
+from app.repositories.user import CACHE_COLUMNS
+from app.schemas import UserRole
+
+
+def make_user(**kwargs) -> User:
+    """Пользователь, как будто загруженный из БД."""
+    data = {
+        'id': 1,
+        'email': 'test@example.com',
+        'password_hash': 'hash',
+        'is_active': True,
+        'role': UserRole.USER,
+        'created_at': datetime(2026, 1, 1, tzinfo=UTC),
+        'last_active_at': None,
+        'total_active_time': 0,
+        'status': 'active',
+    } | kwargs
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+class FakeRedis:
+    """Redis в памяти: хранит байты, как настоящий."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        """Получить значение."""
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, px: int) -> None:  # noqa: ARG002
+        """Сохранить значение (без срока жизни)."""
+        self.data[key] = value.encode()
+
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения."""
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class TestRepositoryCache:
+    """Тесты для кэша строк репозитория."""
+
+    @pytest.fixture
+    def cache(self):
+        """Фикстура кэша в памяти."""
+        return RepositoryCache(
+            MemoryCacheBackend(100),
+            'users',
+            ttl=60,
+            columns=CACHE_COLUMNS,
+            unique=('email',),
+        )
+
+    @pytest.fixture
+    def repo(self, cache):
+        """Фикстура репозитория с кэшем и сессией без подключения к БД."""
+        repo = UserRepository(AsyncSession())
+        repo.cache = cache
+        return repo
+
+    def mock_execute(self, repo, user):
+        """Подменить запрос к БД."""
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = user
+        result.unique.return_value = result
+        return patch.object(repo.session, 'execute', AsyncMock(return_value=result))
+
+    @pytest.mark.asyncio
+    async def test_store_and_get(self, cache):
+        """Тест сохранения строки и поиска по уникальному полю."""
+        await cache.store({'id': 1, 'email': 'a@example.com'})
+
+        assert await cache.get(1) == {'id': 1, 'email': 'a@example.com'}
+        assert await cache.get_id('email', 'a@example.com') == 1
+        assert await cache.get(2) is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'errors': 0}
+
+    @pytest.mark.asyncio
+    async def test_backend_error_is_miss(self, cache):
+        """Тест что ошибка хранилища считается промахом."""
+        with patch.object(cache.backend, 'get', AsyncMock(side_effect=ConnectionError)):
+            assert await cache.get(1) is None
+
+        assert cache.stats()['errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_get_reads_through(self, repo):
+        """Тест что повторный get не обращается к БД."""
+        with self.mock_execute(repo, make_user()):
+            await repo.get(1)
+
+        repo.session.expunge_all()
+        with self.mock_execute(repo, None) as execute:
+            user = await repo.get(1)
+
+        execute.assert_not_called()
+        assert user.email == 'test@example.com'
+        assert user in repo.session
+
+    @pytest.mark.asyncio
+    async def test_get_keeps_loaded_object(self, repo, cache):
+        """Тест что строка из кэша не перезаписывает объект в сессии."""
+        user = make_user()
+        repo.session.add(user)
+        user.role = UserRole.ADMIN
+        await cache.store({'id': 1, 'email': 'test@example.com', 'role': 'user'})
+
+        assert await repo.get(1) is user
+        assert user.role is UserRole.ADMIN
+
+    @pytest.mark.asyncio
+    async def test_get_by_email_reads_through(self, repo):
+        """Тест поиска по email через кэш."""
+        with self.mock_execute(repo, make_user()):
+            await repo.get_by_email('test@example.com')
+
+        repo.session.expunge_all()
+        with self.mock_execute(repo, None) as execute:
+            user = await repo.get_by_email('test@example.com')
+
+        execute.assert_not_called()
+        assert user.id == 1
+
+    @pytest.mark.asyncio
+    async def test_get_by_email_stale_reference(self, repo, cache):
+        """Тест что ссылка на строку с другим email не используется."""
+        await cache.store({'id': 1, 'email': 'new@example.com'})
+        await cache.backend.set('users:email:old@example.com', 1, 60)
+
+        with self.mock_execute(repo, None) as execute:
+            user = await repo.get_by_email('old@example.com')
+
+        execute.assert_called_once()
+        assert user is None
+
+    @pytest.mark.asyncio
+    async def test_get_with_relations_skips_cache(self, repo, cache):
+        """Тест что загрузка связей идет мимо кэша."""
+        await cache.store({'id': 1, 'email': 'test@example.com'})
+
+        with self.mock_execute(repo, None) as execute:
+            await repo.get(1, relations=('login_sessions',))
+
+        execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, repo, cache):
+        """Тест сброса кэша сейчас и после commit."""
+        await cache.store({'id': 1, 'email': 'test@example.com'})
+
+        with patch('app.repositories.base.spawn') as spawn:
+            await repo.invalidate(1, None)
+            assert await cache.get(1) is None
+
+            # Строку успел закэшировать параллельный запрос
+            await cache.store({'id': 1, 'email': 'test@example.com'})
+            repo.session.sync_session.dispatch.after_commit(repo.session.sync_session)
+            await spawn.call_args.args[0]
+
+        assert await cache.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_listens_once(self, repo):
+        """Тест что повторные изменения в сессии не добавляют слушателей."""
+        with patch('app.repositories.base.spawn') as spawn:
+            await repo.invalidate(1)
+            await repo.invalidate(2)
+            repo.session.sync_session.dispatch.after_commit(repo.session.sync_session)
+            repo.session.sync_session.dispatch.after_commit(repo.session.sync_session)
+
+        assert len(repo.session.sync_session.dispatch.after_commit) == 1
+        spawn.assert_called_once()
+        spawn.call_args.args[0].close()
+
+    @pytest.mark.asyncio
+    async def test_redis_json_without_password(self, repo, cache):
+        """Тест JSON в Redis: без password_hash, типы колонок восстанавливаются."""
+        backend = object.__new__(RedisCacheBackend)
+        backend._redis = FakeRedis()
+        cache.backend = backend
+
+        with self.mock_execute(repo, make_user(role=UserRole.ADMIN)):
+            await repo.get(1)
+        assert b'hash' not in backend._redis.data['users:id:1']
+
+        repo.session.expunge_all()
+        user = await repo.get(1)
+
+        assert user.role is UserRole.ADMIN
+        assert user.created_at == datetime(2026, 1, 1, tzinfo=UTC)
+        assert 'password_hash' not in inspect(user).dict
+
+    @pytest.mark.asyncio
+    async def test_disabled(self):
+        """Тест что без кэша репозиторий работает как прежде."""
+        session = MagicMock()
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = 1
+        session.execute = AsyncMock(return_value=result)
+        repo = UserRepository(session)
+        repo.cache = None
+
+        assert await repo.update_password_hash(1, 'old', 'new') is True
+        session.merge.assert_not_called()
@@ -0,0 +1,49 @@
+from collections.abc import Iterator
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute
+import pytest
+from starlette.routing import BaseRoute
+
+from app.main import app
+from app.schemas import UserResponse, UserRole
+
+
+def api_routes(routes: list[BaseRoute]) -> Iterator[APIRoute]:
+    """Эндпоинты, включая вложенные роутеры (FastAPI подключает их лениво)."""
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        router = getattr(route, 'original_router', None)
+        if router is not None:
+            assert isinstance(router.default_response_class, DefaultPlaceholder)
+            yield from api_routes(router.routes)
+
+
+class TestResponseSerialization:
+    """Тесты записи ответов API сразу в JSON байты через Pydantic."""
+
+    @pytest.fixture
+    def routes(self):
+        """Эндпоинты приложения по имени функции."""
+        return {route.name: route for route in api_routes(app.routes)}
+
+    def test_default_response_class(self, routes):
+        """Тест: своя response_class отключает dump_json в FastAPI."""
+        assert isinstance(app.router.default_response_class, DefaultPlaceholder)
+        for route in routes.values():
+            if route.response_field is None:
+                continue  # Потоковые ответы и ответы без тела
+            assert isinstance(route.response_class, DefaultPlaceholder), route.path
+
+    @pytest.mark.parametrize('name', ['get_users', 'login', 'register', 'refresh_tokens'])
+    def test_response_model(self, routes, name):
+        """Тест: у горячих эндпоинтов есть модель ответа."""
+        assert routes[name].response_field is not None
+
+    def test_user_email_not_revalidated(self):
+        """Тест: email из БД не проверяется повторно, в схеме остается format email."""
+        user = UserResponse(id=1, email='legacy@localhost', role=UserRole.USER, status='active')
+
+        assert user.email == 'legacy@localhost'
+        assert UserResponse.model_json_schema()['properties']['email']['format'] == 'email'
@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from freezegun import freeze_time
+import pytest
+
+from app.core.revocation import MemoryRevocationBroker, TokenRevocation
+
+
+class TestTokenRevocation:
+    """Тесты для TokenRevocation."""
+
+    @pytest.fixture
+    def broker(self):
+        """Общий канал для двух процессов."""
+        return MemoryRevocationBroker()
+
+    @pytest.fixture
+    def revocation(self, broker):
+        """Карта отзывов с токенами на 60 секунд."""
+        return TokenRevocation(broker, ttl=60)
+
+    def test_revoke_cutoff(self, revocation):
+        """Тест отзыва токенов, выданных до отзыва (и без iat)."""
+        with freeze_time('2026-01-01 12:00:00'):
+            asyncio.run(revocation.revoke([1]))
+            cutoff = revocation._cutoffs[1]
+
+        assert revocation.is_revoked({'sub': '1', 'iat': cutoff - 0.5})
+        assert revocation.is_revoked({'sub': '1'})
+        assert not revocation.is_revoked({'sub': '1', 'iat': cutoff + 0.001})
+        assert not revocation.is_revoked({'sub': '2', 'iat': cutoff - 0.5})
+        assert revocation.stats()['rejected'] == 2
+
+    def test_expired_entries_pruned(self, revocation):
+        """Тест удаления записей, переживших все токены до отзыва."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            asyncio.run(revocation.revoke([1]))
+            frozen.tick(61)
+            asyncio.run(revocation.revoke([2]))
+
+        assert set(revocation._cutoffs) == {2}
+
+    @pytest.mark.asyncio
+    async def test_sync_between_processes(self, broker, revocation):
+        """Тест получения отзыва, сделанного другим процессом."""
+        other = TokenRevocation(broker, ttl=60)
+        revocation.start()
+        await asyncio.sleep(0)
+
+        await other.revoke([1, 2])
+        await asyncio.sleep(0)
+        await revocation.stop()
+
+        assert revocation.is_revoked({'sub': '2', 'iat': 0})
+
+    @pytest.mark.asyncio
+    async def test_snapshot_on_start(self, revocation):
+        """Тест загрузки действующих отзывов при подключении к каналу."""
+        revocation.broker.snapshot = AsyncMock(return_value={5: 1e12})
+        revocation.start()
+        await asyncio.sleep(0)
+        await revocation.stop()
+
+        assert revocation.is_revoked({'sub': '5', 'iat': 1e12 - 1})
+
+    @pytest.mark.asyncio
+    async def test_snapshot_after_subscribe(self, broker, revocation):
+        """Тест что отзыв, разосланный во время снимка, не теряется."""
+        other = TokenRevocation(broker, ttl=60)
+        snapshot = broker.snapshot
+
+        async def revoke_during_snapshot(since: float) -> dict[int, float]:
+            result = await snapshot(since)
+            await other.revoke([7])
+            return result
+
+        broker.snapshot = revoke_during_snapshot
+        revocation.start()
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await revocation.stop()
+
+        assert revocation.is_revoked({'sub': '7', 'iat': 0})
+
+    @pytest.mark.asyncio
+    async def test_late_start_gets_snapshot(self, broker, revocation):
+        """Тест получения отзывов, сделанных до запуска процесса."""
+        await TokenRevocation(broker, ttl=60).revoke([3])
+
+        revocation.start()
+        await asyncio.sleep(0)
+        await revocation.stop()
+
+        assert revocation.is_revoked({'sub': '3', 'iat': 0})
+
+    @pytest.mark.asyncio
+    async def test_publish_error(self, revocation):
+        """Тест отзыва в своем процессе при недоступном канале."""
+        revocation.broker.publish = AsyncMock(side_effect=ConnectionError)
+
+        await revocation.revoke([1])
+
+        assert revocation.is_revoked({'sub': '1', 'iat': 0})
+        assert revocation.stats()['errors'] == 1
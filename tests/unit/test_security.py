@@ -1,10 +1,11 @@
 from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
 
 from freezegun import freeze_time
 import pytest
 
 from app.core.exceptions import AuthenticationError
-from app.core.security import SecurityService
+from app.core.security import PasswordHashPolicy, SecurityService
 
 
 class TestSecurityService:
@@ -46,12 +47,47 @@ class TestSecurityService:
 
         assert service.verify_password(special_password, hashed) is True
 
+    def test_password_needs_rehash(self, service):
+        """Тест определения хэша с устаревшим (меньшим) cost-фактором."""
+        with patch('app.core.security.password_policy', PasswordHashPolicy(5)):
+            current = service.get_password_hash('test_password')
+            stale = service.get_password_hash('test_password', rounds=4)
+            stronger = service.get_password_hash('test_password', rounds=6)
+
+            assert service.password_needs_rehash(current) is False
+            assert service.password_needs_rehash(stale) is True
+            assert service.password_needs_rehash(stronger) is False
+            assert service.verify_password('test_password', stale) is True
+
+    def test_calibrate_fits_target(self):
+        """Тест подбора cost-фактора под бюджет времени."""
+        policy = PasswordHashPolicy(12)
+
+        with patch.object(PasswordHashPolicy, '_measure', return_value=0.05):
+            rounds = policy.calibrate(target_ms=250, min_rounds=10, max_rounds=14)
+
+        # 50мс -> 100мс -> 200мс, следующий шаг (400мс) превышает бюджет
+        assert rounds == 12
+        assert policy.rounds == 12
+
+    def test_calibrate_respects_bounds(self):
+        """Тест ограничения cost-фактора границами."""
+        policy = PasswordHashPolicy(12)
+
+        with patch.object(PasswordHashPolicy, '_measure', return_value=0.5):
+            assert policy.calibrate(target_ms=250, min_rounds=10, max_rounds=14) == 10
+
+        with patch.object(PasswordHashPolicy, '_measure', return_value=0.001):
+            assert policy.calibrate(target_ms=250, min_rounds=10, max_rounds=14) == 14
+
     def test_create_access_token(self, service, mock_user):
         """Тест создания access токена."""
         token = service.create_access_token(mock_user)
 
         assert isinstance(token, str)
         assert len(token) > 0
+        # iat с миллисекундами - для отзыва токенов (app.core.revocation)
+        assert isinstance(service.verify_token(token)['iat'], float)
 
     def test_create_refresh_token(self, service, mock_user):
         """Тест создания refresh токена."""
@@ -60,6 +96,15 @@ class TestSecurityService:
         assert isinstance(token, str)
         assert len(token) > 0
 
+    @freeze_time('2026-01-01 12:00:00')
+    def test_refresh_tokens_unique(self, service, mock_user):
+        """Тест различия refresh токенов, выданных подряд."""
+        first = service.create_refresh_token(mock_user)
+        second = service.create_refresh_token(mock_user)
+
+        assert first != second
+        assert service.hash_token(first) != service.hash_token(second)
+
     def test_verify_valid_token(self, service, mock_user):
         """Тест верификации валидного токена."""
         token = service.create_access_token(mock_user)
@@ -87,6 +132,28 @@ class TestSecurityService:
         with pytest.raises(AuthenticationError, match='Некорректный токен'):
             service.verify_token(invalid_token)
 
+    def test_verify_access_token_cached(self, service, mock_user):
+        """Тест повторной проверки токена из кэша."""
+        token = service.create_access_token(mock_user)
+
+        with patch.object(service, 'verify_token', wraps=service.verify_token) as verify:
+            first = service.verify_access_token(token)
+            second = service.verify_access_token(token)
+
+        verify.assert_called_once_with(token)
+        assert first == second
+        assert first['sub'] == '1'
+
+    def test_verify_access_token_expired(self, service, mock_user):
+        """Тест что токен из кэша не переживает свой exp."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            token = service.create_access_token(mock_user)
+            service.verify_access_token(token)
+
+            frozen.tick(24 * 60 * 60)
+            with pytest.raises(AuthenticationError, match='Токен устарел'):
+                service.verify_access_token(token)
+
     def test_is_token_expired_false(self, service):
         """Тест проверки неистекшего токена."""
         future_time = datetime.now(UTC) + timedelta(days=1)
@@ -0,0 +1,42 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.core.tasks import PeriodicTask
+
+
+class TestPeriodicTask:
+    """Тесты для PeriodicTask."""
+
+    @pytest.mark.asyncio
+    async def test_runs_periodically(self):
+        """Тест периодического запуска и остановки."""
+        func = AsyncMock()
+        task = PeriodicTask(func, interval=0.01, name='test')
+
+        task.start()
+        await asyncio.sleep(0.05)
+        await task.stop()
+
+        assert func.await_count >= 2
+        calls = func.await_count
+        await asyncio.sleep(0.03)
+        assert func.await_count == calls
+
+    @pytest.mark.asyncio
+    async def test_survives_errors(self):
+        """Тест что ошибка запуска не останавливает задачу."""
+        func = AsyncMock(side_effect=[RuntimeError('boom'), None, None, None, None, None])
+        task = PeriodicTask(func, interval=0.01, name='test')
+
+        task.start()
+        await asyncio.sleep(0.05)
+        await task.stop()
+
+        assert func.await_count >= 2
+
+    @pytest.mark.asyncio
+    async def test_stop_not_started(self):
+        """Тест остановки незапущенной задачи."""
+        await PeriodicTask(AsyncMock(), interval=1, name='test').stop()
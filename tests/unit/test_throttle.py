@@ -0,0 +1,86 @@
+from freezegun import freeze_time
+import pytest
+
+from app.core.exceptions import TooManyRequestsError
+from app.core.throttle import LoginThrottle
+
+
+class TestLoginThrottle:
+    """Тесты для LoginThrottle."""
+
+    @pytest.fixture
+    def throttle(self):
+        """Фикстура для создания LoginThrottle."""
+        return LoginThrottle(free_attempts=3, base_delay=1, max_delay=10, window=60)
+
+    def test_free_attempts(self, throttle):
+        """Тест что первые неудачи не блокируют вход."""
+        throttle.failure('user@example.com')
+        throttle.failure('user@example.com')
+
+        throttle.check('user@example.com')
+
+    def test_exponential_backoff(self, throttle):
+        """Тест удвоения задержки с каждой неудачей."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            for _ in range(3):
+                throttle.failure('user@example.com')
+            with pytest.raises(TooManyRequestsError) as exc_info:
+                throttle.check('user@example.com')
+            assert exc_info.value.retry_after == 1
+
+            frozen.tick(1)
+            throttle.check('user@example.com')
+            throttle.failure('user@example.com')
+            with pytest.raises(TooManyRequestsError) as exc_info:
+                throttle.check('user@example.com')
+            assert exc_info.value.retry_after == 2
+
+            # Задержка ограничена max_delay
+            for _ in range(10):
+                throttle.failure('user@example.com')
+            with pytest.raises(TooManyRequestsError) as exc_info:
+                throttle.check('user@example.com')
+            assert exc_info.value.retry_after == 10
+
+        assert throttle.stats()['rejected'] == 3
+
+    def test_key_normalized(self, throttle):
+        """Тест что регистр и пробелы email не обходят счетчик."""
+        for email in ('User@Example.com', ' user@example.com', 'USER@EXAMPLE.COM'):
+            throttle.failure(email)
+
+        with pytest.raises(TooManyRequestsError):
+            throttle.check('user@example.com')
+
+    def test_success_resets(self, throttle):
+        """Тест сброса счетчика успешным входом."""
+        for _ in range(3):
+            throttle.failure('user@example.com')
+        throttle.success('user@example.com')
+
+        throttle.check('user@example.com')
+        assert throttle.stats()['tracked'] == 0
+
+    def test_blocked_not_evicted(self):
+        """Тест что перебор других email не вытесняет заблокированный ключ."""
+        throttle = LoginThrottle(free_attempts=2, base_delay=60, window=60, max_keys=10)
+        throttle.failure('victim@example.com')
+        throttle.failure('victim@example.com')
+
+        for i in range(100):
+            throttle.failure(f'{i}@example.com')
+
+        with pytest.raises(TooManyRequestsError):
+            throttle.check('victim@example.com')
+        assert throttle.stats()['blocked'] == 1
+
+    def test_window_resets(self, throttle):
+        """Тест забывания неудач после окна без попыток."""
+        with freeze_time('2026-01-01 12:00:00') as frozen:
+            throttle.failure('user@example.com')
+            throttle.failure('user@example.com')
+
+            frozen.tick(61)
+            throttle.failure('user@example.com')
+            throttle.check('user@example.com')
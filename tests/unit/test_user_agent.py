@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.user_agent import cache_stats, parse_user_agent, warm_up
+
+CHROME = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+IPHONE = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 '
+    '(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
+)
+
+
+class TestParseUserAgent:
+    """Тесты для кэшированного разбора User-Agent."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Пустой кэш для каждого теста."""
+        parse_user_agent.cache_clear()
+        yield
+        parse_user_agent.cache_clear()
+
+    def test_parse(self):
+        """Тест разбора User-Agent."""
+        assert dict(parse_user_agent(CHROME)) == {
+            'browser': 'Chrome',
+            'os': 'Windows',
+            'device_type': 'desktop',
+        }
+        assert parse_user_agent(IPHONE)['device_type'] == 'mobile'
+
+    def test_parse_empty(self):
+        """Тест пустого User-Agent."""
+        assert parse_user_agent(None) == {}
+        assert parse_user_agent('') == {}
+
+    def test_parse_cached(self):
+        """Тест повторного разбора из кэша."""
+        first = parse_user_agent(CHROME)
+        second = parse_user_agent(CHROME)
+
+        assert first is second
+        stats = cache_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_result_read_only(self):
+        """Тест что закэшированный результат нельзя изменить."""
+        with pytest.raises(TypeError):
+            parse_user_agent(CHROME)['browser'] = 'Other'
+
+    def test_warm_up(self):
+        """Тест прогрева кэша."""
+        assert warm_up([CHROME, IPHONE]) == 2
+
+        parse_user_agent(IPHONE)
+        stats = cache_stats()
+        assert stats['size'] == 2
+        assert stats['hits'] == 1
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.exceptions import ServiceOverloadedError
+from app.core.workers import WorkerPool
+
+
+class TestWorkerPool:
+    """Тесты для WorkerPool."""
+
+    @pytest.fixture
+    def pool(self):
+        """Фикстура пула с одним воркером и очередью на одну задачу."""
+        pool = WorkerPool(kind='thread', workers=1, queue_size=1)
+        yield pool
+        pool.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result(self, pool):
+        """Тест выполнения функции в пуле."""
+        result = await pool.run(pow, 2, 10)
+
+        assert result == 1024
+        assert pool.stats()['completed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_run_rejects_when_queue_full(self, pool):
+        """Тест отказа при заполненной очереди."""
+        release = threading.Event()
+
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0)
+
+        stats = pool.stats()
+        assert stats['in_flight'] == 1
+        assert stats['queue_depth'] == 1
+
+        with pytest.raises(ServiceOverloadedError):
+            await pool.run(release.wait)
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+        stats = pool.stats()
+        assert stats['rejected'] == 1
+        assert stats['queue_depth'] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_keeps_slot(self, pool):
+        """Тест: отмена запроса не освобождает место, пока задача выполняется."""
+        release = threading.Event()
+
+        running = asyncio.create_task(pool.run(release.wait))
+        queued = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0)
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+
+        # Поток все еще занят, задача из очереди отменена вместе с запросом
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert pool.stats()['in_flight'] == 1
+        assert pool.stats()['cancelled'] == 1
+
+        release.set()
+        pool.shutdown()
+
+        stats = pool.stats()
+        assert stats['in_flight'] == 0
+        assert stats['completed'] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed(self, pool):
+        """Тест учета задач, завершившихся ошибкой."""
+        with pytest.raises(ZeroDivisionError):
+            await pool.run(divmod, 1, 0)
+
+        stats = pool.stats()
+        assert stats['failed'] == 1
+        assert stats['completed'] == 0
+
+    def test_unknown_kind(self):
+        """Тест неизвестного типа пула."""
+        with pytest.raises(ValueError, match='Неизвестный тип пула'):
+            WorkerPool(kind='fiber')